@@ -0,0 +1,359 @@
+"""
+Batch deduplication of persons
+Streams every person once, groups them by their match_keys blocking keys, scores the pairs
+inside each block and clusters matches with union-find. Each cluster of two or more records
+is written to person_merge_proposals for review under /api/admin/person-merge-proposals;
+nothing is merged here. A run's proposals are inserted before the previous run's pending ones
+are marked superseded, so an interrupted run never leaves managers with nothing to review.
+
+Inside a block every pair first gets a vectorised estimate (numpy, one block at a time):
+person_match_score with bigram Jaccard standing in for Jaro-Winkler on each name, plus the
+same phone / email / date of birth adjustments. Only pairs whose estimate comes within
+--prefilter-margin of --min-score are scored exactly with person_match_score, the function
+behind POST /api/persons/find-duplicates, so the batch job and the interactive check agree
+on what a duplicate is.
+
+Runs against MONGO_URL / DB_NAME like the server:
+
+    python dedupe_persons.py --dry-run
+    python dedupe_persons.py --min-score 0.9
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import server  # noqa: E402
+from server import (  # noqa: E402
+    PERSON_DUPLICATE_MIN_SCORE, MergeProposalStatus, _name_letters, normalize_email, normalize_phone,
+    person_match_keys, person_match_score
+)
+
+NAME_BITS = 256  # hashed bigram buckets per name part - 32 bytes each for first and last name
+PREFILTER_MARGIN = 0.3  # bigram Jaccard runs well below Jaro-Winkler for near-identical names
+MAX_BLOCK = 2000  # blocks larger than this (very common names) are skipped and reported
+COMPARE_CHUNK = 256  # rows compared against the whole block at once
+STREAM_BATCH = 5000
+WRITE_BATCH = 1000
+SUPERSEDED_RETENTION = timedelta(days=1)  # superseded proposals stay this long for merges already in flight
+
+SNAPSHOT_FIELDS = ("id", "first_name", "last_name", "phone", "email", "date_of_birth")
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+def name_bigram_bits(name) -> np.ndarray:
+    """
+    Packed bitset of hashed bigrams of ' name ' (padded so initials count). Bigrams rather
+    than trigrams: names are short, and one changed letter (Jon/John) costs a trigram set
+    too much of its overlap.
+    """
+    text = f" {_name_letters(name)} "
+    bits = np.zeros(NAME_BITS, dtype=bool)
+    if len(text) > 2:
+        for i in range(len(text) - 1):
+            bits[zlib.crc32(text[i:i + 2].encode()) % NAME_BITS] = True
+    return np.packbits(bits)
+
+
+def value_hash(value) -> int:
+    """Stable 64-bit hash of a non-empty string; 0 stands for missing"""
+    if not value:
+        return 0
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little", signed=True) or 1
+
+
+class PersonTable:
+    """Column-wise copy of the fields the comparison needs, built from one pass over persons"""
+
+    def __init__(self):
+        self.records = []  # tuples in SNAPSHOT_FIELDS order
+        self.linked_counts = []
+        self.updated_at = []
+        self._batches = {"first": [], "last": [], "phone": [], "email": [], "dob": []}
+        self._key_hashes = []
+        self._key_rows = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def add_batch(self, persons: list):
+        first = np.empty((len(persons), NAME_BITS // 8), dtype=np.uint8)
+        last = np.empty_like(first)
+        phones, emails, dobs = [], [], []
+        for offset, person in enumerate(persons):
+            row = len(self.records)
+            self.records.append(tuple(person.get(field) for field in SNAPSHOT_FIELDS))
+            self.linked_counts.append(person.get("linked_count", 0))
+            self.updated_at.append(person.get("updated_at") or person.get("created_at") or "")
+            first[offset] = name_bigram_bits(person.get("first_name"))
+            last[offset] = name_bigram_bits(person.get("last_name"))
+            phones.append(value_hash(normalize_phone(person.get("phone"))))
+            emails.append(value_hash(normalize_email(person.get("email"))))
+            dobs.append(value_hash((person.get("date_of_birth") or "").strip()))
+            keys = person.get("match_keys")
+            if keys is None:
+                keys = person_match_keys(person)
+            for key in keys:
+                self._key_hashes.append(value_hash(key))
+                self._key_rows.append(row)
+        for name, column in (("first", first), ("last", last), ("phone", phones), ("email", emails), ("dob", dobs)):
+            self._batches[name].append(np.asarray(column, dtype=np.int64 if isinstance(column, list) else np.uint8))
+
+    def finish(self):
+        for name, batches in self._batches.items():
+            width = (0, NAME_BITS // 8) if name in ("first", "last") else (0,)
+            dtype = np.uint8 if name in ("first", "last") else np.int64
+            setattr(self, name, np.concatenate(batches) if batches else np.empty(width, dtype))
+        self._batches = {}
+
+    def person(self, row: int) -> dict:
+        return dict(zip(SNAPSHOT_FIELDS, self.records[row]))
+
+    def blocks(self):
+        """Yield the rows of every blocking key shared by two or more persons"""
+        hashes = np.array(self._key_hashes, dtype=np.int64)
+        rows = np.array(self._key_rows, dtype=np.int64)
+        self._key_hashes, self._key_rows = [], []
+        order = np.lexsort((rows, hashes))
+        hashes, rows = hashes[order], rows[order]
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(hashes)) + 1, [len(hashes)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end - start > 1:
+                yield np.unique(rows[start:end])
+
+
+def _jaccard(chunk: np.ndarray, vectors: np.ndarray, chunk_sizes: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    shared = POPCOUNT[chunk[:, None, :] & vectors[None, :, :]].sum(axis=2, dtype=np.int32)
+    union = chunk_sizes[:, None] + sizes[None, :] - shared
+    return np.divide(shared, union, out=np.zeros(shared.shape), where=union > 0)
+
+
+def _equal(chunk: np.ndarray, column: np.ndarray) -> np.ndarray:
+    return (chunk[:, None] == column[None, :]) & (chunk[:, None] != 0)
+
+
+def candidate_pairs(table: PersonTable, block: np.ndarray, floor: float):
+    """Pairs (a, b), a < b, within block whose estimated match score is at least floor"""
+    first, last = table.first[block], table.last[block]
+    phone, email, dob = table.phone[block], table.email[block], table.dob[block]
+    first_sizes = POPCOUNT[first].sum(axis=1, dtype=np.int32)
+    last_sizes = POPCOUNT[last].sum(axis=1, dtype=np.int32)
+    for start in range(0, len(block), COMPARE_CHUNK):
+        end = start + COMPARE_CHUNK
+        estimate = 0.5 * _jaccard(first[start:end], first, first_sizes[start:end], first_sizes)
+        estimate += 0.5 * _jaccard(last[start:end], last, last_sizes[start:end], last_sizes)
+        estimate += 0.15 * _equal(phone[start:end], phone) + 0.15 * _equal(email[start:end], email)
+        both_dob = (dob[start:end, None] != 0) & (dob[None, :] != 0)
+        estimate += np.where(both_dob, np.where(_equal(dob[start:end], dob), 0.15, -0.25), 0.0)
+        left, right = np.nonzero(estimate >= floor)
+        left += start
+        keep = left < right
+        yield from zip(block[left[keep]].tolist(), block[right[keep]].tolist())
+
+
+class UnionFind:
+    """Disjoint sets over the rows that matched at least once"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        self.size.setdefault(x, 1)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+    def groups(self) -> dict:
+        """root -> member rows"""
+        members = {}
+        for x in self.parent:
+            members.setdefault(self.find(x), []).append(x)
+        return members
+
+
+async def load_persons(database) -> PersonTable:
+    table = PersonTable()
+    cursor = database.persons.aggregate([
+        {"$project": {
+            "_id": 0, **{field: 1 for field in SNAPSHOT_FIELDS}, "match_keys": 1, "updated_at": 1, "created_at": 1,
+            "linked_count": {"$ifNull": ["$linked_case_count", 0]}
+        }}
+    ], batchSize=STREAM_BATCH)
+    batch = []
+    async for person in cursor:
+        batch.append(person)
+        if len(batch) >= STREAM_BATCH:
+            table.add_batch(batch)
+            batch = []
+    if batch:
+        table.add_batch(batch)
+    table.finish()
+    return table
+
+
+def build_proposals(table: PersonTable, clusters: UnionFind, edges: dict, run_id: str, dismissed: set) -> list:
+    """One pending proposal per cluster; the suggested primary has the most linked cases, then the newest data"""
+    now = datetime.now(timezone.utc).isoformat()
+    cluster_edges = {}
+    for (a, b), (score, matched_on) in edges.items():
+        cluster_edges.setdefault(clusters.find(a), []).append(
+            {"person_ids": [table.records[a][0], table.records[b][0]], "score": score, "matched_on": matched_on}
+        )
+    proposals = []
+    for root, rows in clusters.groups().items():
+        rows.sort(key=lambda row: (table.linked_counts[row], table.updated_at[row]), reverse=True)
+        person_ids = [table.records[row][0] for row in rows]
+        if tuple(sorted(person_ids)) in dismissed:
+            continue
+        pairs = cluster_edges[root]
+        scores = [pair["score"] for pair in pairs]
+        proposals.append({
+            "id": str(uuid.uuid4()),
+            "run_id": run_id,
+            "status": MergeProposalStatus.PENDING.value,
+            "person_ids": person_ids,
+            "suggested_primary_id": person_ids[0],
+            "persons": [{**table.person(row), "linked_case_count": table.linked_counts[row]} for row in rows],
+            "pairs": pairs,
+            "min_score": min(scores),
+            "max_score": max(scores),
+            "created_at": now
+        })
+    return proposals
+
+
+async def run_dedupe(database, min_score: float = PERSON_DUPLICATE_MIN_SCORE, prefilter_margin: float = PREFILTER_MARGIN,
+                     max_block: int = MAX_BLOCK, dry_run: bool = False) -> dict:
+    """Run one deduplication pass and (unless dry_run) replace the pending proposals with its result"""
+    run_id = str(uuid.uuid4())
+    started_at = datetime.now(timezone.utc).isoformat()
+    timings = {}
+    stats = {"persons": 0, "blocks": 0, "skipped_blocks": 0, "skipped_block_rows": 0,
+             "pairs_screened": 0, "pairs_scored": 0, "matches": 0, "clusters": 0, "proposals": 0}
+
+    phase = time.perf_counter()
+    table = await load_persons(database)
+    stats["persons"] = len(table)
+    timings["load"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    edges = {}
+    scored = set()
+    for block in table.blocks():
+        stats["blocks"] += 1
+        if len(block) > max_block:
+            stats["skipped_blocks"] += 1
+            stats["skipped_block_rows"] += len(block)
+            continue
+        stats["pairs_screened"] += len(block) * (len(block) - 1) // 2
+        for pair in candidate_pairs(table, block, min_score - prefilter_margin):
+            if pair in scored:
+                continue
+            scored.add(pair)
+            score, matched_on = person_match_score(table.person(pair[0]), table.person(pair[1]))
+            if score >= min_score:
+                edges[pair] = (score, matched_on)
+    stats["pairs_scored"] = len(scored)
+    stats["matches"] = len(edges)
+    del scored
+    timings["compare"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    clusters = UnionFind()
+    for a, b in edges:
+        clusters.union(a, b)
+    stats["clusters"] = len(clusters.groups())
+    dismissed = set()
+    async for proposal in database.person_merge_proposals.find(
+        {"status": MergeProposalStatus.DISMISSED.value}, {"_id": 0, "person_ids": 1}
+    ):
+        dismissed.add(tuple(sorted(proposal["person_ids"])))
+    proposals = build_proposals(table, clusters, edges, run_id, dismissed)
+    stats["proposals"] = len(proposals)
+    timings["cluster"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    if not dry_run:
+        for offset in range(0, len(proposals), WRITE_BATCH):
+            await database.person_merge_proposals.insert_many(proposals[offset:offset + WRITE_BATCH], ordered=False)
+    timings["write"] = time.perf_counter() - phase
+
+    run = {
+        "id": run_id,
+        "started_at": started_at,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "min_score": min_score,
+        "dry_run": dry_run,
+        **stats,
+        "timings_seconds": {name: round(seconds, 2) for name, seconds in timings.items()}
+    }
+    if not dry_run:
+        # Recording the run switches the review list over to its proposals
+        await database.person_dedupe_runs.insert_one(dict(run))
+        await swap_proposals(database, run_id)
+    return run
+
+
+async def swap_proposals(database, run_id: str):
+    """
+    Supersede pending proposals from earlier runs. They are kept for a while rather than
+    deleted, so a merge applying one of them right now can still record it as applied
+    """
+    now = datetime.now(timezone.utc)
+    await database.person_merge_proposals.update_many(
+        {"status": MergeProposalStatus.PENDING.value, "run_id": {"$ne": run_id}},
+        {"$set": {"status": MergeProposalStatus.SUPERSEDED.value, "superseded_at": now.isoformat()}}
+    )
+    await database.person_merge_proposals.delete_many({
+        "status": MergeProposalStatus.SUPERSEDED.value,
+        "superseded_at": {"$lt": (now - SUPERSEDED_RETENTION).isoformat()}
+    })
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-score", type=float, default=PERSON_DUPLICATE_MIN_SCORE)
+    parser.add_argument("--prefilter-margin", type=float, default=PREFILTER_MARGIN,
+                        help="Pairs estimated below min-score minus this margin are not scored exactly")
+    parser.add_argument("--max-block", type=int, default=MAX_BLOCK)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be proposed without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    try:
+        run = await run_dedupe(server.db, args.min_score, args.prefilter_margin, args.max_block, args.dry_run)
+    finally:
+        server.client.close()
+    for name in ("persons", "blocks", "skipped_blocks", "pairs_screened", "pairs_scored", "matches", "clusters", "proposals"):
+        logging.info(f"{name:>16}: {run[name]:,}")
+    logging.info("timings: " + ", ".join(f"{name} {seconds}s" for name, seconds in run["timings_seconds"].items()))
+    if run["skipped_blocks"]:
+        logging.warning(f"{run['skipped_blocks']} blocks over --max-block {args.max_block} were not compared "
+                        f"({run['skipped_block_rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,40 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Query, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Query, Request, BackgroundTasks, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import IndexModel, UpdateOne, DeleteOne, DeleteMany, ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import OperationFailure, BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from urllib.parse import quote
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError
+from typing import List, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Union, get_args, get_origin
+from abc import ABC, abstractmethod
 import uuid
+import io
+import json
+import asyncio
+import time
+import hashlib
+import hmac
+import re
+import unicodedata
+import csv
+import random
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
 import jwt
 import bcrypt
 import base64
 import aiofiles
+from PIL import Image, ImageOps, UnidentifiedImageError
 import httpx
 from enum import Enum
 
@@ -108,6 +129,21 @@ CASE_TYPE_VISIBILITY = {
 # For backward compatibility - teams that can be assigned cases
 CASE_TYPE_TEAMS = CASE_TYPE_VISIBILITY
 
+# Precompiled visibility matrix: one bit per case type, one bitmap per team type
+CASE_TYPE_BITS = {case_type.value: 1 << i for i, case_type in enumerate(CaseType)}
+TEAM_TYPE_VISIBILITY_MASKS = {
+    team_type.value: sum(
+        CASE_TYPE_BITS[case_type.value]
+        for case_type, allowed_team_types in CASE_TYPE_VISIBILITY.items()
+        if team_type in allowed_team_types
+    )
+    for team_type in TeamType
+}
+
+def case_types_in_mask(mask: int) -> List[str]:
+    """Expand a visibility bitmap back into case type values"""
+    return [case_type for case_type, bit in CASE_TYPE_BITS.items() if mask & bit]
+
 class CaseStatus(str, Enum):
     NEW = "new"
     ASSIGNED = "assigned"
@@ -454,7 +490,10 @@ class CaseEvidence(BaseModel):
     case_id: str
     filename: str
     file_type: str
-    file_data: str  # Base64 encoded
+    file_data: Optional[str] = None  # Base64 encoded - legacy records only, new files go to the blob store
+    file_size: Optional[int] = None
+    sha256: Optional[str] = None  # Content digest, also the blob store key
+    storage_backend: Optional[str] = None  # local | gridfs
     uploaded_by: str
     uploaded_by_name: str
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -479,6 +518,21 @@ class Notification(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     case_id: Optional[str] = None
 
+# VRM watchlist - vehicles that should raise an alert when they appear on a new case
+class VrmWatchlistEntryCreate(BaseModel):
+    vrm: str
+    reason: str = ""
+
+class VrmWatchlistEntry(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    vrm: str  # Normalized
+    vrm_display: str  # As entered
+    reason: str = ""
+    added_by: str
+    added_by_name: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
 class PublicReport(BaseModel):
     case_type: CaseType
     description: str
@@ -523,7 +577,7 @@ class Person(BaseModel):
     id_type: Optional[str] = None  # driving_license, passport, national_id, other
     id_number: Optional[str] = None
     notes: Optional[str] = None
-    linked_cases: List[str] = Field(default_factory=list)  # List of case IDs
+    linked_case_count: int = 0  # distinct cases in case_person_links
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_by: Optional[str] = None
@@ -555,11 +609,19 @@ class PersonUpdate(BaseModel):
     id_number: Optional[str] = None
     notes: Optional[str] = None
 
-# Case-Person link
+# Case-Person link - one document per (case, person, role) in case_person_links
+class CasePersonRole(str, Enum):
+    REPORTER = "reporter"
+    OFFENDER = "offender"
+    WITNESS = "witness"
+
 class CasePersonLink(BaseModel):
     case_id: str
     person_id: str
-    role: PersonType  # reporter or offender for this specific case
+    role: CasePersonRole
+    linked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    linked_by: Optional[str] = None
+    linked_by_name: Optional[str] = None
 
 # Helper Functions
 def hash_password(password: str) -> str:
@@ -577,13 +639,101 @@ def create_token(user_id: str, email: str, role: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+# Authenticated-user cache settings. Entries are invalidated explicitly when a user changes;
+# the TTL bounds staleness across workers, which do not share the cache.
+USER_CACHE_TTL_SECONDS = int(os.environ.get('USER_CACHE_TTL_SECONDS', '60'))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', '2048'))
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiry and hit/miss counters"""
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self.generation = 0  # Bumped by invalidate()/clear(); see set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: str, value, expires_at: Optional[float] = None, generation: Optional[int] = None):
+        """
+        Store a value. Pass the generation read before loading it: if an invalidation
+        happened since, the value may predate it and is not cached.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        ttl_expiry = time.time() + self.ttl_seconds
+        self._entries[key] = (min(ttl_expiry, expires_at) if expires_at else ttl_expiry, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, key: str):
+        self.generation += 1
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+# user id -> user document (without password)
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+# sha256(token) -> verified JWT payload, never kept past the token's own expiry
+token_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+def invalidate_user_cache(user_id: Optional[str] = None):
+    """Drop a cached user (or every cached user) after a write to db.users"""
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate(user_id)
+    recipient_index.invalidate()
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT, skipping signature verification for tokens already verified recently"""
+    token_key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    payload = token_cache.get(token_key)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    token_cache.set(token_key, payload, expires_at=payload.get("exp"))
+    return payload
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["sub"]}, {"_id": 0, "password": 0})
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
+        payload = decode_token(credentials.credentials)
+        user = user_cache.get(payload["sub"])
+        if user is None:
+            generation = user_cache.generation
+            user = await db.users.find_one({"id": payload["sub"]}, {"_id": 0, "password": 0})
+            if not user:
+                raise HTTPException(status_code=401, detail="User not found")
+            user_cache.set(payload["sub"], user, generation=generation)
+        return dict(user)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -594,25 +744,298 @@ async def require_role(roles: List[UserRole], user: dict = Depends(get_current_u
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return user
 
+# Case reference number prefixes (PREFIX-YY-NNNNN)
+REFERENCE_PREFIXES = {
+    CaseType.FLY_TIPPING: "FT",
+    CaseType.FLY_TIPPING_PRIVATE: "FP",
+    CaseType.FLY_TIPPING_ORGANISED: "FO",
+    CaseType.ABANDONED_VEHICLE: "AV",
+    CaseType.LITTERING: "LT",
+    CaseType.DOG_FOULING: "DF",
+    CaseType.PSPO_DOG_CONTROL: "PS",
+    CaseType.UNTIDY_LAND: "UL",
+    CaseType.HIGH_HEDGES: "HH",
+    CaseType.WASTE_CARRIER_LICENSING: "WC",
+    CaseType.NUISANCE_VEHICLE: "NV",
+    CaseType.COMPLEX_ENVIRONMENTAL: "CE"
+}
+
+# Numbers reserved per round trip to the counters collection (1 = no local reservation)
+REFERENCE_BLOCK_SIZE = int(os.environ.get('REFERENCE_BLOCK_SIZE', '1'))
+
+class ReferenceAllocator:
+    """
+    Allocates per-prefix, per-year case reference sequence numbers.
+    Each counter lives in db.counters and is advanced with an atomic $inc, so concurrent
+    requests (and workers) never receive the same number. With block_size > 1 a worker
+    reserves a range per round trip and hands it out locally; numbers left in a range
+    when the process stops are skipped, never reused.
+    """
+    def __init__(self, block_size: int = 1):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[str, List[int]] = {}  # counter id -> [next, last]
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._seeded = set()
+    
+    async def _seed(self, counter_id: str, prefix: str, year: str):
+        """Start a new counter above any reference already issued (e.g. by the old count-based scheme)"""
+        if counter_id in self._seeded:
+            return
+        # Compare suffixes as numbers: past 99999 the old scheme wrote 6 digits, and
+        # "FT-26-100000" sorts below "FT-26-99999" as a string
+        rows = await db.cases.aggregate([
+            {"$match": {"reference_number": {"$regex": f"^{prefix}-{year}-[0-9]+$"}}},
+            {"$group": {"_id": None, "highest": {"$max": {
+                "$toLong": {"$arrayElemAt": [{"$split": ["$reference_number", "-"]}, -1]}
+            }}}}
+        ]).to_list(1)
+        highest = int(rows[0]["highest"] or 0) if rows else 0
+        # $max never moves a counter backwards, so racing seeders are harmless
+        await db.counters.update_one({"_id": counter_id}, {"$max": {"seq": highest}}, upsert=True)
+        self._seeded.add(counter_id)
+    
+    async def _increment(self, counter_id: str, amount: int) -> int:
+        counter = await db.counters.find_one_and_update(
+            {"_id": counter_id},
+            {"$inc": {"seq": amount}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"]
+    
+    async def reseed(self, prefix: str, year: str):
+        """Move the counter past the highest issued reference, e.g. after a duplicate key on insert"""
+        counter_id = f"case_ref:{prefix}:{year}"
+        async with self._locks[counter_id]:
+            self._seeded.discard(counter_id)
+            self._blocks.pop(counter_id, None)
+            await self._seed(counter_id, prefix, year)
+    
+    async def next(self, prefix: str, year: str) -> int:
+        counter_id = f"case_ref:{prefix}:{year}"
+        await self._seed(counter_id, prefix, year)
+        if self.block_size == 1:
+            return await self._increment(counter_id, 1)
+        
+        async with self._locks[counter_id]:
+            block = self._blocks.get(counter_id)
+            if not block or block[0] > block[1]:
+                last = await self._increment(counter_id, self.block_size)
+                block = [last - self.block_size + 1, last]
+                self._blocks[counter_id] = block
+            number = block[0]
+            block[0] += 1
+            return number
+
+reference_allocator = ReferenceAllocator(block_size=REFERENCE_BLOCK_SIZE)
+
 async def generate_reference_number(case_type: CaseType) -> str:
-    prefix_map = {
-        CaseType.FLY_TIPPING: "FT",
-        CaseType.FLY_TIPPING_PRIVATE: "FP",
-        CaseType.FLY_TIPPING_ORGANISED: "FO",
-        CaseType.ABANDONED_VEHICLE: "AV",
-        CaseType.LITTERING: "LT",
-        CaseType.DOG_FOULING: "DF",
-        CaseType.PSPO_DOG_CONTROL: "PS",
-        CaseType.UNTIDY_LAND: "UL",
-        CaseType.HIGH_HEDGES: "HH",
-        CaseType.WASTE_CARRIER_LICENSING: "WC",
-        CaseType.NUISANCE_VEHICLE: "NV",
-        CaseType.COMPLEX_ENVIRONMENTAL: "CE"
-    }
-    prefix = prefix_map.get(case_type, "GE")
+    prefix = REFERENCE_PREFIXES.get(case_type, "GE")
     year = datetime.now().strftime("%y")
-    count = await db.cases.count_documents({}) + 1
-    return f"{prefix}-{year}-{count:05d}"
+    number = await reference_allocator.next(prefix, year)
+    return f"{prefix}-{year}-{number:05d}"
+
+REFERENCE_INSERT_ATTEMPTS = 5
+
+async def insert_case_document(doc: dict):
+    """
+    Insert a new case. If its reference number is already taken (a counter seeded below
+    an existing reference), reseed the counter and retry with a fresh number
+    """
+    for attempt in range(REFERENCE_INSERT_ATTEMPTS):
+        try:
+            await db.cases.insert_one(doc)
+            return
+        except DuplicateKeyError as e:
+            if "reference_number" not in ((e.details or {}).get("keyPattern") or {}):
+                raise
+            logging.warning(f"Case reference {doc['reference_number']} already exists, allocating another")
+            doc.pop("_id", None)
+            prefix, year, _ = doc["reference_number"].split("-", 2)
+            await reference_allocator.reseed(prefix, year)
+            doc["reference_number"] = f"{prefix}-{year}-{await reference_allocator.next(prefix, year):05d}"
+    raise HTTPException(status_code=503, detail="Could not allocate a case reference number, please retry")
+
+# Audit sink settings
+AUDIT_QUEUE_MAX = int(os.environ.get('AUDIT_QUEUE_MAX', '10000'))
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '500'))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get('AUDIT_FLUSH_INTERVAL_SECONDS', '1.0'))
+AUDIT_WRITE_ATTEMPTS = int(os.environ.get('AUDIT_WRITE_ATTEMPTS', '5'))
+AUDIT_RETRY_MAX_DELAY_SECONDS = 30.0
+AUDIT_DEAD_LETTER_COLLECTION = "audit_dead_letters"
+AUDIT_READ_FLUSH_TIMEOUT_SECONDS = float(os.environ.get('AUDIT_READ_FLUSH_TIMEOUT_SECONDS', '2.0'))
+
+class AuditSink:
+    """
+    Buffered audit writer. Documents are queued in memory and written with insert_many,
+    either when a batch fills up or when the flush interval elapses.
+    put() waits while the queue is full, so a slow database pushes back on writers
+    instead of growing memory without bound.
+    A failed batch is retried with backoff; entries that still cannot be written go to
+    audit_dead_letters with the error, and if even that fails the writer keeps retrying
+    rather than dropping audit records.
+    """
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._progress: Optional[asyncio.Condition] = None
+        self._flush_waiters = 0
+        self._enqueued = 0  # Sequence of the last entry queued
+        self._completed = 0  # Entries handled so far; the queue is FIFO so this is a high-water mark
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.failed = 0  # Lost: still queued when the sink was stopped
+        self.retrying = False
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._wakeup = asyncio.Event()
+        self._progress = asyncio.Condition()
+        self._enqueued = self._completed = 0
+        self._task = asyncio.create_task(self._run())
+    
+    async def put(self, collection: str, doc: dict):
+        if not self.running:
+            # Not started (scripts, tests) - write straight through
+            await db[collection].insert_one(doc)
+            return
+        await self._queue.put((collection, doc))
+        self._enqueued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+    
+    async def flush(self):
+        """
+        Wait until everything queued before the call has been handled.
+        Entries queued while waiting are not waited for, so steady traffic cannot starve a caller.
+        """
+        if not self.running:
+            return
+        target = self._enqueued
+        self._flush_waiters += 1
+        self._wakeup.set()
+        try:
+            async with self._progress:
+                await self._progress.wait_for(lambda: self._completed >= target)
+        finally:
+            self._flush_waiters -= 1
+    
+    async def stop(self, timeout: float = 10.0):
+        """Flush and stop the writer task"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            self.failed += self._queue.qsize()
+            logging.error(f"Audit sink flush timed out with {self._queue.qsize()} entries unwritten")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            if self._queue.qsize() + 1 < self.batch_size and not self._flush_waiters:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                async with self._progress:
+                    self._completed += len(batch)
+                    self._progress.notify_all()
+    
+    async def _insert(self, collection: str, docs: List[dict]) -> List[tuple]:
+        """Insert docs, returning (doc, error) for the ones not written"""
+        try:
+            await db[collection].insert_many(docs, ordered=False)
+            return []
+        except BulkWriteError as e:
+            # Duplicate _ids were written by an earlier attempt whose acknowledgement was lost
+            failed = [(docs[error["index"]], error.get("errmsg", "")) for error in e.details.get("writeErrors", [])
+                      if error.get("code") != 11000]
+            if e.details.get("writeConcernErrors"):
+                return [(doc, str(e)) for doc in docs]
+            return failed
+        except Exception as e:
+            return [(doc, str(e)) for doc in docs]
+    
+    async def _write(self, batch: List[tuple]):
+        by_collection: Dict[str, List[dict]] = defaultdict(list)
+        for collection, doc in batch:
+            by_collection[collection].append(doc)
+        for collection, docs in by_collection.items():
+            await self._write_collection(collection, docs)
+    
+    async def _write_collection(self, collection: str, docs: List[dict]):
+        pending, attempt, delay = docs, 0, 0.5
+        try:
+            while True:
+                failed = await self._insert(collection, pending)
+                self.written += len(pending) - len(failed)
+                if not failed:
+                    self.batches += 1
+                    return
+                attempt += 1
+                self.retries += 1
+                self.retrying = True
+                logging.error(f"Audit sink failed to write {len(failed)} entries to {collection} "
+                              f"(attempt {attempt}): {failed[0][1]}")
+                if attempt >= AUDIT_WRITE_ATTEMPTS:
+                    failed_at = datetime.now(timezone.utc).isoformat()
+                    dead = [{"collection": collection, "doc": doc, "error": error, "failed_at": failed_at}
+                            for doc, error in failed]
+                    dead_failed = await self._insert(AUDIT_DEAD_LETTER_COLLECTION, dead)
+                    self.dead_lettered += len(dead) - len(dead_failed)
+                    logging.error(f"Audit sink moved {len(dead) - len(dead_failed)} entries for {collection} "
+                                  f"to {AUDIT_DEAD_LETTER_COLLECTION}")
+                    if not dead_failed:
+                        self.batches += 1
+                        return
+                    failed = [(entry["doc"], error) for entry, error in dead_failed]
+                pending = [doc for doc, _ in failed]
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, AUDIT_RETRY_MAX_DELAY_SECONDS)
+        finally:
+            self.retrying = False
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "retrying": self.retrying,
+            "dead_lettered": self.dead_lettered,
+            "failed": self.failed
+        }
+
+audit_sink = AuditSink(AUDIT_QUEUE_MAX, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS)
 
 async def create_audit_log(case_id: str, action: str, details: str, user: dict):
     log = AuditLog(
@@ -624,10 +1047,126 @@ async def create_audit_log(case_id: str, action: str, details: str, user: dict):
     )
     doc = log.model_dump()
     doc['performed_at'] = doc['performed_at'].isoformat()
-    await db.audit_logs.insert_one(doc)
+    await audit_sink.put("audit_logs", doc)
+
+# Access log settings. Denials are always kept in full; allowed decisions are counted per
+# user/resource/action/time bucket, with an optional sample also kept in full.
+ACCESS_LOG_BUCKET_SECONDS = int(os.environ.get('ACCESS_LOG_BUCKET_SECONDS', '3600'))
+ACCESS_LOG_ALLOWED_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_ALLOWED_SAMPLE_RATE', '0'))
+ACCESS_LOG_FLUSH_INTERVAL_SECONDS = float(os.environ.get('ACCESS_LOG_FLUSH_INTERVAL_SECONDS', '10'))
+ACCESS_LOG_MAX_PENDING_KEYS = int(os.environ.get('ACCESS_LOG_MAX_PENDING_KEYS', '5000'))
+# Read at import so every worker declares the same TTL for the access log indexes
+ACCESS_LOG_RETENTION_DAYS = int(os.environ.get('ACCESS_LOG_RETENTION_DAYS', '90'))
+
+class AccessCounterBuffer:
+    """
+    Accumulates allowed-decision counts in memory and upserts them with $inc in one bulk_write.
+    Counts from a failed write are merged back and retried on the next flush; only if the
+    backlog grows past ten times max_pending_keys are they dropped (and counted as lost).
+    """
+    def __init__(self, bucket_seconds: int, flush_interval: float, max_pending_keys: int):
+        self.bucket_seconds = bucket_seconds
+        self.flush_interval = flush_interval
+        self.max_pending_keys = max_pending_keys
+        self._pending: Dict[tuple, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.lost = 0
+    
+    def record(self, user: dict, resource: str, action: str):
+        bucket = int(time.time()) // self.bucket_seconds * self.bucket_seconds
+        key = (user["id"], resource, action, bucket)
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = {"count": 0, "user_name": user["name"], "user_role": user["role"]}
+        entry["count"] += 1
+        self.recorded += 1
+        if len(self._pending) >= self.max_pending_keys:
+            run_in_background(self.flush())
+    
+    def _requeue(self, entries: Dict[tuple, dict]):
+        """Merge counts that could not be written back into the pending set"""
+        for key, entry in entries.items():
+            if key not in self._pending and len(self._pending) >= self.max_pending_keys * 10:
+                self.lost += entry["count"]
+                continue
+            current = self._pending.setdefault(key, {**entry, "count": 0})
+            current["count"] += entry["count"]
+    
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {
+                    "user_id": user_id,
+                    "resource": resource,
+                    "action": action,
+                    "bucket_start": datetime.fromtimestamp(bucket, timezone.utc)
+                },
+                {
+                    "$inc": {"count": entry["count"]},
+                    "$set": {"user_name": entry["user_name"], "user_role": entry["user_role"], "last_seen_at": now}
+                },
+                upsert=True
+            )
+            for (user_id, resource, action, bucket), entry in pending.items()
+        ]
+        keys = list(pending)
+        try:
+            await db.access_log_counters.bulk_write(operations, ordered=False)
+            self.flushes += 1
+        except BulkWriteError as e:
+            # Operations without a write error were applied; requeueing them would double count
+            failed = {keys[error["index"]] for error in e.details.get("writeErrors", [])}
+            self.failed_flushes += 1
+            logging.error(f"Failed to write {len(failed)} of {len(operations)} access log counters, keeping them for the next flush: {e}")
+            self._requeue({key: pending[key] for key in failed})
+        except Exception as e:
+            self.failed_flushes += 1
+            logging.error(f"Failed to write {len(operations)} access log counters, keeping them for the next flush: {e}")
+            self._requeue(pending)
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    def stats(self) -> dict:
+        return {
+            "pending_keys": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "lost": self.lost,
+            "bucket_seconds": self.bucket_seconds,
+            "allowed_sample_rate": ACCESS_LOG_ALLOWED_SAMPLE_RATE
+        }
+
+access_counters = AccessCounterBuffer(ACCESS_LOG_BUCKET_SECONDS, ACCESS_LOG_FLUSH_INTERVAL_SECONDS, ACCESS_LOG_MAX_PENDING_KEYS)
 
 async def log_access_decision(user: dict, resource: str, action: str, allowed: bool, reason: str):
-    """Log all access decisions for audit purposes"""
+    """Log an access decision - denials in full, allowed decisions as bucketed counters"""
+    if allowed:
+        access_counters.record(user, resource, action)
+        if not ACCESS_LOG_ALLOWED_SAMPLE_RATE or random.random() >= ACCESS_LOG_ALLOWED_SAMPLE_RATE:
+            return
+    now = datetime.now(timezone.utc)
     log = {
         "id": str(uuid.uuid4()),
         "user_id": user["id"],
@@ -637,9 +1176,20 @@ async def log_access_decision(user: dict, resource: str, action: str, allowed: b
         "action": action,
         "allowed": allowed,
         "reason": reason,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "sampled": allowed,
+        "timestamp": now.isoformat(),
+        "logged_at": now  # BSON date for the TTL index
     }
-    await db.access_logs.insert_one(log)
+    await audit_sink.put("access_logs", log)
+
+async def backfill_access_log_logged_at() -> int:
+    """Migration: give access logs written before logged_at existed a BSON date so the TTL index expires them"""
+    result = await db.access_logs.update_many(
+        {"logged_at": {"$exists": False}, "timestamp": {"$type": "string"}},
+        # Unparseable timestamps expire one retention period from now rather than never
+        [{"$set": {"logged_at": {"$dateFromString": {"dateString": "$timestamp", "onError": "$$NOW"}}}}]
+    )
+    return result.modified_count
 
 async def get_user_team_ids(user: dict) -> List[str]:
     """Get list of team IDs the user belongs to"""
@@ -669,14 +1219,81 @@ async def can_user_access_case(user: dict, case: dict) -> bool:
     
     return case_team in user_teams
 
+# Teams change rarely, so they are held in memory and reloaded after every team write.
+# The TTL picks up writes made through other workers.
+TEAM_REGISTRY_TTL_SECONDS = int(os.environ.get('TEAM_REGISTRY_TTL_SECONDS', '300'))
+
+class TeamRegistry:
+    """In-memory copy of the teams collection with precomputed visibility lookups"""
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._teams: Dict[str, dict] = {}
+        self._active_ids_by_type: Dict[str, List[str]] = {}
+        self._loaded_at = 0.0
+        self._generation = 0  # Bumped as each refresh starts
+        self._loaded_generation = 0  # Generation of the snapshot currently held
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+    
+    async def refresh(self):
+        # Refreshes run concurrently (team writes call this outside the lock); a snapshot
+        # read before one that has already been installed is older and is discarded
+        self._generation += 1
+        generation = self._generation
+        teams = await db.teams.find({}, {"_id": 0}).to_list(None)
+        if generation < self._loaded_generation:
+            return
+        active_ids_by_type: Dict[str, List[str]] = defaultdict(list)
+        for team in teams:
+            if team.get("is_active", True):
+                active_ids_by_type[team["team_type"]].append(team["id"])
+        self._teams = {team["id"]: team for team in teams}
+        self._active_ids_by_type = dict(active_ids_by_type)
+        self._loaded_at = time.time()
+        self._loaded_generation = generation
+        self.refreshes += 1
+    
+    async def ensure_loaded(self):
+        if time.time() - self._loaded_at < self.ttl_seconds:
+            return
+        async with self._lock:
+            if time.time() - self._loaded_at >= self.ttl_seconds:
+                await self.refresh()
+    
+    async def get(self, team_id: str) -> Optional[dict]:
+        """Look up a team, reloading once on a miss in case another worker just created it"""
+        await self.ensure_loaded()
+        team = self._teams.get(team_id)
+        if team is None and team_id:
+            await self.refresh()
+            team = self._teams.get(team_id)
+        return team
+    
+    async def all(self) -> List[dict]:
+        await self.ensure_loaded()
+        return list(self._teams.values())
+    
+    async def team_types(self, team_ids: List[str]) -> List[str]:
+        await self.ensure_loaded()
+        return [self._teams[tid]["team_type"] for tid in team_ids if tid in self._teams]
+    
+    async def active_team_ids_for_types(self, team_types: List[str]) -> List[str]:
+        await self.ensure_loaded()
+        return [tid for team_type in team_types for tid in self._active_ids_by_type.get(team_type, [])]
+    
+    def stats(self) -> dict:
+        return {
+            "teams": len(self._teams),
+            "refreshes": self.refreshes,
+            "loaded_at": datetime.fromtimestamp(self._loaded_at, timezone.utc).isoformat() if self._loaded_at else None
+        }
+
+team_registry = TeamRegistry(TEAM_REGISTRY_TTL_SECONDS)
+
 async def get_teams_for_case_type(case_type: CaseType) -> List[str]:
     """Get team IDs that can handle a case type"""
     allowed_team_types = CASE_TYPE_TEAMS.get(case_type, [])
-    teams = await db.teams.find(
-        {"team_type": {"$in": [t.value for t in allowed_team_types]}, "is_active": True},
-        {"_id": 0}
-    ).to_list(100)
-    return [t["id"] for t in teams]
+    return await team_registry.active_team_ids_for_types([t.value for t in allowed_team_types])
 
 async def create_notification(user_id: str, title: str, message: str, case_id: Optional[str] = None):
     notification = Notification(
@@ -689,6 +1306,100 @@ async def create_notification(user_id: str, title: str, message: str, case_id: O
     doc['created_at'] = doc['created_at'].isoformat()
     await db.notifications.insert_one(doc)
 
+# Recipient index settings. Invalidated with the user cache; the TTL covers other workers.
+RECIPIENT_INDEX_TTL_SECONDS = int(os.environ.get('RECIPIENT_INDEX_TTL_SECONDS', '300'))
+
+class RecipientIndex:
+    """In-memory role/team -> active user id index for notification fan-out"""
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._by_role: Dict[str, List[str]] = {}
+        self._by_team: Dict[str, List[str]] = {}
+        self._roles: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._generation = 0  # Bumped by invalidate()
+        self._loaded_generation = -1  # Generation current when the loaded data was read
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+    
+    def invalidate(self):
+        self._generation += 1
+    
+    def _stale(self) -> bool:
+        return self._loaded_generation != self._generation or time.time() - self._loaded_at > self.ttl_seconds
+    
+    async def _load(self):
+        # Captured before reading: an invalidate() that lands mid-read leaves the index stale
+        generation = self._generation
+        by_role: Dict[str, List[str]] = defaultdict(list)
+        by_team: Dict[str, List[str]] = defaultdict(list)
+        roles: Dict[str, str] = {}
+        async for user in db.users.find({"is_active": {"$ne": False}}, {"_id": 0, "id": 1, "role": 1, "teams": 1}):
+            roles[user["id"]] = user["role"]
+            by_role[user["role"]].append(user["id"])
+            for team_id in user.get("teams") or []:
+                by_team[team_id].append(user["id"])
+        self._by_role, self._by_team, self._roles = dict(by_role), dict(by_team), roles
+        self._loaded_at = time.time()
+        self._loaded_generation = generation
+        self.refreshes += 1
+    
+    async def refresh(self):
+        async with self._lock:
+            await self._load()
+    
+    async def ensure_loaded(self):
+        if not self._stale():
+            return
+        async with self._lock:
+            if self._stale():  # Callers that queued on the lock reuse the load that just finished
+                await self._load()
+    
+    async def user_ids(self, roles: Optional[List[str]] = None, team_ids: Optional[List[str]] = None) -> List[str]:
+        """Active users with any of the roles, optionally limited to members of any of the teams"""
+        await self.ensure_loaded()
+        if team_ids is not None:
+            candidates = dict.fromkeys(uid for tid in team_ids for uid in self._by_team.get(tid, []))
+            if roles is None:
+                return list(candidates)
+            return [uid for uid in candidates if self._roles.get(uid) in roles]
+        if roles is None:
+            return list(self._roles)
+        return [uid for role in roles for uid in self._by_role.get(role, [])]
+    
+    def stats(self) -> dict:
+        return {
+            "users": len(self._roles),
+            "refreshes": self.refreshes,
+            "loaded_at": datetime.fromtimestamp(self._loaded_at, timezone.utc).isoformat() if self._loaded_at else None
+        }
+
+recipient_index = RecipientIndex(RECIPIENT_INDEX_TTL_SECONDS)
+
+async def dispatch_notifications(user_ids: List[str], title: str, message: str, case_id: Optional[str] = None) -> int:
+    """Write one notification per recipient in a single insert_many"""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+    created_at = datetime.now(timezone.utc).isoformat()
+    docs = [{
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "title": title,
+        "message": message,
+        "is_read": False,
+        "created_at": created_at,
+        "case_id": case_id
+    } for user_id in user_ids]
+    await db.notifications.insert_many(docs, ordered=False)
+    return len(docs)
+
+async def notify_roles(roles: List[UserRole], title: str, message: str, case_id: Optional[str] = None,
+                       team_ids: Optional[List[str]] = None) -> int:
+    """Fan a notification out to every active user with one of the roles"""
+    user_ids = await recipient_index.user_ids([r.value for r in roles], team_ids)
+    return await dispatch_notifications(user_ids, title, message, case_id)
+
 # What3Words Helper Functions
 async def w3w_convert_to_coordinates(words: str) -> Optional[Dict[str, Any]]:
     """Convert what3words address to coordinates"""
@@ -738,8 +1449,14 @@ async def get_user_team_types(user: dict) -> List[str]:
     user_team_ids = user.get("teams", [])
     if not user_team_ids:
         return []
-    teams = await db.teams.find({"id": {"$in": user_team_ids}}, {"_id": 0}).to_list(100)
-    return [t["team_type"] for t in teams]
+    return await team_registry.team_types(user_team_ids)
+
+def visibility_mask_for_team_types(team_types: List[str]) -> int:
+    """Combine the precompiled visibility bitmaps of a set of team types"""
+    mask = 0
+    for team_type in team_types:
+        mask |= TEAM_TYPE_VISIBILITY_MASKS.get(team_type, 0)
+    return mask
 
 async def can_user_view_case_type(user: dict, case_type: str) -> bool:
     """Check if user can view a specific case type based on team visibility rules"""
@@ -754,17 +1471,11 @@ async def can_user_view_case_type(user: dict, case_type: str) -> bool:
     if not user_team_types:
         return True  # Backward compatibility - no teams = see all
     
-    # Check if any of user's team types can view this case type
-    try:
-        case_type_enum = CaseType(case_type)
-        allowed_team_types = CASE_TYPE_VISIBILITY.get(case_type_enum, [])
-        for team_type in user_team_types:
-            if TeamType(team_type) in allowed_team_types:
-                return True
-    except ValueError:
+    case_type_bit = CASE_TYPE_BITS.get(case_type)
+    if case_type_bit is None:
         return True  # Unknown case type - allow view
     
-    return False
+    return bool(visibility_mask_for_team_types(user_team_types) & case_type_bit)
 
 async def get_visible_case_types_for_user(user: dict) -> Optional[List[str]]:
     """
@@ -790,17 +1501,9 @@ async def get_visible_case_types_for_user(user: dict) -> Optional[List[str]]:
         return None  # Backward compatibility - no teams = see all
     
     # Build list of visible case types based on user's team types
-    visible_case_types = set()
-    for case_type, allowed_team_types in CASE_TYPE_VISIBILITY.items():
-        for team_type in user_team_types:
-            try:
-                if TeamType(team_type) in allowed_team_types:
-                    visible_case_types.add(case_type.value)
-                    break
-            except ValueError:
-                continue
+    visible_case_types = case_types_in_mask(visibility_mask_for_team_types(user_team_types))
     
-    return list(visible_case_types) if visible_case_types else None
+    return visible_case_types if visible_case_types else None
 
 def is_fly_tipping_case(case_type: str) -> bool:
     """Check if case type is a fly-tipping variant"""
@@ -850,6 +1553,7 @@ async def register_user(user_data: UserCreate, current_user: dict = Depends(get_
     doc['created_at'] = doc['created_at'].isoformat()
     
     await db.users.insert_one(doc)
+    invalidate_user_cache(user.id)
     return user
 
 # User Management Endpoints
@@ -890,6 +1594,7 @@ async def update_user(user_id: str, updates: dict, current_user: dict = Depends(
                 raise HTTPException(status_code=400, detail=f"Invalid team IDs: {invalid_ids}")
     
     result = await db.users.update_one({"id": user_id}, {"$set": update_data})
+    invalidate_user_cache(user_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -906,11 +1611,25 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
     result = await db.users.delete_one({"id": user_id})
+    invalidate_user_cache(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
     return {"message": "User deleted successfully"}
 
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Hit/miss counters for the in-process caches - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can view cache statistics")
+    return {
+        "users": user_cache.stats(),
+        "tokens": token_cache.stats(),
+        "teams": team_registry.stats(),
+        "recipients": recipient_index.stats(),
+        "vrms": vrm_index.stats()
+    }
+
 # System Settings Endpoints
 @api_router.get("/settings")
 async def get_system_settings(current_user: dict = Depends(get_current_user)):
@@ -996,6 +1715,7 @@ async def create_team(team_data: TeamCreate, current_user: dict = Depends(get_cu
     doc["created_at"] = doc["created_at"].isoformat()
     
     await db.teams.insert_one(doc)
+    await team_registry.refresh()
     await log_access_decision(current_user, f"team:{team.id}", "create", True, f"Created team {team.name}")
     
     return team
@@ -1015,6 +1735,7 @@ async def update_team(team_id: str, updates: TeamUpdate, current_user: dict = De
         raise HTTPException(status_code=400, detail="No valid fields to update")
     
     await db.teams.update_one({"id": team_id}, {"$set": update_data})
+    await team_registry.refresh()
     await log_access_decision(current_user, f"team:{team_id}", "update", True, f"Updated team {team['name']}")
     
     return {"message": "Team updated successfully"}
@@ -1031,11 +1752,13 @@ async def delete_team(team_id: str, current_user: dict = Depends(get_current_use
         raise HTTPException(status_code=400, detail=f"Cannot delete team with {case_count} assigned cases")
     
     result = await db.teams.delete_one({"id": team_id})
+    await team_registry.refresh()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Team not found")
     
     # Remove team from users
     await db.users.update_many({"teams": team_id}, {"$pull": {"teams": team_id}})
+    invalidate_user_cache()
     
     await log_access_decision(current_user, f"team:{team_id}", "delete", True, "Deleted team")
     
@@ -1055,11 +1778,10 @@ async def get_team_members(team_id: str, current_user: dict = Depends(get_curren
 async def get_case_type_team_mapping(current_user: dict = Depends(get_current_user)):
     """Get mapping of case types to allowed teams"""
     result = {}
+    all_teams = await team_registry.all()
     for case_type, team_types in CASE_TYPE_TEAMS.items():
-        teams = await db.teams.find(
-            {"team_type": {"$in": [t.value for t in team_types]}, "is_active": True},
-            {"_id": 0}
-        ).to_list(100)
+        allowed = [t.value for t in team_types]
+        teams = [t for t in all_teams if t["team_type"] in allowed and t.get("is_active", True)]
         result[case_type.value] = {
             "allowed_team_types": [t.value for t in team_types],
             "available_teams": teams
@@ -1075,7 +1797,7 @@ async def get_my_visible_case_types(current_user: dict = Depends(get_current_use
     user_teams = current_user.get("teams", [])
     team_info = []
     if user_teams:
-        teams = await db.teams.find({"id": {"$in": user_teams}}, {"_id": 0}).to_list(100)
+        teams = [t for t in await team_registry.all() if t["id"] in user_teams]
         team_info = [{"id": t["id"], "name": t["name"], "team_type": t["team_type"]} for t in teams]
     
     return {
@@ -1198,6 +1920,107 @@ async def reverse_geocode(
         logging.error(f"Reverse geocoding error: {e}")
         return {"success": False, "error": "Geocoding service unavailable"}
 
+# Case list pagination
+class CaseSortKey(str, Enum):
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+    REFERENCE_NUMBER = "reference_number"
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+CASE_PAGE_SIZE_DEFAULT = 50
+CASE_PAGE_SIZE_MAX = 500
+# Filtered totals stop counting here; the hint is reported as capped beyond it
+CASE_COUNT_HINT_LIMIT = 10000
+
+def encode_case_cursor(sort_by: CaseSortKey, sort_order: SortOrder, case: dict) -> str:
+    """Opaque cursor pointing just after the given case in (sort key, id) order"""
+    payload = {"s": sort_by.value, "o": sort_order.value, "v": case.get(sort_by.value), "id": case["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+def decode_case_cursor(cursor: str, sort_by: CaseSortKey, sort_order: SortOrder) -> dict:
+    """Turn a cursor back into a query condition for the next page"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value, last_id = payload["v"], payload["id"]
+        cursor_sort = (payload["s"], payload["o"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != (sort_by.value, sort_order.value):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    # Only scalars: a dict or list here would be read by Mongo as a query operator
+    if not isinstance(last_id, str) or not (value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Missing/null sort values come first ascending and last descending, and $lt/$gt never match them
+    op = "$lt" if sort_order == SortOrder.DESC else "$gt"
+    same_value = {sort_by.value: value, "id": {op: last_id}}
+    if value is None:
+        if sort_order == SortOrder.DESC:
+            return same_value
+        return {"$or": [same_value, {sort_by.value: {"$ne": None}}]}
+    conditions = [{sort_by.value: {op: value}}, same_value]
+    if sort_order == SortOrder.DESC:
+        conditions.append({sort_by.value: None})
+    return {"$or": conditions}
+
+async def case_count_hint(query: dict) -> Dict[str, Any]:
+    """Cheap total for the UI: collection metadata when unfiltered, a capped count otherwise"""
+    if not query:
+        return {"estimated_total": await db.cases.estimated_document_count(), "total_capped": False}
+    count = await db.cases.count_documents(query, limit=CASE_COUNT_HINT_LIMIT)
+    return {"estimated_total": count, "total_capped": count >= CASE_COUNT_HINT_LIMIT}
+
+# Case list projections - named views and sparse fieldsets pushed down to Mongo
+class CaseView(str, Enum):
+    SUMMARY = "summary"
+    MAP = "map"
+    FULL = "full"
+
+CASE_VIEW_FIELDS = {
+    CaseView.SUMMARY: [
+        "id", "reference_number", "case_type", "status", "description", "assigned_to", "assigned_to_name",
+        "owning_team", "owning_team_name", "reporting_source", "fpn_issued", "created_at", "updated_at",
+        "location.address", "location.postcode"
+    ],
+    CaseView.MAP: [
+        "id", "reference_number", "case_type", "status", "description", "assigned_to_name",
+        "location", "closure_reason", "created_at", "updated_at"
+    ],
+    CaseView.FULL: None,  # Whole document
+}
+
+# Top-level fields a caller may ask for with fields= (dotted sub-paths of these are allowed too)
+CASE_PROJECTABLE_FIELDS = set(Case.model_fields)
+
+def parse_case_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse and validate a comma-separated fields= parameter"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f.split(".", 1)[0] not in CASE_PROJECTABLE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown case fields: {unknown}")
+    return requested
+
+def build_case_projection(view: CaseView, fields: Optional[str] = None, required: tuple = ()) -> dict:
+    """
+    Mongo projection for a case list. An explicit fields= list wins over the named view;
+    "id" and any required fields (e.g. the sort key) are always included.
+    """
+    selected = parse_case_fields(fields) or CASE_VIEW_FIELDS[view]
+    if selected is None:
+        return {"_id": 0}
+    projection = {"_id": 0, "id": 1}
+    for field in [*selected, *required]:
+        # A parent path already covers its children (and Mongo rejects both together)
+        if not any(field == p or field.startswith(p + ".") for p in projection if p != "_id"):
+            projection = {p: v for p, v in projection.items() if not p.startswith(field + ".")}
+            projection[field] = 1
+    return projection
+
 # Case Endpoints
 @api_router.get("/cases")
 async def get_cases(
@@ -1208,8 +2031,23 @@ async def get_cases(
     team_id: Optional[str] = None,
     exclude_closed: Optional[bool] = None,
     vrm_search: Optional[str] = None,
+    page_size: Optional[int] = Query(None, ge=1, le=CASE_PAGE_SIZE_MAX, description="Enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort_by: CaseSortKey = CaseSortKey.CREATED_AT,
+    sort_order: SortOrder = SortOrder.DESC,
+    include_total: bool = False,
+    view: CaseView = CaseView.FULL,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, overrides view"),
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    List cases visible to the user. Without page_size/cursor the legacy response (a plain
+    list, capped at 1000) is returned; with either, a page of cases plus next_cursor.
+    """
+    paginate = page_size is not None or cursor is not None
+    page_size = page_size or CASE_PAGE_SIZE_DEFAULT
+    projection = build_case_projection(view, fields, required=(sort_by.value,))
+    
     query = {}
     and_conditions = []
     
@@ -1217,16 +2055,11 @@ async def get_cases(
     if exclude_closed:
         query["status"] = {"$ne": CaseStatus.CLOSED.value}
     
-    # VRM search across all vehicle case types
+    # VRM search across all vehicle case types - anchored prefix match on the indexed normalized VRMs
     if vrm_search:
-        normalized_vrm = vrm_search.replace(" ", "").upper()
-        regex_pattern = "".join([c + r"\s*" for c in normalized_vrm]).rstrip(r"\s*")
-        vrm_filter = {"$or": [
-            {"type_specific_fields.abandoned_vehicle.registration_number": {"$regex": regex_pattern, "$options": "i"}},
-            {"type_specific_fields.nuisance_vehicle.registration_number": {"$regex": regex_pattern, "$options": "i"}},
-            {"type_specific_fields.registration_number": {"$regex": regex_pattern, "$options": "i"}}
-        ]}
-        and_conditions.append(vrm_filter)
+        normalized_vrm = normalize_vrm(vrm_search)
+        if normalized_vrm:
+            and_conditions.append({"vrm_normalized": {"$regex": f"^{re.escape(normalized_vrm)}"}})
     
     # CASE TYPE VISIBILITY FILTER - Officers only see case types their team handles
     visible_case_types = await get_visible_case_types_for_user(current_user)
@@ -1235,6 +2068,9 @@ async def get_cases(
         if case_type:
             if case_type.value not in visible_case_types:
                 # User cannot see this case type, return empty
+                if paginate:
+                    return {"cases": [], "next_cursor": None, "page_size": page_size,
+                            "sort_by": sort_by.value, "sort_order": sort_order.value}
                 return []
         else:
             # Filter to only visible case types
@@ -1288,8 +2124,33 @@ async def get_cases(
         else:
             query["$and"] = and_conditions
     
-    cases = await db.cases.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return cases
+    direction = DESCENDING if sort_order == SortOrder.DESC else ASCENDING
+    sort_spec = [(sort_by.value, direction), ("id", direction)]
+    
+    if not paginate:
+        cases = await db.cases.find(query, projection).sort(sort_spec).to_list(1000)
+        return cases
+    
+    page_query = query
+    if cursor:
+        cursor_filter = decode_case_cursor(cursor, sort_by, sort_order)
+        page_query = {"$and": [query, cursor_filter]} if query else cursor_filter
+    
+    # Fetch one extra document to learn whether another page exists
+    cases = await db.cases.find(page_query, projection).sort(sort_spec).limit(page_size + 1).to_list(page_size + 1)
+    has_more = len(cases) > page_size
+    cases = cases[:page_size]
+    
+    response = {
+        "cases": cases,
+        "next_cursor": encode_case_cursor(sort_by, sort_order, cases[-1]) if has_more else None,
+        "page_size": page_size,
+        "sort_by": sort_by.value,
+        "sort_order": sort_order.value
+    }
+    if include_total:
+        response.update(await case_count_hint(query))
+    return response
 
 # IMPORTANT: This route must be before /cases/{case_id} to avoid path matching issues
 @api_router.get("/cases/check-duplicate-vrm")
@@ -1303,35 +2164,11 @@ async def check_duplicate_vrm_route(
     if not vrm:
         return {"duplicates": [], "count": 0}
     
-    # Normalize VRM - remove spaces and convert to uppercase
-    normalized_vrm = vrm.replace(" ", "").upper()
-    
-    # Create a regex pattern that matches the VRM with or without spaces
-    # e.g., "XY99ZAB" should match "XY99 ZAB", "XY 99 ZAB", etc.
-    # Insert optional space between each character
-    regex_pattern = "".join([c + r"\s*" for c in normalized_vrm]).rstrip(r"\s*")
-    
-    # Determine the nested field path based on case type
-    if case_type == "abandoned_vehicle":
-        vrm_field = "type_specific_fields.abandoned_vehicle.registration_number"
-    elif case_type in ["nuisance_vehicle", "nuisance_vehicle_sale", "nuisance_vehicle_repair", "nuisance_vehicle_abandoned"]:
-        vrm_field = "type_specific_fields.nuisance_vehicle.registration_number"
-    else:
-        vrm_field = "type_specific_fields.registration_number"
-    
-    query = {
-        "case_type": case_type,
-        vrm_field: {"$regex": f"^{regex_pattern}$", "$options": "i"}
-    }
-    
-    if exclude_case_id:
-        query["id"] = {"$ne": exclude_case_id}
+    # Normalize VRM - "XY99 ZAB", "xy 99 zab" and "XY99ZAB" are the same vehicle
+    normalized_vrm = normalize_vrm(vrm)
     
-    duplicates = await db.cases.find(
-        query,
-        {"_id": 0, "id": 1, "reference_number": 1, "status": 1, "created_at": 1, 
-         "location": 1, "description": 1}
-    ).sort("created_at", -1).limit(10).to_list(10)
+    # Served from the in-memory VRM index - called on every keystroke, so no database query
+    duplicates = await vrm_index.find([normalized_vrm], case_type, exclude_case_id)
     
     return {
         "duplicates": duplicates,
@@ -1380,7 +2217,7 @@ async def create_case(case_data: CaseCreate, current_user: dict = Depends(get_cu
     
     # Get team name if team is assigned
     if owning_team:
-        team = await db.teams.find_one({"id": owning_team}, {"_id": 0})
+        team = await team_registry.get(owning_team)
         if team:
             owning_team_name = team["name"]
     
@@ -1398,14 +2235,20 @@ async def create_case(case_data: CaseCreate, current_user: dict = Depends(get_cu
     doc['location'] = case_data.location.model_dump()
     if case_data.type_specific_fields:
         doc['type_specific_fields'] = case_data.type_specific_fields.model_dump()
+    doc['vrm_normalized'] = extract_case_vrms(doc.get('type_specific_fields'))
     
-    await db.cases.insert_one(doc)
-    await create_audit_log(case.id, "CREATED", f"Case {ref_number} created", current_user)
+    await insert_case_document(doc)
+    case.reference_number = doc['reference_number']
+    await apply_case_stats_delta(None, doc)
+    await create_audit_log(case.id, "CREATED", f"Case {case.reference_number} created", current_user)
+    if doc['vrm_normalized']:
+        vrm_index.update_case(doc)
+        await alert_vrm_watchlist(doc, doc['vrm_normalized'], current_user)
     
     return case
 
 @api_router.put("/cases/{case_id}")
-async def update_case(case_id: str, updates: CaseUpdate, current_user: dict = Depends(get_current_user)):
+async def update_case(case_id: str, updates: CaseUpdate, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     case = await db.cases.find_one({"id": case_id}, {"_id": 0})
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -1444,7 +2287,7 @@ async def update_case(case_id: str, updates: CaseUpdate, current_user: dict = De
     if updates.owning_team:
         if current_user["role"] == UserRole.OFFICER.value:
             raise HTTPException(status_code=403, detail="Officers cannot reassign case teams")
-        team = await db.teams.find_one({"id": updates.owning_team}, {"_id": 0})
+        team = await team_registry.get(updates.owning_team)
         if team:
             update_data["owning_team_name"] = team["name"]
             audit_details.append(f"Team changed to {team['name']}")
@@ -1494,6 +2337,7 @@ async def update_case(case_id: str, updates: CaseUpdate, current_user: dict = De
                         detail="Reason not cleared is required when items are not cleared"
                     )
         update_data["type_specific_fields"] = updates.type_specific_fields.model_dump()
+        update_data["vrm_normalized"] = extract_case_vrms(update_data["type_specific_fields"])
         audit_details.append("Case-specific details updated")
     
     # Handle FPN updates
@@ -1542,8 +2386,9 @@ async def update_case(case_id: str, updates: CaseUpdate, current_user: dict = De
             assignee = await db.users.find_one({"id": updates.assigned_to}, {"_id": 0, "password": 0})
             if assignee:
                 update_data["assigned_to_name"] = assignee["name"]
-                # Create notification for assignee
-                await create_notification(
+                # Notify assignee once the response has been sent
+                background_tasks.add_task(
+                    create_notification,
                     updates.assigned_to,
                     "Case Assigned",
                     f"Case {case['reference_number']} has been assigned to you",
@@ -1555,13 +2400,17 @@ async def update_case(case_id: str, updates: CaseUpdate, current_user: dict = De
     
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.cases.update_one({"id": case_id}, {"$set": update_data})
+    await update_case_with_stats(case_id, {"$set": update_data})
     
     # Create audit log with detailed changes
     if audit_details:
         await create_audit_log(case_id, "UPDATED", "; ".join(audit_details), current_user)
     
     updated_case = await db.cases.find_one({"id": case_id}, {"_id": 0})
+    vrm_index.update_case(updated_case)
+    added_vrms = [v for v in update_data.get("vrm_normalized", []) if v not in (case.get("vrm_normalized") or [])]
+    if added_vrms:
+        await alert_vrm_watchlist(updated_case, added_vrms, current_user)
     return updated_case
 
 # Dedicated location update endpoint for map pin dragging
@@ -1611,6 +2460,7 @@ async def update_case_location(case_id: str, location: LocationUpdate, current_u
     )
     
     updated_case = await db.cases.find_one({"id": case_id}, {"_id": 0})
+    vrm_index.update_case(updated_case)
     return updated_case
 
 @api_router.post("/cases/{case_id}/self-assign")
@@ -1622,8 +2472,8 @@ async def self_assign_case(case_id: str, current_user: dict = Depends(get_curren
     if case.get("assigned_to"):
         raise HTTPException(status_code=400, detail="Case is already assigned")
     
-    await db.cases.update_one(
-        {"id": case_id},
+    await update_case_with_stats(
+        case_id,
         {
             "$set": {
                 "assigned_to": current_user["id"],
@@ -1635,6 +2485,7 @@ async def self_assign_case(case_id: str, current_user: dict = Depends(get_curren
     )
     
     await create_audit_log(case_id, "SELF_ASSIGNED", f"Self-assigned by {current_user['name']}", current_user)
+    vrm_index.patch_case(case_id, {"status": CaseStatus.ASSIGNED.value})
     
     return {"message": "Case assigned successfully"}
 
@@ -1665,12 +2516,563 @@ async def add_case_note(case_id: str, note_data: CaseNoteCreate, current_user: d
     
     return note
 
+# ==================== EVIDENCE STORAGE ====================
+
+# Evidence files live outside the case_evidence documents, in a content-addressed blob store.
+EVIDENCE_STORE_BACKEND = os.environ.get('EVIDENCE_STORE', 'local')  # local | gridfs
+EVIDENCE_STORAGE_DIR = Path(os.environ.get('EVIDENCE_STORAGE_DIR', str(ROOT_DIR / 'evidence_store')))
+EVIDENCE_MAX_FILE_BYTES = int(os.environ.get('EVIDENCE_MAX_FILE_BYTES', str(100 * 1024 * 1024)))
+BLOB_CHUNK_SIZE = 1024 * 1024
+
+class BlobTooLarge(Exception):
+    """Raised while streaming a blob that exceeds its size limit"""
+
+class StoredBlob(BaseModel):
+    key: str  # SHA-256 hex digest of the content
+    size: int
+    backend: str
+
+# Called with the digest once a blob's content is known, before it is committed to storage
+BlobKeyHook = Optional[Callable[[str], Awaitable[None]]]
+
+class BlobStore(ABC):
+    """Content-addressed blob storage - identical content is stored once, keyed by its SHA-256"""
+    backend = "none"
+    
+    @abstractmethod
+    async def put_stream(self, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None,
+                         on_key: BlobKeyHook = None) -> StoredBlob:
+        """Store streamed content; on_key runs after the digest is known and before the blob is committed"""
+    
+    async def put_bytes(self, data: bytes, on_key: BlobKeyHook = None) -> StoredBlob:
+        async def single_chunk():
+            yield data
+        return await self.put_stream(single_chunk(), on_key=on_key)
+    
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None if the blob does not exist"""
+    
+    @abstractmethod
+    def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield the bytes of a blob from start to end (inclusive) in chunks"""
+    
+    async def read(self, key: str) -> bytes:
+        return b"".join([chunk async for chunk in self.open_range(key)])
+    
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove a blob; missing blobs are ignored"""
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files in a sharded directory tree: <root>/ab/cd/abcd..."""
+    backend = "local"
+    
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+    
+    def _commit(self, tmp_path: Path, key: str):
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            tmp_path.unlink()  # Same content already stored
+        else:
+            os.replace(tmp_path, path)
+    
+    async def put_stream(self, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None,
+                         on_key: BlobKeyHook = None) -> StoredBlob:
+        tmp_dir = self.root / "tmp"
+        await run_in_threadpool(tmp_dir.mkdir, parents=True, exist_ok=True)
+        tmp_path = tmp_dir / str(uuid.uuid4())
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BlobTooLarge(f"File exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    await f.write(chunk)
+            key = digest.hexdigest()
+            if on_key:
+                await on_key(key)
+            await run_in_threadpool(self._commit, tmp_path, key)
+        except BaseException:
+            await run_in_threadpool(tmp_path.unlink, missing_ok=True)
+            raise
+        return StoredBlob(key=key, size=size, backend=self.backend)
+    
+    def _size(self, key: str) -> Optional[int]:
+        try:
+            return self.path_for(key).stat().st_size
+        except FileNotFoundError:
+            return None
+    
+    async def size(self, key: str) -> Optional[int]:
+        return await run_in_threadpool(self._size, key)
+    
+    async def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.path_for(key), "rb") as f:
+            await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await f.read(BLOB_CHUNK_SIZE if remaining is None else min(BLOB_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    async def delete(self, key: str):
+        await run_in_threadpool(self.path_for(key).unlink, missing_ok=True)
+
+class GridFSBlobStore(BlobStore):
+    """Blobs in a GridFS bucket, one file per digest (the GridFS filename is the key)"""
+    backend = "gridfs"
+    
+    def __init__(self, database, bucket_name: str = "evidence"):
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name, chunk_size_bytes=255 * 1024)
+    
+    async def _find(self, key: str) -> Optional[dict]:
+        files = await self.bucket.find({"filename": key}, limit=1).to_list(1)
+        return files[0] if files else None
+    
+    async def put_stream(self, chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None,
+                         on_key: BlobKeyHook = None) -> StoredBlob:
+        # The digest is only known at the end, so upload under a temporary name and rename
+        grid_in = self.bucket.open_upload_stream(f"tmp-{uuid.uuid4()}")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise BlobTooLarge(f"File exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                await grid_in.write(chunk)
+            await grid_in.close()
+        except BaseException:
+            await grid_in.abort()
+            raise
+        key = digest.hexdigest()
+        if on_key:
+            try:
+                await on_key(key)
+            except BaseException:
+                await self.bucket.delete(grid_in._id)
+                raise
+        if await self._find(key):
+            await self.bucket.delete(grid_in._id)  # Same content already stored
+        else:
+            await self.bucket.rename(grid_in._id, key)
+        return StoredBlob(key=key, size=size, backend=self.backend)
+    
+    async def size(self, key: str) -> Optional[int]:
+        file = await self._find(key)
+        return file.length if file else None
+    
+    async def open_range(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream_by_name(key)
+        grid_out.seek(start)
+        remaining = (grid_out.length if end is None else end + 1) - start
+        while remaining > 0:
+            chunk = await grid_out.read(min(BLOB_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    
+    async def delete(self, key: str):
+        file = await self._find(key)
+        if file:
+            await self.bucket.delete(file._id)
+
+def create_blob_store(backend: str) -> BlobStore:
+    if backend == "gridfs":
+        return GridFSBlobStore(db)
+    return LocalBlobStore(EVIDENCE_STORAGE_DIR)
+
+blob_store = create_blob_store(EVIDENCE_STORE_BACKEND)
+
+async def iter_upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read an upload in fixed-size chunks instead of all at once"""
+    while True:
+        chunk = await file.read(BLOB_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+# blob_refs holds one {_id: key, refs} counter per stored blob. A blob is only deleted by the
+# release that claims a zero count (setting "deleting"), and acquiring a reference waits while
+# a claim is held, so a concurrent upload of the same content can never lose its blob.
+BLOB_REF_ACQUIRE_ATTEMPTS = 50
+
+async def acquire_blob_ref(key: str):
+    """Count one more reference to a blob; runs before an upload commits the blob"""
+    for _ in range(BLOB_REF_ACQUIRE_ATTEMPTS):
+        try:
+            await db.blob_refs.update_one({"_id": key, "deleting": {"$ne": True}}, {"$inc": {"refs": 1}}, upsert=True)
+            return
+        except DuplicateKeyError:
+            await asyncio.sleep(0.05)  # Another request is deleting this blob; store it again once it is gone
+    raise HTTPException(status_code=503, detail="Evidence storage is busy, please retry")
+
+async def store_blob(chunks: AsyncIterator[bytes], max_bytes: Optional[int] = None) -> StoredBlob:
+    """Store content in the blob store holding a reference to it"""
+    return await blob_store.put_stream(chunks, max_bytes=max_bytes, on_key=acquire_blob_ref)
+
+async def store_blob_bytes(data: bytes) -> StoredBlob:
+    return await blob_store.put_bytes(data, on_key=acquire_blob_ref)
+
+async def release_blob_ref(key: str):
+    """Drop one reference to a blob, deleting it when this was the last one"""
+    ref = await db.blob_refs.find_one_and_update(
+        {"_id": key}, {"$inc": {"refs": -1}}, return_document=ReturnDocument.AFTER
+    )
+    if ref is None or ref["refs"] > 0:
+        return
+    # Claim the zero count; if an upload took a reference in between, the claim fails and the blob stays
+    claimed = await db.blob_refs.update_one({"_id": key, "refs": {"$lte": 0}, "deleting": {"$ne": True}}, {"$set": {"deleting": True}})
+    if not claimed.modified_count:
+        return
+    try:
+        await blob_store.delete(key)
+    finally:
+        await db.blob_refs.delete_one({"_id": key, "deleting": True})
+
+async def release_evidence_blob(evidence: dict):
+    """Release the evidence blob and its previews; each is deleted once nothing else references it"""
+    if not evidence.get("storage_backend"):
+        return
+    keys = [evidence.get("sha256")] + [p.get("sha256") for p in (evidence.get("previews") or {}).values()]
+    for key in filter(None, keys):
+        await release_blob_ref(key)
+
+async def backfill_blob_refs() -> int:
+    """Migration: build blob_refs counters from evidence stored before references were counted"""
+    counts = defaultdict(int)
+    async for evidence in db.case_evidence.find(
+        {"storage_backend": {"$exists": True}}, {"_id": 0, "sha256": 1, "previews": 1}
+    ).batch_size(1000):
+        for key in [evidence.get("sha256")] + [p.get("sha256") for p in (evidence.get("previews") or {}).values()]:
+            if key:
+                counts[key] += 1
+    operations = [UpdateOne({"_id": key}, {"$set": {"refs": refs}}, upsert=True) for key, refs in counts.items()]
+    for i in range(0, len(operations), 1000):
+        await db.blob_refs.bulk_write(operations[i:i + 1000], ordered=False)
+    return len(operations)
+
+async def load_evidence_bytes(evidence: dict) -> bytes:
+    """Raw content of an evidence record, whether stored as a blob or as legacy base64"""
+    if evidence.get("storage_backend"):
+        return await blob_store.read(evidence["sha256"])
+    return base64.b64decode(evidence.get("file_data") or "")
+
+# ==================== EVIDENCE PREVIEWS ====================
+
+# Longest edge in pixels for each generated variant
+PREVIEW_SIZES = {"thumbnail": 320, "preview": 1280}
+PREVIEW_WORKERS = int(os.environ.get('PREVIEW_WORKERS', '2'))
+# Transient failures (storage timeouts, a crashed worker pool) are retried up to this many times
+PREVIEW_MAX_ATTEMPTS = int(os.environ.get('PREVIEW_MAX_ATTEMPTS', '5'))
+# What Pillow raises for content it cannot decode; these will never succeed on retry
+PREVIEW_DECODE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError)
+
+def render_image_previews(data: bytes) -> Dict[str, bytes]:
+    """
+    Downscale an image to every PREVIEW_SIZES variant as JPEG.
+    Runs in a worker process, so it must stay a picklable module-level function.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        rendered = {}
+        for variant, max_edge in PREVIEW_SIZES.items():
+            variant_image = image.copy()
+            variant_image.thumbnail((max_edge, max_edge))
+            output = io.BytesIO()
+            variant_image.save(output, format="JPEG", quality=82, optimize=True)
+            rendered[variant] = output.getvalue()
+        return rendered
+
+_preview_executor: Optional[ProcessPoolExecutor] = None
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run
+_background_tasks = set()
+
+def get_preview_executor() -> ProcessPoolExecutor:
+    global _preview_executor
+    if _preview_executor is None:
+        _preview_executor = ProcessPoolExecutor(max_workers=PREVIEW_WORKERS)
+    return _preview_executor
+
+def run_in_background(coro):
+    """Start a coroutine without awaiting it, keeping a reference until it finishes"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def is_image_evidence(evidence: dict) -> bool:
+    return (evidence.get("file_type") or "").startswith("image/")
+
+# Leading bytes -> content type for evidence whose declared type cannot be trusted
+EVIDENCE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+]
+EVIDENCE_SNIFF_BYTES = 16
+# Only these are served inline; anything else downloads as an attachment
+INLINE_EVIDENCE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "application/pdf"}
+
+def sniff_evidence_type(head: bytes) -> str:
+    """Content type from the first bytes of a file, or application/octet-stream if unrecognised"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in EVIDENCE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return "application/octet-stream"
+
+async def generate_evidence_previews(evidence_id: str):
+    """Render and store thumbnail/preview variants for one image evidence record"""
+    evidence = await db.case_evidence.find_one({"id": evidence_id}, {"_id": 0})
+    if not evidence or not is_image_evidence(evidence) or evidence.get("previews"):
+        return
+    try:
+        data = await load_evidence_bytes(evidence)
+        try:
+            rendered = await asyncio.get_running_loop().run_in_executor(get_preview_executor(), render_image_previews, data)
+        except PREVIEW_DECODE_ERRORS as e:
+            logging.warning(f"Evidence {evidence_id} is not a readable image, skipping previews: {e}")
+            # Mark it so the backfill job does not keep retrying an unreadable image
+            await db.case_evidence.update_one({"id": evidence_id}, {"$set": {"previews_failed": True}})
+            return
+    except Exception as e:
+        logging.warning(f"Preview generation failed for evidence {evidence_id}, will retry: {e}")
+        await db.case_evidence.update_one({"id": evidence_id}, {"$inc": {"preview_attempts": 1}})
+        await db.case_evidence.update_one(
+            {"id": evidence_id, "preview_attempts": {"$gte": PREVIEW_MAX_ATTEMPTS}},
+            {"$set": {"previews_failed": True}}
+        )
+        return
+    
+    previews = {}
+    for variant, content in rendered.items():
+        blob = await store_blob_bytes(content)
+        previews[variant] = {"sha256": blob.key, "file_size": blob.size, "file_type": "image/jpeg"}
+    saved = await db.case_evidence.update_one(
+        {"id": evidence_id, "previews": {"$exists": False}},
+        {"$set": {"previews": previews, "previews_generated_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    if not saved.modified_count:
+        # Evidence deleted, or previews stored by a concurrent run: drop the references just taken
+        for preview in previews.values():
+            await release_blob_ref(preview["sha256"])
+
+def schedule_evidence_previews(evidence_ids: List[str]):
+    """Generate previews after the response has been sent"""
+    async def generate_all():
+        for evidence_id in evidence_ids:
+            await generate_evidence_previews(evidence_id)
+    if evidence_ids:
+        run_in_background(generate_all())
+
+# State of the (single) running backfill, reported by the backfill endpoint
+preview_backfill_state: Dict[str, Any] = {"running": False, "processed": 0, "started_at": None, "finished_at": None}
+
+async def backfill_evidence_previews(batch_size: int = 100):
+    """Batch job: generate missing previews for all existing image evidence"""
+    preview_backfill_state.update({
+        "running": True, "processed": 0,
+        "started_at": datetime.now(timezone.utc).isoformat(), "finished_at": None
+    })
+    semaphore = asyncio.Semaphore(PREVIEW_WORKERS)
+    
+    async def generate(evidence_id: str):
+        async with semaphore:
+            await generate_evidence_previews(evidence_id)
+            preview_backfill_state["processed"] += 1
+    
+    try:
+        query = {"file_type": {"$regex": "^image/"}, "previews": {"$exists": False}, "previews_failed": {"$ne": True}}
+        cursor = db.case_evidence.find(query, {"_id": 0, "id": 1}).batch_size(batch_size)
+        batch = []
+        async for evidence in cursor:
+            batch.append(evidence["id"])
+            if len(batch) >= batch_size:
+                await asyncio.gather(*(generate(evidence_id) for evidence_id in batch))
+                batch = []
+        await asyncio.gather(*(generate(evidence_id) for evidence_id in batch))
+    finally:
+        preview_backfill_state.update({"running": False, "finished_at": datetime.now(timezone.utc).isoformat()})
+
+@api_router.post("/admin/evidence/backfill-previews")
+async def start_preview_backfill(current_user: dict = Depends(get_current_user)):
+    """Start generating missing evidence previews in the background - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can run maintenance jobs")
+    if not preview_backfill_state["running"]:
+        run_in_background(backfill_evidence_previews())
+        # Mark as running before returning so a second click does not start another job
+        preview_backfill_state["running"] = True
+    return preview_backfill_state
+
+# Evidence content URLs are signed so <img>/<video> elements can load them without a bearer header
+EVIDENCE_URL_TTL_SECONDS = int(os.environ.get('EVIDENCE_URL_TTL_SECONDS', '3600'))
+
+optional_security = HTTPBearer(auto_error=False)
+
+class EvidenceVariant(str, Enum):
+    ORIGINAL = "original"
+    THUMBNAIL = "thumbnail"
+    PREVIEW = "preview"
+
+def _evidence_url_signature(evidence_id: str, variant: EvidenceVariant, expires: int) -> str:
+    message = f"evidence:{evidence_id}:{variant.value}:{expires}".encode('utf-8')
+    return hmac.new(JWT_SECRET.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+def signed_evidence_url(evidence_id: str, variant: EvidenceVariant = EvidenceVariant.ORIGINAL) -> str:
+    """Short-lived URL for an evidence file's raw content (or one of its previews)"""
+    expires = int(time.time()) + EVIDENCE_URL_TTL_SECONDS
+    signature = _evidence_url_signature(evidence_id, variant, expires)
+    return f"/api/evidence/{evidence_id}/content?variant={variant.value}&expires={expires}&signature={signature}"
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[tuple]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end) pair.
+    Returns None to serve the whole file; raises 416 when the range cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None  # Absent, unknown unit or multi-range - full response is allowed
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            suffix = int(end_text)  # bytes=-N -> last N bytes
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+# Metadata returned by the evidence listing; file_data never leaves the database
+EVIDENCE_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "case_id": 1, "filename": 1, "file_type": 1, "sha256": 1, "storage_backend": 1,
+    "uploaded_by": 1, "uploaded_by_name": 1, "uploaded_at": 1, "previews": 1,
+    # Legacy base64 records have no stored size - derive it server-side from the encoded length
+    "file_size": {"$ifNull": ["$file_size", {"$floor": {"$multiply": [
+        {"$strLenCP": {"$ifNull": ["$file_data", ""]}}, 0.75
+    ]}}]}
+}
+
 # Case Evidence
 @api_router.get("/cases/{case_id}/evidence")
 async def get_case_evidence(case_id: str, current_user: dict = Depends(get_current_user)):
-    evidence = await db.case_evidence.find({"case_id": case_id}, {"_id": 0}).sort("uploaded_at", -1).to_list(100)
+    """List evidence metadata - content is fetched separately from content_url"""
+    evidence = await db.case_evidence.aggregate([
+        {"$match": {"case_id": case_id}},
+        {"$sort": {"uploaded_at": -1}},
+        {"$limit": 100},
+        {"$project": EVIDENCE_LIST_PROJECTION}
+    ]).to_list(100)
+    for item in evidence:
+        previews = item.pop("previews", None) or {}
+        item["content_url"] = signed_evidence_url(item["id"])
+        item["thumbnail_url"] = item["preview_url"] = None
+        if is_image_evidence(item):
+            # Until previews exist the original is served in their place
+            item["thumbnail_url"] = signed_evidence_url(item["id"], EvidenceVariant.THUMBNAIL) if "thumbnail" in previews else item["content_url"]
+            item["preview_url"] = signed_evidence_url(item["id"], EvidenceVariant.PREVIEW) if "preview" in previews else item["content_url"]
     return evidence
 
+@api_router.get("/evidence/{evidence_id}/content")
+async def get_evidence_content(
+    evidence_id: str,
+    request: Request,
+    variant: EvidenceVariant = EvidenceVariant.ORIGINAL,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Stream raw evidence bytes (or a generated preview) with ETag and single-range (206) support"""
+    signed = (
+        expires is not None and signature is not None and expires >= time.time() and
+        hmac.compare_digest(signature, _evidence_url_signature(evidence_id, variant, expires))
+    )
+    if not signed:
+        if credentials is None:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        await get_current_user(credentials)
+    
+    evidence = await db.case_evidence.find_one({"id": evidence_id}, {"_id": 0})
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    
+    media_type = evidence.get("file_type") or "application/octet-stream"
+    filename = evidence["filename"] or evidence_id
+    stored_preview = (evidence.get("previews") or {}).get(variant.value)
+    if stored_preview:
+        # Previews are always blobs, even for legacy base64 originals
+        evidence = {**evidence, **stored_preview, "storage_backend": blob_store.backend}
+        media_type = stored_preview["file_type"]
+        filename = f"{Path(filename).stem}_{variant.value}.jpg"
+    
+    if evidence.get("storage_backend"):
+        # Checked up front: a blob missing mid-stream would leave a truncated 200/206
+        size = await blob_store.size(evidence["sha256"])
+        if size is None:
+            raise HTTPException(status_code=404, detail="Evidence content not found")
+        etag = f'"{evidence["sha256"]}"'
+        legacy_content = None
+    else:
+        legacy_content = base64.b64decode(evidence.get("file_data") or "")
+        size = len(legacy_content)
+        etag = f'"{hashlib.sha256(legacy_content).hexdigest()}"'
+    
+    disposition = "inline" if media_type in INLINE_EVIDENCE_TYPES else "attachment"
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=3600",
+        "Content-Disposition": f"{disposition}; filename*=UTF-8''{quote(filename)}",
+        "X-Content-Type-Options": "nosniff"
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == etag:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    
+    start, end = byte_range if byte_range else (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    status_code = 206 if byte_range else 200
+    
+    if legacy_content is not None:
+        return Response(content=legacy_content[start:end + 1], status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        blob_store.open_range(evidence["sha256"], start, end) if size else iter([]),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
 @api_router.post("/cases/{case_id}/evidence")
 async def upload_evidence(
     case_id: str,
@@ -1681,15 +3083,19 @@ async def upload_evidence(
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
-    # Read and encode file
-    content = await file.read()
-    encoded = base64.b64encode(content).decode('utf-8')
+    # Stream the upload into the blob store in chunks
+    try:
+        blob = await store_blob(iter_upload_chunks(file), max_bytes=EVIDENCE_MAX_FILE_BYTES)
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
     evidence = CaseEvidence(
         case_id=case_id,
         filename=file.filename,
         file_type=file.content_type,
-        file_data=encoded,
+        file_size=blob.size,
+        sha256=blob.key,
+        storage_backend=blob.backend,
         uploaded_by=current_user["id"],
         uploaded_by_name=current_user["name"]
     )
@@ -1697,14 +3103,22 @@ async def upload_evidence(
     doc = evidence.model_dump()
     doc['uploaded_at'] = doc['uploaded_at'].isoformat()
     
-    await db.case_evidence.insert_one(doc)
+    try:
+        await db.case_evidence.insert_one(doc)
+    except Exception:
+        await release_blob_ref(blob.key)  # Nothing references the blob yet
+        raise
     await create_audit_log(case_id, "EVIDENCE_UPLOADED", f"Uploaded: {file.filename}", current_user)
+    if is_image_evidence(doc):
+        schedule_evidence_previews([evidence.id])
     
     # Return without file_data for response
     return {
         "id": evidence.id,
         "filename": evidence.filename,
         "file_type": evidence.file_type,
+        "file_size": evidence.file_size,
+        "sha256": evidence.sha256,
         "uploaded_by_name": evidence.uploaded_by_name,
         "uploaded_at": evidence.uploaded_at.isoformat()
     }
@@ -1714,9 +3128,13 @@ async def delete_evidence(case_id: str, evidence_id: str, current_user: dict = D
     if current_user["role"] == UserRole.OFFICER.value:
         raise HTTPException(status_code=403, detail="Officers cannot delete evidence")
     
-    result = await db.case_evidence.delete_one({"id": evidence_id, "case_id": case_id})
-    if result.deleted_count == 0:
+    evidence = await db.case_evidence.find_one_and_delete(
+        {"id": evidence_id, "case_id": case_id},
+        projection={"_id": 0, "sha256": 1, "storage_backend": 1, "previews": 1}
+    )
+    if not evidence:
         raise HTTPException(status_code=404, detail="Evidence not found")
+    await release_evidence_blob(evidence)
     
     await create_audit_log(case_id, "EVIDENCE_DELETED", f"Deleted evidence {evidence_id}", current_user)
     return {"message": "Evidence deleted"}
@@ -1724,6 +3142,11 @@ async def delete_evidence(case_id: str, evidence_id: str, current_user: dict = D
 # Audit Log
 @api_router.get("/cases/{case_id}/audit-log")
 async def get_audit_log(case_id: str, current_user: dict = Depends(get_current_user)):
+    # Include entries buffered before this request, but never wait on a sink that is retrying
+    try:
+        await asyncio.wait_for(audit_sink.flush(), AUDIT_READ_FLUSH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logging.warning(f"Audit log for case {case_id} served before the sink caught up")
     logs = await db.audit_logs.find({"case_id": case_id}, {"_id": 0}).sort("performed_at", -1).to_list(100)
     return logs
 
@@ -1754,9 +3177,21 @@ async def mark_all_notifications_read(current_user: dict = Depends(get_current_u
     )
     return {"message": "All notifications marked as read"}
 
-# Public Report Endpoint (No Auth Required)
-@api_router.post("/public/report")
-async def submit_public_report(report: PublicReport):
+# Public Report Endpoints (No Auth Required)
+
+# Limits for multipart public reports, enforced while the body is being read
+PUBLIC_REPORT_MAX_FILES = int(os.environ.get('PUBLIC_REPORT_MAX_FILES', '10'))
+PUBLIC_REPORT_MAX_FILE_BYTES = int(os.environ.get('PUBLIC_REPORT_MAX_FILE_BYTES', str(20 * 1024 * 1024)))
+PUBLIC_REPORT_MAX_TOTAL_BYTES = int(os.environ.get('PUBLIC_REPORT_MAX_TOTAL_BYTES', str(50 * 1024 * 1024)))
+PUBLIC_REPORT_MAX_FIELD_BYTES = 64 * 1024
+
+class PublicEvidenceUpload(BaseModel):
+    filename: str
+    file_type: str
+    blob: StoredBlob
+
+async def create_public_case(report: PublicReport) -> Case:
+    """Insert the case for a public report"""
     ref_number = await generate_reference_number(report.case_type)
     
     case = Case(
@@ -1777,40 +3212,396 @@ async def submit_public_report(report: PublicReport):
     doc['reporting_source'] = ReportingSource.PUBLIC.value
     if report.type_specific_fields:
         doc['type_specific_fields'] = report.type_specific_fields.model_dump()
-    
-    await db.cases.insert_one(doc)
+    doc['vrm_normalized'] = extract_case_vrms(doc.get('type_specific_fields'))
+    
+    await insert_case_document(doc)
+    case.reference_number = doc['reference_number']
+    await apply_case_stats_delta(None, doc)
+    if doc['vrm_normalized']:
+        vrm_index.update_case(doc)
+        await alert_vrm_watchlist(doc, doc['vrm_normalized'])
+    return case
+
+async def release_public_uploads(uploads: List[PublicEvidenceUpload]):
+    """Drop the references held by uploads that will not be attached to a case"""
+    for upload in uploads:
+        await release_blob_ref(upload.blob.key)
+
+async def attach_public_evidence(case: Case, uploads: List[PublicEvidenceUpload]):
+    """
+    Record stored evidence blobs against a public case in one bulk insert.
+    Takes over the uploads' references: those whose record was not written are released.
+    """
+    if not uploads:
+        return
+    docs = []
+    for upload in uploads:
+        evidence = CaseEvidence(
+            case_id=case.id,
+            filename=upload.filename,
+            file_type=upload.file_type,
+            file_size=upload.blob.size,
+            sha256=upload.blob.key,
+            storage_backend=upload.blob.backend,
+            uploaded_by="public",
+            uploaded_by_name="Public Reporter"
+        )
+        doc = evidence.model_dump()
+        doc['uploaded_at'] = doc['uploaded_at'].isoformat()
+        docs.append(doc)
+    try:
+        await db.case_evidence.insert_many(docs, ordered=False)
+    except Exception:
+        inserted = {e["id"] async for e in db.case_evidence.find({"id": {"$in": [doc["id"] for doc in docs]}}, {"_id": 0, "id": 1})}
+        for doc in docs:
+            if doc["id"] not in inserted:
+                await release_blob_ref(doc["sha256"])
+        raise
+    schedule_evidence_previews([doc["id"] for doc in docs if is_image_evidence(doc)])
+
+async def notify_public_report(case: Case):
+    """Notify supervisors about new public report"""
+    await notify_roles(
+        [UserRole.SUPERVISOR],
+        "New Public Report",
+        f"A new {case.case_type.value.replace('_', ' ')} report ({case.reference_number}) has been submitted",
+        case.id
+    )
+
+@api_router.post("/public/report")
+async def submit_public_report(report: PublicReport, background_tasks: BackgroundTasks):
+    case = await create_public_case(report)
     
     # Store evidence if provided
-    if report.evidence_files:
-        for i, file_data in enumerate(report.evidence_files):
-            evidence = CaseEvidence(
-                case_id=case.id,
-                filename=f"public_upload_{i+1}",
-                file_type="image/jpeg",
-                file_data=file_data,
-                uploaded_by="public",
-                uploaded_by_name="Public Reporter"
-            )
-            ev_doc = evidence.model_dump()
-            ev_doc['uploaded_at'] = ev_doc['uploaded_at'].isoformat()
-            await db.case_evidence.insert_one(ev_doc)
-    
-    # Notify supervisors about new public report
-    supervisors = await db.users.find({"role": UserRole.SUPERVISOR.value}, {"_id": 0}).to_list(100)
-    for supervisor in supervisors:
-        await create_notification(
-            supervisor["id"],
-            "New Public Report",
-            f"A new {report.case_type.value.replace('_', ' ')} report ({ref_number}) has been submitted",
-            case.id
-        )
+    uploads = []
+    try:
+        for i, file_data in enumerate(report.evidence_files or []):
+            if file_data.startswith("data:") and "," in file_data:
+                file_data = file_data.split(",", 1)[1]  # Tolerate data: URLs
+            try:
+                content = base64.b64decode(file_data, validate=True)
+            except ValueError:
+                logging.warning(f"Skipping undecodable public evidence file {i+1} on {case.reference_number}")
+                continue
+            blob = await store_blob_bytes(content)
+            uploads.append(PublicEvidenceUpload(
+                filename=f"public_upload_{i+1}", file_type=sniff_evidence_type(content[:EVIDENCE_SNIFF_BYTES]), blob=blob
+            ))
+    except Exception:
+        await release_public_uploads(uploads)
+        raise
+    await attach_public_evidence(case, uploads)
+    
+    background_tasks.add_task(notify_public_report, case)  # Fan-out runs after the response is sent
+    
+    return {
+        "message": "Report submitted successfully",
+        "reference_number": case.reference_number
+    }
+
+async def _stream_part_to_blob_store(queue: asyncio.Queue) -> StoredBlob:
+    """Consume one multipart file part from a queue into the blob store"""
+    async def chunks():
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            yield chunk
+    return await store_blob(chunks())
+
+async def _put_part_chunk(part: dict, chunk: Optional[bytes]):
+    """Hand a chunk to a part's blob writer, re-raising the writer's error if it has stopped"""
+    if not part["task"].done() and not part["queue"].full():
+        part["queue"].put_nowait(chunk)
+        return
+    put = asyncio.ensure_future(part["queue"].put(chunk))
+    await asyncio.wait({put, part["task"]}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+    if part["task"].done():
+        part["task"].result()
+        if chunk is not None:
+            raise RuntimeError(f"Blob writer for {part['filename']} stopped before the part ended")
+
+def parse_public_report_field(raw: bytes) -> PublicReport:
+    try:
+        return PublicReport.model_validate_json(raw or b"{}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+async def read_public_report_multipart(request: Request) -> tuple:
+    """
+    Parse a multipart public report straight off the request stream.
+    The "report" field must come first and is validated before any file is stored. File parts
+    are then piped chunk by chunk into the blob store while size caps are checked, so memory
+    stays flat however large the attachments are; their type is sniffed from the content.
+    Returns the validated report and the stored uploads.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data")
+    
+    # Parser callbacks are synchronous, so they only record events; the loop below acts on them
+    events = []
+    headers: Dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+    
+    callbacks = {
+        "on_part_begin": lambda: headers.clear(),
+        "on_header_field": lambda data, start, end: header_field.extend(data[start:end]),
+        "on_header_value": lambda data, start, end: header_value.extend(data[start:end]),
+        "on_header_end": on_header_end,
+        "on_headers_finished": lambda: events.append(("begin", dict(headers))),
+        "on_part_data": lambda data, start, end: events.append(("data", bytes(data[start:end]))),
+        "on_part_end": lambda: events.append(("end", None)),
+    }
+    parser = MultipartParser(params[b"boundary"], callbacks)
+    
+    report_field = bytearray()
+    report: Optional[PublicReport] = None
+    uploads: List[PublicEvidenceUpload] = []
+    total_bytes = 0
+    part = None  # {"kind", "filename", "head", "size", "queue", "task"}
+    completed = False
+    
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+            for kind, payload in events:
+                if kind == "begin":
+                    _, disposition = parse_options_header(payload.get(b"content-disposition", b""))
+                    name = disposition.get(b"name", b"").decode("utf-8", "replace")
+                    filename = disposition.get(b"filename")
+                    if filename is None:
+                        part = {"kind": "field", "name": name}
+                        continue
+                    if report is None:
+                        raise HTTPException(status_code=400, detail="The report field must come before any files")
+                    if len(uploads) >= PUBLIC_REPORT_MAX_FILES:
+                        raise HTTPException(status_code=413, detail=f"At most {PUBLIC_REPORT_MAX_FILES} files per report")
+                    queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+                    part = {
+                        "kind": "file",
+                        "filename": Path(filename.decode("utf-8", "replace")).name or f"public_upload_{len(uploads) + 1}",
+                        "head": bytearray(),  # The declared content type is ignored
+                        "size": 0,
+                        "queue": queue,
+                        "task": asyncio.create_task(_stream_part_to_blob_store(queue))
+                    }
+                elif kind == "data" and part is not None:
+                    if part["kind"] == "field":
+                        if part["name"] == "report":
+                            report_field.extend(payload)
+                            if len(report_field) > PUBLIC_REPORT_MAX_FIELD_BYTES:
+                                raise HTTPException(status_code=413, detail="Report field too large")
+                        continue
+                    if len(part["head"]) < EVIDENCE_SNIFF_BYTES:
+                        part["head"].extend(payload[:EVIDENCE_SNIFF_BYTES - len(part["head"])])
+                    part["size"] += len(payload)
+                    total_bytes += len(payload)
+                    if part["size"] > PUBLIC_REPORT_MAX_FILE_BYTES:
+                        raise HTTPException(status_code=413, detail=f"{part['filename']} exceeds {PUBLIC_REPORT_MAX_FILE_BYTES} bytes")
+                    if total_bytes > PUBLIC_REPORT_MAX_TOTAL_BYTES:
+                        raise HTTPException(status_code=413, detail=f"Attachments exceed {PUBLIC_REPORT_MAX_TOTAL_BYTES} bytes in total")
+                    await _put_part_chunk(part, payload)  # Bounded queue - waits for the blob writer
+                elif kind == "end" and part is not None:
+                    if part["kind"] == "file":
+                        await _put_part_chunk(part, None)
+                        blob = await part["task"]
+                        uploads.append(PublicEvidenceUpload(
+                            filename=part["filename"], file_type=sniff_evidence_type(bytes(part["head"])), blob=blob
+                        ))
+                    elif part["name"] == "report":
+                        report = parse_public_report_field(bytes(report_field))
+                    part = None
+            events.clear()
+        try:
+            parser.finalize()
+        except MultipartParseError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+        if part is not None:
+            raise HTTPException(status_code=400, detail="Multipart body ended before the closing boundary")
+        if report is None:
+            report = parse_public_report_field(bytes(report_field))
+        completed = True
+    finally:
+        if not completed:
+            # Abandon the part being written (its writer would otherwise wait on the queue forever)
+            # and release blobs already stored for this request
+            if part is not None and part["kind"] == "file":
+                part["task"].cancel()
+                finished = (await asyncio.gather(part["task"], return_exceptions=True))[0]
+                if isinstance(finished, StoredBlob):
+                    uploads.append(PublicEvidenceUpload(filename=part["filename"], file_type="", blob=finished))
+            for upload in uploads:
+                await release_evidence_blob({"sha256": upload.blob.key, "storage_backend": upload.blob.backend})
+    
+    return report, uploads
+
+@api_router.post("/public/report/multipart")
+async def submit_public_report_multipart(request: Request, background_tasks: BackgroundTasks):
+    """
+    Public report with evidence as multipart file parts instead of base64 JSON.
+    Form fields: "report" (PublicReport JSON, evidence_files ignored) followed by any number of file parts.
+    """
+    report, uploads = await read_public_report_multipart(request)
+    try:
+        case = await create_public_case(report)
+    except Exception:
+        await release_public_uploads(uploads)
+        raise
+    await attach_public_evidence(case, uploads)
+    background_tasks.add_task(notify_public_report, case)  # Fan-out runs after the response is sent
     
     return {
         "message": "Report submitted successfully",
-        "reference_number": ref_number
+        "reference_number": case.reference_number,
+        "evidence_count": len(uploads)
     }
 
+# ==================== CASE STATISTICS ROLLUP ====================
+
+# case_stats holds one row per (case_type, status, owning_team, assigned_to, creation day) with a
+# case count. Case write paths apply +1/-1 deltas as a case moves between keys.
+CASE_STATS_KEY_FIELDS = ["case_type", "status", "owning_team", "assigned_to"]
+CASE_STATS_PROJECTION = {"_id": 0, "created_at": 1, "assigned_to_name": 1, **{f: 1 for f in CASE_STATS_KEY_FIELDS}}
+
+def case_stats_key(case: dict) -> dict:
+    """
+    Rollup key for a case document: missing key fields and a missing or empty created_at
+    become None. rebuild_case_stats must produce the same keys.
+    """
+    key = {field: case.get(field) for field in CASE_STATS_KEY_FIELDS}
+    created_at = case.get("created_at")
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    key["day"] = created_at[:10] if created_at else None
+    return key
+
+async def apply_case_stats_delta(before: Optional[dict], after: Optional[dict]):
+    """Move one case between rollup rows; before/after are None for inserts/deletes"""
+    before_key = case_stats_key(before) if before else None
+    after_key = case_stats_key(after) if after else None
+    if before_key == after_key:
+        return
+    operations = []
+    if before_key:
+        operations.append(UpdateOne(before_key, {"$inc": {"count": -1}}, upsert=True))
+    if after_key:
+        update = {"$inc": {"count": 1}}
+        if after.get("assigned_to_name"):
+            update["$set"] = {"assigned_to_name": after["assigned_to_name"]}
+        operations.append(UpdateOne(after_key, update, upsert=True))
+    try:
+        try:
+            await db.case_stats.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Concurrent upserts of a new row can collide on the unique key; the row exists now, so retry those
+            retry = [operations[err["index"]] for err in e.details.get("writeErrors", []) if err.get("code") == 11000]
+            if len(retry) != len(e.details.get("writeErrors", [])):
+                raise
+            await db.case_stats.bulk_write(retry, ordered=False)
+    except Exception as e:
+        # The case write has already happened; a rebuild will correct the rollup
+        logging.error(f"Failed to update case_stats rollup: {e}")
+
+async def update_case_with_stats(case_id: str, update: dict) -> Optional[dict]:
+    """Apply an update to a case and move it between rollup rows using the atomic pre-image"""
+    before = await db.cases.find_one_and_update(
+        {"id": case_id}, update, projection=CASE_STATS_PROJECTION, return_document=ReturnDocument.BEFORE
+    )
+    if before is not None:
+        after = {**before, **{k: v for k, v in update.get("$set", {}).items() if k in CASE_STATS_PROJECTION}}
+        await apply_case_stats_delta(before, after)
+    return before
+
+async def rebuild_case_stats() -> int:
+    """
+    Recompute case_stats from the cases collection, replacing it in one $out.
+    Deltas applied while the aggregation runs are overwritten by $out, and case writes it
+    has already read may be counted twice, so run it when writes are quiet; running it again
+    corrects any drift.
+    """
+    created_at = {"$ifNull": ["$created_at", ""]}
+    await db.cases.aggregate([
+        {"$group": {
+            "_id": {
+                **{field: {"$ifNull": [f"${field}", None]} for field in CASE_STATS_KEY_FIELDS},
+                # Same key as case_stats_key: first ten characters, None when missing or empty
+                "day": {"$cond": [{"$eq": [created_at, ""]}, None, {"$substrCP": [created_at, 0, 10]}]}
+            },
+            "count": {"$sum": 1},
+            "assigned_to_name": {"$max": "$assigned_to_name"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "case_type": "$_id.case_type",
+            "status": "$_id.status",
+            "owning_team": "$_id.owning_team",
+            "assigned_to": "$_id.assigned_to",
+            "day": "$_id.day",
+            "count": 1,
+            "assigned_to_name": 1
+        }},
+        {"$out": "case_stats"}
+    ]).to_list(None)
+    return await db.case_stats.count_documents({})
+
+@api_router.post("/admin/stats/rebuild")
+async def rebuild_case_stats_endpoint(current_user: dict = Depends(get_current_user)):
+    """Recompute the case statistics rollup from scratch - managers only; best run while writes are quiet"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can rebuild statistics")
+    started = time.perf_counter()
+    rows = await rebuild_case_stats()
+    return {"rows": rows, "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+
 # Statistics Endpoints
+def stats_overview_pipeline(query: dict, rollup: bool = False) -> List[dict]:
+    """
+    Single-pass $facet pipeline behind /stats/overview.
+    Runs over raw cases, or over case_stats rows (weighted by their count) when rollup is set.
+    """
+    weight = "$count" if rollup else 1
+    if rollup:
+        query = {**query, "count": {"$gt": 0}}
+    pipeline = [{"$match": query}] if query else []
+    pipeline += [
+        {"$project": {"_id": 0, "case_type": 1, "status": 1, "assigned_to": 1, "count": 1}},
+        {"$facet": {
+            "by_type": [{"$group": {"_id": "$case_type", "count": {"$sum": weight}}}],
+            "by_status": [{"$group": {
+                "_id": "$status",
+                "count": {"$sum": weight},
+                "unassigned": {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$assigned_to", None]}, None]}, weight, 0]}}
+            }}]
+        }}
+    ]
+    return pipeline
+
+def summarize_stats_overview(facets: dict) -> dict:
+    """Turn the $facet output into the /stats/overview response"""
+    cases_by_status = {item["_id"]: item["count"] for item in facets["by_status"]}
+    total_cases = sum(cases_by_status.values())
+    closed_cases = cases_by_status.get(CaseStatus.CLOSED.value, 0)
+    return {
+        "total_cases": total_cases,
+        "open_cases": total_cases - closed_cases,
+        "closed_cases": closed_cases,
+        "unassigned_cases": sum(item["unassigned"] for item in facets["by_status"]),
+        "cases_by_type": {item["_id"]: item["count"] for item in facets["by_type"]},
+        "cases_by_status": cases_by_status
+    }
+
 @api_router.get("/stats/overview")
 async def get_stats_overview(current_user: dict = Depends(get_current_user)):
     # Build query based on user's visibility
@@ -1822,42 +3613,9 @@ async def get_stats_overview(current_user: dict = Depends(get_current_user)):
         if visible_case_types is not None:
             query["case_type"] = {"$in": visible_case_types}
     
-    total_cases = await db.cases.count_documents(query)
-    open_query = {**query, "status": {"$ne": CaseStatus.CLOSED.value}}
-    open_cases = await db.cases.count_documents(open_query)
-    closed_query = {**query, "status": CaseStatus.CLOSED.value}
-    closed_cases = await db.cases.count_documents(closed_query)
-    unassigned_query = {**query, "assigned_to": None}
-    unassigned_cases = await db.cases.count_documents(unassigned_query)
-    
-    # Cases by type (filtered for officers)
-    pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$case_type", "count": {"$sum": 1}}}
-    ]
-    if not query:
-        pipeline = [{"$group": {"_id": "$case_type", "count": {"$sum": 1}}}]
-    by_type = await db.cases.aggregate(pipeline).to_list(20)
-    cases_by_type = {item["_id"]: item["count"] for item in by_type}
-    
-    # Cases by status (filtered for officers)
-    pipeline = [
-        {"$match": query} if query else {"$match": {}},
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    if not query:
-        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
-    by_status = await db.cases.aggregate(pipeline).to_list(20)
-    cases_by_status = {item["_id"]: item["count"] for item in by_status}
-    
-    return {
-        "total_cases": total_cases,
-        "open_cases": open_cases,
-        "closed_cases": closed_cases,
-        "unassigned_cases": unassigned_cases,
-        "cases_by_type": cases_by_type,
-        "cases_by_status": cases_by_status
-    }
+    # One round trip over the rollup: the visibility filter is applied once, then every count comes from the same pass
+    results = await db.case_stats.aggregate(stats_overview_pipeline(query, rollup=True)).to_list(1)
+    return summarize_stats_overview(results[0])
 
 @api_router.get("/stats/officer-workload")
 async def get_officer_workload(current_user: dict = Depends(get_current_user)):
@@ -1865,19 +3623,57 @@ async def get_officer_workload(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
     pipeline = [
-        {"$match": {"assigned_to": {"$ne": None}}},
+        {"$match": {"assigned_to": {"$ne": None}, "count": {"$gt": 0}}},
         {"$group": {
             "_id": "$assigned_to",
-            "assigned_name": {"$first": "$assigned_to_name"},
-            "total": {"$sum": 1},
-            "open": {"$sum": {"$cond": [{"$ne": ["$status", CaseStatus.CLOSED.value]}, 1, 0]}},
-            "closed": {"$sum": {"$cond": [{"$eq": ["$status", CaseStatus.CLOSED.value]}, 1, 0]}}
+            "assigned_name": {"$max": "$assigned_to_name"},
+            "total": {"$sum": "$count"},
+            "open": {"$sum": {"$cond": [{"$ne": ["$status", CaseStatus.CLOSED.value]}, "$count", 0]}},
+            "closed": {"$sum": {"$cond": [{"$eq": ["$status", CaseStatus.CLOSED.value]}, "$count", 0]}}
         }}
     ]
     
-    workload = await db.cases.aggregate(pipeline).to_list(100)
+    workload = await db.case_stats.aggregate(pipeline).to_list(100)
     return workload
 
+# CSV exports are streamed from a cursor, so memory use does not grow with the number of rows
+CSV_EXPORT_BATCH_SIZE = 1000
+CSV_EXPORT_FLUSH_ROWS = 500
+CASE_EXPORT_FIELDS = ["reference_number", "case_type", "status", "description", "assigned_to_name", "created_at", "updated_at", "closed_at"]
+FPN_EXPORT_FIELDS = [
+    "reference_number", "case_type", "status", "fpn_ref", "date_issued",
+    "fpn_amount", "paid", "date_paid", "pay_reference", "assigned_to_name"
+]
+
+async def stream_csv(cursor, fieldnames: List[str], row_builder=None) -> AsyncIterator[bytes]:
+    """Write CSV rows from a cursor, yielding encoded chunks every CSV_EXPORT_FLUSH_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    
+    def drain() -> bytes:
+        chunk = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+    
+    writer.writeheader()
+    yield drain()  # Header goes out before the first batch is fetched
+    rows = 0
+    async for doc in cursor:
+        writer.writerow(row_builder(doc) if row_builder else doc)
+        rows += 1
+        if rows % CSV_EXPORT_FLUSH_ROWS == 0:
+            yield drain()
+    if buffer.tell():
+        yield drain()
+
+def csv_streaming_response(chunks: AsyncIterator[bytes], filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @api_router.get("/stats/export-csv")
 async def export_cases_csv(
     start_date: Optional[str] = None,
@@ -1896,26 +3692,50 @@ async def export_cases_csv(
         else:
             query["created_at"] = {"$lte": end_date}
     
-    cases = await db.cases.find(query, {"_id": 0}).to_list(10000)
-    
-    # Generate CSV
-    import csv
-    import io
+    cursor = db.cases.find(query, {"_id": 0, **{f: 1 for f in CASE_EXPORT_FIELDS}}) \
+        .sort([("created_at", ASCENDING), ("id", ASCENDING)]).batch_size(CSV_EXPORT_BATCH_SIZE)
     
-    output = io.StringIO()
-    if cases:
-        fieldnames = ["reference_number", "case_type", "status", "description", "assigned_to_name", "created_at", "updated_at", "closed_at"]
-        writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        for case in cases:
-            writer.writerow(case)
-    
-    return {
-        "csv_data": output.getvalue(),
-        "filename": f"cases_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    }
+    return csv_streaming_response(
+        stream_csv(cursor, CASE_EXPORT_FIELDS),
+        f"cases_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    )
 
 # FPN Reports
+def fpn_stats_pipeline(query: dict) -> List[dict]:
+    """Totals, by-case-type and by-month (YYYY-MM of date_issued) FPN figures in one pass"""
+    date_issued = {"$ifNull": ["$fpn_details.date_issued", ""]}
+    return [
+        {"$match": query},
+        {"$project": {
+            "_id": 0,
+            "case_type": {"$ifNull": ["$case_type", "unknown"]},
+            "amount": {"$ifNull": ["$fpn_details.fpn_amount", 0]},
+            "paid": {"$cond": [{"$ifNull": ["$fpn_details.paid", False]}, 1, 0]},
+            "month": {"$cond": [{"$eq": [date_issued, ""]}, None, {"$substrCP": [date_issued, 0, 7]}]}
+        }},
+        {"$facet": {
+            "summary": [{"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "paid": {"$sum": "$paid"},
+                "amount_due": {"$sum": "$amount"},
+                "collected": {"$sum": {"$cond": [{"$eq": ["$paid", 1]}, "$amount", 0]}},
+                "outstanding": {"$sum": {"$cond": [{"$eq": ["$paid", 0]}, "$amount", 0]}}
+            }}],
+            "by_case_type": [{"$group": {
+                "_id": "$case_type",
+                "count": {"$sum": 1},
+                "amount": {"$sum": "$amount"},
+                "paid": {"$sum": "$paid"}
+            }}],
+            "monthly": [
+                {"$match": {"month": {"$ne": None}}},
+                {"$group": {"_id": "$month", "issued": {"$sum": 1}, "paid": {"$sum": "$paid"}, "amount": {"$sum": "$amount"}}},
+                {"$sort": {"_id": 1}}
+            ]
+        }}
+    ]
+
 @api_router.get("/stats/fpn")
 async def get_fpn_stats(
     start_date: Optional[str] = None,
@@ -1936,65 +3756,31 @@ async def get_fpn_stats(
         else:
             query["fpn_details.date_issued"] = {"$lte": end_date}
     
-    # Get all FPN cases
-    fpn_cases = await db.cases.find(query, {"_id": 0}).to_list(10000)
-    
-    # Calculate statistics
-    total_fpns = len(fpn_cases)
-    paid_fpns = [c for c in fpn_cases if c.get("fpn_details", {}).get("paid", False)]
-    outstanding_fpns = [c for c in fpn_cases if not c.get("fpn_details", {}).get("paid", False)]
-    
-    total_amount_due = sum(
-        c.get("fpn_details", {}).get("fpn_amount", 0) or 0 
-        for c in fpn_cases
-    )
-    total_collected = sum(
-        c.get("fpn_details", {}).get("fpn_amount", 0) or 0 
-        for c in paid_fpns
-    )
-    total_outstanding = sum(
-        c.get("fpn_details", {}).get("fpn_amount", 0) or 0 
-        for c in outstanding_fpns
-    )
+    facets = (await db.cases.aggregate(fpn_stats_pipeline(query)).to_list(1))[0]
+    totals = facets["summary"][0] if facets["summary"] else {"total": 0, "paid": 0, "amount_due": 0, "collected": 0, "outstanding": 0}
+    total_fpns = totals["total"]
     
     # Payment rate
-    payment_rate = (len(paid_fpns) / total_fpns * 100) if total_fpns > 0 else 0
-    
-    # FPNs by case type
-    by_case_type = {}
-    for c in fpn_cases:
-        ct = c.get("case_type", "unknown")
-        if ct not in by_case_type:
-            by_case_type[ct] = {"count": 0, "amount": 0, "paid": 0}
-        by_case_type[ct]["count"] += 1
-        by_case_type[ct]["amount"] += c.get("fpn_details", {}).get("fpn_amount", 0) or 0
-        if c.get("fpn_details", {}).get("paid", False):
-            by_case_type[ct]["paid"] += 1
-    
-    # Monthly breakdown (last 12 months)
-    from collections import defaultdict
-    monthly_stats = defaultdict(lambda: {"issued": 0, "paid": 0, "amount": 0})
-    for c in fpn_cases:
-        date_issued = c.get("fpn_details", {}).get("date_issued")
-        if date_issued:
-            month_key = date_issued[:7]  # YYYY-MM
-            monthly_stats[month_key]["issued"] += 1
-            monthly_stats[month_key]["amount"] += c.get("fpn_details", {}).get("fpn_amount", 0) or 0
-            if c.get("fpn_details", {}).get("paid", False):
-                monthly_stats[month_key]["paid"] += 1
+    payment_rate = (totals["paid"] / total_fpns * 100) if total_fpns > 0 else 0
     
     return {
         "summary": {
             "total_fpns": total_fpns,
-            "paid_fpns": len(paid_fpns),
-            "outstanding_fpns": len(outstanding_fpns),
-            "total_amount_due": total_amount_due,
-            "total_collected": total_collected,
-            "total_outstanding": total_outstanding,
+            "paid_fpns": totals["paid"],
+            "outstanding_fpns": total_fpns - totals["paid"],
+            "total_amount_due": totals["amount_due"],
+            "total_collected": totals["collected"],
+            "total_outstanding": totals["outstanding"],
             "payment_rate": round(payment_rate, 1)
         },
-        "by_case_type": by_case_type,
-        "monthly_breakdown": dict(monthly_stats)
+        "by_case_type": {
+            item["_id"]: {"count": item["count"], "amount": item["amount"], "paid": item["paid"]}
+            for item in facets["by_case_type"]
+        },
+        "monthly_breakdown": {
+            item["_id"]: {"issued": item["issued"], "paid": item["paid"], "amount": item["amount"]}
+            for item in facets["monthly"]
+        }
     }
 
 @api_router.get("/stats/fpn/outstanding")
@@ -2034,22 +3820,14 @@ async def export_fpn_csv(
     if current_user["role"] != UserRole.MANAGER.value:
         raise HTTPException(status_code=403, detail="Only managers can export data")
     
-    fpn_cases = await db.cases.find({"fpn_issued": True}, {"_id": 0}).to_list(10000)
-    
-    import csv
-    import io
-    
-    output = io.StringIO()
-    fieldnames = [
-        "reference_number", "case_type", "status", "fpn_ref", "date_issued", 
-        "fpn_amount", "paid", "date_paid", "pay_reference", "assigned_to_name"
-    ]
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
+    cursor = db.cases.find(
+        {"fpn_issued": True},
+        {"_id": 0, "reference_number": 1, "case_type": 1, "status": 1, "assigned_to_name": 1, "fpn_details": 1}
+    ).sort("fpn_details.date_issued", ASCENDING).batch_size(CSV_EXPORT_BATCH_SIZE)
     
-    for case in fpn_cases:
+    def fpn_row(case: dict) -> dict:
         fpn_details = case.get("fpn_details", {}) or {}
-        row = {
+        return {
             "reference_number": case.get("reference_number"),
             "case_type": case.get("case_type"),
             "status": case.get("status"),
@@ -2061,12 +3839,533 @@ async def export_fpn_csv(
             "pay_reference": fpn_details.get("pay_reference"),
             "assigned_to_name": case.get("assigned_to_name")
         }
-        writer.writerow(row)
     
-    return {
-        "csv_data": output.getvalue(),
-        "filename": f"fpn_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return csv_streaming_response(
+        stream_csv(cursor, FPN_EXPORT_FIELDS, fpn_row),
+        f"fpn_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    )
+
+# ==================== COLUMNAR EXPORT ====================
+
+# Cases exported as Parquet or Arrow IPC for BI tools. Nested sub-models are flattened into typed
+# columns (location_latitude, fpn_details_fpn_amount, fly_tipping_vehicle_details_make, ...).
+# pyarrow is optional; without it the endpoint answers 501.
+COLUMNAR_EXPORT_ROW_GROUP_SIZE = int(os.environ.get('COLUMNAR_EXPORT_ROW_GROUP_SIZE', '50000'))
+COLUMNAR_EXPORT_EXCLUDED_FIELDS = {"location_history"}  # Free-form audit trail, not tabular
+# Prefixes dropped from flattened column names
+COLUMNAR_EXPORT_PATH_ALIASES = {"type_specific_fields": None}
+# String fields that hold calendar dates or timestamps in practice
+COLUMNAR_EXPORT_TYPE_OVERRIDES = {
+    ("w3w_cached_at",): "timestamp",
+    ("fpn_details", "date_issued"): "date",
+    ("fpn_details", "date_paid"): "date",
+    ("type_specific_fields", "untidy_land", "notice_date"): "date",
+    ("type_specific_fields", "untidy_land", "compliance_deadline"): "date",
+    ("type_specific_fields", "clearance_outcome", "clearance_date"): "date",
+}
+
+class ColumnarFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return args[0] if len(args) == 1 else annotation
+    return annotation
+
+def _column_kind(annotation) -> Optional[str]:
+    """Map a field annotation to an export column kind, or None if it is not exportable"""
+    if get_origin(annotation) in (list, List):
+        return "string_list" if get_args(annotation) and get_args(annotation)[0] is str else None
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return "enum"
+        if issubclass(annotation, bool):
+            return "bool"
+        for base, kind in ((int, "int"), (float, "float"), (datetime, "timestamp"), (str, "string")):
+            if issubclass(annotation, base):
+                return kind
+    return None
+
+def columnar_export_columns(model=Case, path: tuple = ()) -> List[tuple]:
+    """(path, column name, kind, annotation) for every scalar field of the case model, nested models flattened"""
+    columns = []
+    for name, field in model.model_fields.items():
+        if not path and name in COLUMNAR_EXPORT_EXCLUDED_FIELDS:
+            continue
+        field_path = path + (name,)
+        annotation = _unwrap_optional(field.annotation)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            columns.extend(columnar_export_columns(annotation, field_path))
+            continue
+        kind = COLUMNAR_EXPORT_TYPE_OVERRIDES.get(field_path) or _column_kind(annotation)
+        if kind is None:
+            continue
+        parts = [COLUMNAR_EXPORT_PATH_ALIASES.get(p, p) for p in field_path]
+        columns.append((field_path, "_".join(p for p in parts if p), kind, annotation))
+    return columns
+
+def _to_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
+
+def _to_number(cast):
+    def convert(value):
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+    return convert
+
+COLUMN_CONVERTERS = {
+    "string": lambda v: None if v is None else str(v),
+    "enum": lambda v: None if v is None else str(v.value if isinstance(v, Enum) else v),
+    "bool": lambda v: v if isinstance(v, bool) else None,
+    "int": _to_number(int),
+    "float": _to_number(float),
+    "timestamp": _to_timestamp,
+    "date": _to_date,
+    "string_list": lambda v: [str(x) for x in v] if isinstance(v, list) else None,
+}
+
+def _lookup(doc: dict, path: tuple):
+    for part in path:
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+class _ByteSink:
+    """Write-only file object that hands written bytes back to a streaming response"""
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return False
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ColumnarCaseWriter:
+    """Converts batches of case documents to Arrow record batches and writes them as Parquet row groups or IPC batches"""
+    def __init__(self, pa, export_format: ColumnarFormat):
+        self.pa = pa
+        self.columns = columnar_export_columns()
+        arrow_types = {
+            "string": pa.string(),
+            "enum": pa.dictionary(pa.int32(), pa.string()),
+            "bool": pa.bool_(),
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "timestamp": pa.timestamp("us", tz="UTC"),
+            "date": pa.date32(),
+            "string_list": pa.list_(pa.string()),
+        }
+        self.schema = pa.schema([pa.field(name, arrow_types[kind]) for _, name, kind, _ in self.columns])
+        # Enum columns share one fixed dictionary across batches (IPC files cannot replace dictionaries)
+        self.enum_dictionaries = {
+            name: (pa.array([e.value for e in annotation], type=pa.string()), {e.value: i for i, e in enumerate(annotation)})
+            for _, name, kind, annotation in self.columns if kind == "enum"
+        }
+        self.sink = _ByteSink()
+        if export_format == ColumnarFormat.PARQUET:
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(self.sink, self.schema)
+    
+    def write(self, docs: List[dict]) -> bytes:
+        arrays = []
+        for (path, name, kind, _), field in zip(self.columns, self.schema):
+            convert = COLUMN_CONVERTERS[kind]
+            values = [convert(_lookup(doc, path)) for doc in docs]
+            if kind == "enum":
+                dictionary, codes = self.enum_dictionaries[name]
+                indices = self.pa.array([codes.get(v) for v in values], type=self.pa.int32())
+                arrays.append(self.pa.DictionaryArray.from_arrays(indices, dictionary))
+            else:
+                arrays.append(self.pa.array(values, type=field.type))
+        self._writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        return self.sink.drain()
+    
+    def close(self) -> bytes:
+        self._writer.close()
+        return self.sink.drain()
+
+def load_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow to be installed on the server")
+
+async def stream_columnar_cases(cursor, writer: ColumnarCaseWriter) -> AsyncIterator[bytes]:
+    """Pull the cursor in row-group sized batches; conversion and encoding run off the event loop"""
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= COLUMNAR_EXPORT_ROW_GROUP_SIZE:
+            yield await asyncio.to_thread(writer.write, batch)
+            batch = []
+    if batch:
+        yield await asyncio.to_thread(writer.write, batch)
+    yield await asyncio.to_thread(writer.close)
+
+@api_router.get("/stats/export-columnar")
+async def export_cases_columnar(
+    format: ColumnarFormat = ColumnarFormat.PARQUET,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    team: Optional[str] = Query(None, description="Owning team ID"),
+    case_type: Optional[List[CaseType]] = Query(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Export cases with typed, flattened columns as Parquet or Arrow IPC - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can export data")
+    pa = load_pyarrow()
+    
+    query = {}
+    if start_date or end_date:
+        query["created_at"] = {}
+        if start_date:
+            query["created_at"]["$gte"] = start_date
+        if end_date:
+            query["created_at"]["$lte"] = end_date
+    if team:
+        query["owning_team"] = team
+    if case_type:
+        query["case_type"] = {"$in": [ct.value for ct in case_type]}
+    
+    writer = ColumnarCaseWriter(pa, format)
+    projection = {"_id": 0, **{path[0]: 1 for path, _, _, _ in writer.columns}}
+    cursor = db.cases.find(query, projection).sort([("created_at", ASCENDING), ("id", ASCENDING)]) \
+        .batch_size(min(COLUMNAR_EXPORT_ROW_GROUP_SIZE, 10000))
+    
+    extension, media_type = {
+        ColumnarFormat.PARQUET: ("parquet", "application/vnd.apache.parquet"),
+        ColumnarFormat.ARROW: ("arrow", "application/vnd.apache.arrow.file"),
+    }[format]
+    filename = f"cases_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        stream_columnar_cases(cursor, writer),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# ==================== PERSON SEARCH INDEX ====================
+
+PERSON_SEARCH_FIELDS = ("first_name", "last_name", "email", "phone")
+PERSON_SEARCH_PREFIX_LENGTH = 2  # queries shorter than a trigram match word prefixes
+PERSON_SEARCH_MAX_QUERY = 64
+PERSON_INDEXED_FIELDS = PERSON_SEARCH_FIELDS + ("date_of_birth",)
+
+# Projection for person documents returned by the API - derived index fields are internal
+PERSON_PROJECTION = {"_id": 0, "search_tokens": 0, "match_keys": 0}
+
+def _search_text(value) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(str(value).lower().split())
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def person_search_tokens(person: dict) -> List[str]:
+    """Trigrams of each searchable field plus short word prefixes (stored as ^x / ^xy)"""
+    tokens = set()
+    for field in PERSON_SEARCH_FIELDS:
+        if not person.get(field):
+            continue
+        text = _search_text(person[field])
+        texts = [text]
+        if field == "phone":
+            # Phone numbers are matched on digits only so spacing never matters
+            digits = re.sub(r"\D", "", text)
+            if digits and digits != text:
+                texts.append(digits)
+        for value in texts:
+            tokens |= _trigrams(value)
+            for word in re.split(r"\W+", value):
+                for n in range(1, min(len(word), PERSON_SEARCH_PREFIX_LENGTH) + 1):
+                    tokens.add("^" + word[:n])
+    return sorted(tokens)
+
+def _person_field_score(field: str, pattern: str) -> dict:
+    """3 for a match at the start of the field, 2 at the start of a word, 1 anywhere, else 0"""
+    value = {"$ifNull": [f"${field}", ""]}
+    return {"$switch": {
+        "branches": [
+            {"case": {"$regexMatch": {"input": value, "regex": f"^{pattern}", "options": "i"}}, "then": 3},
+            {"case": {"$regexMatch": {"input": value, "regex": f"\\W{pattern}", "options": "i"}}, "then": 2},
+            {"case": {"$regexMatch": {"input": value, "regex": pattern, "options": "i"}}, "then": 1},
+        ],
+        "default": 0
+    }}
+
+def person_search_pipeline(search: str, query: dict, skip: int, limit: int) -> Optional[List[dict]]:
+    """
+    Aggregation for GET /api/persons?search=. Each word of the search narrows candidates
+    through the search_tokens index ($all of its trigrams, or a word prefix for one- and
+    two-character words), must then match one of the fields, and scores by where that match
+    falls. Returns None for searches with nothing to match on.
+    """
+    text = _search_text(search)[:PERSON_SEARCH_MAX_QUERY]
+    digits = re.sub(r"\D", "", text)
+    if digits and re.fullmatch(r"[\d\s+().\-]+", text):
+        # Phone-like searches match digits regardless of spacing
+        words = [digits]
+        patterns = [r"\D*".join(digits)]
+    else:
+        words = [word for word in text.split(" ") if re.search(r"\w", word)]
+        patterns = [re.escape(word) for word in words]
+    if not words:
+        return None
+
+    tokens = set()
+    for word in words:
+        if len(word) >= 3:
+            tokens |= _trigrams(word)
+        else:
+            tokens |= {"^" + part for part in re.split(r"\W+", word) if part}
+    word_scores = {
+        f"_word_score_{i}": {"$max": [_person_field_score(field, pattern) for field in PERSON_SEARCH_FIELDS]}
+        for i, pattern in enumerate(patterns)
     }
+    return [
+        {"$match": {**query, "search_tokens": {"$all": sorted(tokens)}}},
+        {"$addFields": word_scores},
+        # Trigrams can all be present without a word being a substring of any one field
+        {"$match": {name: {"$gt": 0} for name in word_scores}},
+        {"$facet": {
+            "persons": [
+                {"$addFields": {"_score": {"$add": [f"${name}" for name in word_scores]}}},
+                {"$sort": {"_score": -1, "last_name": 1, "first_name": 1}},
+                {"$skip": skip},
+                {"$limit": limit},
+                {"$project": {**PERSON_PROJECTION, "_score": 0, **{name: 0 for name in word_scores}}},
+            ],
+            "total": [{"$count": "count"}],
+        }},
+    ]
+
+# ==================== PERSON DUPLICATE DETECTION ====================
+
+PERSON_DUPLICATE_MIN_SCORE = 0.88
+PERSON_DUPLICATE_MAX_CANDIDATES = 500  # per lookup, for the name block
+PERSON_DUPLICATE_MAX_EXACT_CANDIDATES = 200  # per lookup, for phone/email/date-of-birth keys
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+    "L": "4", **dict.fromkeys("MN", "5"), "R": "6",
+}
+
+def _name_letters(name: Optional[str]) -> str:
+    """Lowercase ASCII letters only, with accents folded (Siân -> sian)"""
+    folded = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z]", "", folded.lower())
+
+def soundex(name: Optional[str]) -> str:
+    """American Soundex code, e.g. Smith/Smyth -> S530; empty for names with no letters"""
+    letters = _name_letters(name).upper()
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        if letter not in "HW":
+            previous = digit
+    return (code + "000")[:4]
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """UK national form of a phone number (+44 7700 900123 -> 07700900123), None if too short"""
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("0044"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("44") and len(digits) >= 12:
+        digits = "0" + digits[2:]
+    return digits if len(digits) >= 7 else None
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email if "@" in email else None
+
+def person_match_keys(person: dict) -> List[str]:
+    """
+    Blocking keys for duplicate detection: last-name Soundex plus first initial, normalised
+    phone, normalised email, and date of birth plus last initial. Two records sharing any key
+    are compared; records sharing none never are.
+    """
+    keys = []
+    first, last = _name_letters(person.get("first_name")), soundex(person.get("last_name"))
+    if first and last:
+        keys.append(f"n:{last}:{first[0]}")
+    phone = normalize_phone(person.get("phone"))
+    if phone:
+        keys.append(f"p:{phone}")
+    email = normalize_email(person.get("email"))
+    if email:
+        keys.append(f"e:{email}")
+    dob = (person.get("date_of_birth") or "").strip()
+    if dob and last:
+        keys.append(f"d:{dob}:{last[0]}")
+    return keys
+
+def jaro_winkler(a: str, b: str) -> float:
+    """Jaro-Winkler similarity in [0, 1]"""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == char:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    a_chars = [c for c, matched in zip(a, a_matched) if matched]
+    b_chars = [c for c, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+def person_match_score(a: dict, b: dict) -> tuple:
+    """
+    Score two person records as likely duplicates. Names give the base score (Jaro-Winkler,
+    an initial counts as matching a full first name); an equal phone, email or date of birth
+    raises it and a conflicting date of birth lowers it. Returns (score, matched_on).
+    """
+    first_a, first_b = _name_letters(a.get("first_name")), _name_letters(b.get("first_name"))
+    last_a, last_b = _name_letters(a.get("last_name")), _name_letters(b.get("last_name"))
+    if min(len(first_a), len(first_b)) == 1 and first_a[:1] == first_b[:1]:
+        first_similarity = 0.9
+    else:
+        first_similarity = jaro_winkler(first_a, first_b)
+    score = 0.5 * first_similarity + 0.5 * jaro_winkler(last_a, last_b)
+    matched_on = ["name"] if score >= 0.85 else []
+    for field, normalize in (("phone", normalize_phone), ("email", normalize_email)):
+        value = normalize(a.get(field))
+        if value and value == normalize(b.get(field)):
+            score += 0.15
+            matched_on.append(field)
+    dob_a, dob_b = (a.get("date_of_birth") or "").strip(), (b.get("date_of_birth") or "").strip()
+    if dob_a and dob_b:
+        if dob_a == dob_b:
+            score += 0.15
+            matched_on.append("date_of_birth")
+        else:
+            score -= 0.25
+    return round(min(max(score, 0.0), 1.0), 3), matched_on
+
+async def find_person_duplicates(person: dict, limit: int = 5, exclude_person_id: Optional[str] = None) -> tuple:
+    """Likely duplicates of person from the match_keys index, best first. Returns (matches, examined)."""
+    keys = person_match_keys(person)
+    if not keys:
+        return [], 0
+    # Exact keys are fetched separately so a large common-name block cannot crowd out
+    # a record sharing the phone, email or date of birth
+    exact_keys = [key for key in keys if not key.startswith("n:")]
+    name_keys = [key for key in keys if key.startswith("n:")]
+    candidates = []
+    seen_ids = [exclude_person_id] if exclude_person_id else []
+    for block_keys, cap in ((exact_keys, PERSON_DUPLICATE_MAX_EXACT_CANDIDATES), (name_keys, PERSON_DUPLICATE_MAX_CANDIDATES)):
+        if not block_keys:
+            continue
+        query = {"match_keys": {"$in": block_keys}}
+        if seen_ids:
+            query["id"] = {"$nin": seen_ids}
+        block = await db.persons.find(query, PERSON_PROJECTION).limit(cap).to_list(cap)
+        candidates.extend(block)
+        seen_ids.extend(candidate["id"] for candidate in block)
+    matches = []
+    for candidate in candidates:
+        score, matched_on = person_match_score(person, candidate)
+        if score >= PERSON_DUPLICATE_MIN_SCORE:
+            matches.append((score, matched_on, candidate))
+    matches.sort(key=lambda match: match[0], reverse=True)
+    return matches[:limit], len(candidates)
+
+def person_index_fields(person: dict) -> dict:
+    """Derived fields stored on each person for search and duplicate detection"""
+    return {"search_tokens": person_search_tokens(person), "match_keys": person_match_keys(person)}
+
+async def _backfill_person_index_fields(missing_field: str) -> int:
+    cursor = db.persons.find(
+        {missing_field: {"$exists": False}},
+        {"_id": 0, "id": 1, **{field: 1 for field in PERSON_INDEXED_FIELDS}}
+    ).batch_size(1000)
+    operations = []
+    updated = 0
+    async for person in cursor:
+        operations.append(UpdateOne({"id": person["id"]}, {"$set": person_index_fields(person)}))
+        if len(operations) >= 1000:
+            updated += (await db.persons.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await db.persons.bulk_write(operations, ordered=False)).modified_count
+    return updated
+
+async def backfill_person_search_tokens() -> int:
+    """Migration: compute search_tokens for persons written before they were maintained"""
+    return await _backfill_person_index_fields("search_tokens")
+
+async def backfill_person_match_keys() -> int:
+    """Migration: compute match_keys for persons written before they were maintained"""
+    return await _backfill_person_index_fields("match_keys")
 
 # ==================== PERSON ENDPOINTS ====================
 
@@ -2083,7 +4382,7 @@ def filter_person_for_role(person: dict, user_role: str) -> dict:
         "last_name": person.get("last_name"),
         "phone": person.get("phone"),
         "email": person.get("email"),
-        "linked_cases": person.get("linked_cases", []),
+        "linked_case_count": person.get("linked_case_count", 0),
         "created_at": person.get("created_at")
     }
 
@@ -2095,17 +4394,9 @@ async def list_persons(
     limit: int = 50,
     current_user: dict = Depends(get_current_user)
 ):
-    """List all persons with optional filtering"""
+    """List all persons with optional filtering; searches are ranked by match quality"""
     query = {}
     
-    if search:
-        query["$or"] = [
-            {"first_name": {"$regex": search, "$options": "i"}},
-            {"last_name": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}},
-            {"phone": {"$regex": search, "$options": "i"}}
-        ]
-    
     if person_type:
         if person_type == PersonType.BOTH:
             query["person_type"] = person_type.value
@@ -2113,8 +4404,16 @@ async def list_persons(
             # Include persons of this type OR persons marked as "both"
             query["person_type"] = {"$in": [person_type.value, PersonType.BOTH.value]}
     
-    total = await db.persons.count_documents(query)
-    persons = await db.persons.find(query, {"_id": 0}).sort("last_name", 1).skip(skip).limit(limit).to_list(limit)
+    pipeline = person_search_pipeline(search, query, skip, limit) if search and search.strip() else None
+    if pipeline:
+        result = (await db.persons.aggregate(pipeline).to_list(1))[0]
+        persons = result["persons"]
+        total = result["total"][0]["count"] if result["total"] else 0
+    elif search and search.strip():
+        persons, total = [], 0
+    else:
+        total = await db.persons.count_documents(query)
+        persons = await db.persons.find(query, PERSON_PROJECTION).sort("last_name", 1).skip(skip).limit(limit).to_list(limit)
     
     # Filter based on role
     filtered_persons = [filter_person_for_role(p, current_user["role"]) for p in persons]
@@ -2132,12 +4431,47 @@ async def get_person(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific person by ID"""
-    person = await db.persons.find_one({"id": person_id}, {"_id": 0})
+    person = await db.persons.find_one({"id": person_id}, PERSON_PROJECTION)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     
     return filter_person_for_role(person, current_user["role"])
 
+class PersonDuplicateQuery(BaseModel):
+    first_name: str
+    last_name: str
+    date_of_birth: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    exclude_person_id: Optional[str] = None
+
+@api_router.post("/persons/find-duplicates")
+async def find_duplicate_persons(
+    person_data: PersonDuplicateQuery,
+    limit: int = Query(5, ge=1, le=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Likely existing records for a person about to be created, best match first.
+    Date of birth is only matched for managers: it is hidden from other roles, and a
+    match or conflict would otherwise show through matched_on and the score.
+    """
+    started = time.perf_counter()
+    exclude = {"exclude_person_id"}
+    if current_user["role"] != UserRole.MANAGER.value:
+        exclude.add("date_of_birth")
+    matches, examined = await find_person_duplicates(
+        person_data.model_dump(exclude=exclude), limit, person_data.exclude_person_id
+    )
+    return {
+        "candidates": [
+            {"person": filter_person_for_role(person, current_user["role"]), "score": score, "matched_on": matched_on}
+            for score, matched_on, person in matches
+        ],
+        "examined": examined,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
 @api_router.post("/persons")
 async def create_person(
     person_data: PersonCreate,
@@ -2153,11 +4487,12 @@ async def create_person(
     doc = person.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
+    doc.update(person_index_fields(doc))
     
     await db.persons.insert_one(doc)
     
     # Create audit log
-    await db.audit_log.insert_one({
+    await audit_sink.put("audit_log", {
         "id": str(uuid.uuid4()),
         "entity_type": "person",
         "entity_id": person.id,
@@ -2169,7 +4504,7 @@ async def create_person(
     })
     
     # Fetch the created person without _id
-    created = await db.persons.find_one({"id": person.id}, {"_id": 0})
+    created = await db.persons.find_one({"id": person.id}, PERSON_PROJECTION)
     return filter_person_for_role(created, current_user["role"])
 
 @api_router.put("/persons/{person_id}")
@@ -2195,10 +4530,13 @@ async def update_person(
     
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.persons.update_one({"id": person_id}, {"$set": update_data})
+    set_data = dict(update_data)
+    if any(field in update_data for field in PERSON_INDEXED_FIELDS):
+        set_data.update(person_index_fields({**existing, **update_data}))
+    await db.persons.update_one({"id": person_id}, {"$set": set_data})
     
     # Create audit log
-    await db.audit_log.insert_one({
+    await audit_sink.put("audit_log", {
         "id": str(uuid.uuid4()),
         "entity_type": "person",
         "entity_id": person_id,
@@ -2209,7 +4547,7 @@ async def update_person(
         "performed_at": datetime.now(timezone.utc).isoformat()
     })
     
-    updated = await db.persons.find_one({"id": person_id}, {"_id": 0})
+    updated = await db.persons.find_one({"id": person_id}, PERSON_PROJECTION)
     return filter_person_for_role(updated, current_user["role"])
 
 @api_router.delete("/persons/{person_id}")
@@ -2226,16 +4564,17 @@ async def delete_person(
         raise HTTPException(status_code=404, detail="Person not found")
     
     # Check if linked to cases
-    if person.get("linked_cases"):
+    linked_cases = await db.case_person_links.distinct("case_id", {"person_id": person_id})
+    if linked_cases:
         raise HTTPException(
             status_code=400, 
-            detail=f"Cannot delete person linked to {len(person['linked_cases'])} case(s). Unlink from cases first."
+            detail=f"Cannot delete person linked to {len(linked_cases)} case(s). Unlink from cases first."
         )
     
     await db.persons.delete_one({"id": person_id})
     
     # Create audit log
-    await db.audit_log.insert_one({
+    await audit_sink.put("audit_log", {
         "id": str(uuid.uuid4()),
         "entity_type": "person",
         "entity_id": person_id,
@@ -2248,57 +4587,72 @@ async def delete_person(
     
     return {"message": "Person deleted successfully"}
 
+async def count_person_linked_cases(person_id: str) -> int:
+    rows = await db.case_person_links.aggregate([
+        {"$match": {"person_id": person_id}},
+        {"$group": {"_id": "$case_id"}},
+        {"$count": "cases"}
+    ]).to_list(1)
+    return rows[0]["cases"] if rows else 0
+
+async def sync_person_linked_case_count(person_id: str, fields: Optional[dict] = None):
+    """
+    Recount the distinct cases linked to a person after a link write. Unlike read-then-$inc this
+    stays right when links for the same person race: every writer re-checks after its $set and
+    corrects a count another writer overwrote with an older value
+    """
+    for _ in range(3):
+        count = await count_person_linked_cases(person_id)
+        await db.persons.update_one({"id": person_id}, {"$set": {**(fields or {}), "linked_case_count": count}})
+        if await count_person_linked_cases(person_id) == count:
+            return
+
 @api_router.post("/cases/{case_id}/persons/{person_id}")
 async def link_person_to_case(
     case_id: str,
     person_id: str,
-    role: PersonType = Query(..., description="Role of person in this case"),
+    role: CasePersonRole = Query(..., description="Role of person in this case"),
     current_user: dict = Depends(get_current_user)
 ):
-    """Link a person to a case as reporter or offender"""
-    case = await db.cases.find_one({"id": case_id})
-    if not case:
+    """Link a person to a case as reporter, offender or witness; a case can have several of each"""
+    if not await db.cases.count_documents({"id": case_id}, limit=1):
         raise HTTPException(status_code=404, detail="Case not found")
     
-    person = await db.persons.find_one({"id": person_id})
+    person = await db.persons.find_one({"id": person_id}, {"_id": 0, "first_name": 1, "last_name": 1, "person_type": 1})
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     
-    # Determine field to update on case
-    link_field = f"{role.value}_id"
-    
-    # Update case with person link
-    await db.cases.update_one(
-        {"id": case_id},
-        {"$set": {link_field: person_id, "updated_at": datetime.now(timezone.utc).isoformat()}}
+    link = CasePersonLink(case_id=case_id, person_id=person_id, role=role,
+                          linked_by=current_user["id"], linked_by_name=current_user["name"])
+    link_doc = link.model_dump()
+    link_doc["linked_at"] = link_doc["linked_at"].isoformat()
+    result = await db.case_person_links.update_one(
+        {"case_id": case_id, "person_id": person_id, "role": role.value},
+        {"$setOnInsert": link_doc},
+        upsert=True
     )
+    if result.upserted_id is None:
+        return {"message": f"Person already linked as {role.value}"}
     
-    # Update person's linked_cases
-    linked_cases = person.get("linked_cases", [])
-    if case_id not in linked_cases:
-        linked_cases.append(case_id)
-        await db.persons.update_one(
-            {"id": person_id},
-            {"$set": {"linked_cases": linked_cases, "updated_at": datetime.now(timezone.utc).isoformat()}}
-        )
+    now = datetime.now(timezone.utc).isoformat()
+    await db.cases.update_one({"id": case_id}, {"$set": {"updated_at": now}})
     
-    # Update person_type if needed
+    person_fields = {"updated_at": now}
+    # Reporters who offend (or the reverse) become "both"; witnesses keep their type
     current_type = person.get("person_type")
-    if role.value != current_type and current_type != PersonType.BOTH.value:
-        await db.persons.update_one(
-            {"id": person_id},
-            {"$set": {"person_type": PersonType.BOTH.value}}
-        )
+    if role != CasePersonRole.WITNESS and role.value != current_type and current_type != PersonType.BOTH.value:
+        person_fields["person_type"] = PersonType.BOTH.value
+    await sync_person_linked_case_count(person_id, person_fields)
     
     # Create audit logs
-    await db.audit_log.insert_one({
+    await audit_sink.put("audit_log", {
         "id": str(uuid.uuid4()),
         "case_id": case_id,
         "action": f"{role.value}_linked",
         "details": f"{role.value.title()} linked: {person['first_name']} {person['last_name']}",
         "performed_by": current_user["id"],
         "performed_by_name": current_user["name"],
-        "performed_at": datetime.now(timezone.utc).isoformat()
+        "performed_at": now
     })
     
     return {"message": f"Person linked as {role.value}"}
@@ -2307,46 +4661,35 @@ async def link_person_to_case(
 async def unlink_person_from_case(
     case_id: str,
     person_id: str,
-    role: PersonType = Query(..., description="Role to unlink"),
+    role: CasePersonRole = Query(..., description="Role to unlink"),
     current_user: dict = Depends(get_current_user)
 ):
     """Unlink a person from a case"""
-    case = await db.cases.find_one({"id": case_id})
-    if not case:
+    if not await db.cases.count_documents({"id": case_id}, limit=1):
         raise HTTPException(status_code=404, detail="Case not found")
     
-    person = await db.persons.find_one({"id": person_id})
+    person = await db.persons.find_one({"id": person_id}, {"_id": 0, "first_name": 1, "last_name": 1})
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     
-    # Remove link from case
-    link_field = f"{role.value}_id"
-    await db.cases.update_one(
-        {"id": case_id},
-        {"$unset": {link_field: ""}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
+    result = await db.case_person_links.delete_one({"case_id": case_id, "person_id": person_id, "role": role.value})
+    if not result.deleted_count:
+        raise HTTPException(status_code=404, detail=f"Person is not linked to this case as {role.value}")
     
-    # Remove case from person's linked_cases
-    linked_cases = person.get("linked_cases", [])
-    # Only remove if not linked as another role
-    other_role = "offender" if role.value == "reporter" else "reporter"
-    other_link = case.get(f"{other_role}_id")
-    if other_link != person_id and case_id in linked_cases:
-        linked_cases.remove(case_id)
-        await db.persons.update_one(
-            {"id": person_id},
-            {"$set": {"linked_cases": linked_cases, "updated_at": datetime.now(timezone.utc).isoformat()}}
-        )
+    now = datetime.now(timezone.utc).isoformat()
+    await db.cases.update_one({"id": case_id}, {"$set": {"updated_at": now}})
+    
+    await sync_person_linked_case_count(person_id, {"updated_at": now})
     
     # Create audit log
-    await db.audit_log.insert_one({
+    await audit_sink.put("audit_log", {
         "id": str(uuid.uuid4()),
         "case_id": case_id,
         "action": f"{role.value}_unlinked",
         "details": f"{role.value.title()} unlinked: {person['first_name']} {person['last_name']}",
         "performed_by": current_user["id"],
         "performed_by_name": current_user["name"],
-        "performed_at": datetime.now(timezone.utc).isoformat()
+        "performed_at": now
     })
     
     return {"message": "Person unlinked from case"}
@@ -2356,63 +4699,297 @@ async def get_case_persons(
     case_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all persons linked to a case"""
-    case = await db.cases.find_one({"id": case_id}, {"_id": 0})
-    if not case:
+    """
+    Get all persons linked to a case, by role. "reporter" and "offender" hold the first
+    person linked in that role, for clients that expect one of each.
+    """
+    if not await db.cases.count_documents({"id": case_id}, limit=1):
         raise HTTPException(status_code=404, detail="Case not found")
     
-    result = {"reporter": None, "offender": None}
+    links = await db.case_person_links.find(
+        {"case_id": case_id}, {"_id": 0, "person_id": 1, "role": 1}
+    ).sort("linked_at", ASCENDING).to_list(None)
+    persons = await db.persons.find(
+        {"id": {"$in": list({link["person_id"] for link in links})}}, PERSON_PROJECTION
+    ).to_list(None)
+    persons_by_id = {person["id"]: filter_person_for_role(person, current_user["role"]) for person in persons}
     
-    reporter_id = case.get("reporter_id")
-    if reporter_id:
-        reporter = await db.persons.find_one({"id": reporter_id}, {"_id": 0})
-        if reporter:
-            result["reporter"] = filter_person_for_role(reporter, current_user["role"])
+    by_role = {role: [] for role in CasePersonRole}
+    for link in links:
+        person = persons_by_id.get(link["person_id"])
+        if person:
+            by_role[CasePersonRole(link["role"])].append(person)
     
-    offender_id = case.get("offender_id")
-    if offender_id:
-        offender = await db.persons.find_one({"id": offender_id}, {"_id": 0})
-        if offender:
-            result["offender"] = filter_person_for_role(offender, current_user["role"])
-    
-    return result
+    return {
+        "reporter": next(iter(by_role[CasePersonRole.REPORTER]), None),
+        "offender": next(iter(by_role[CasePersonRole.OFFENDER]), None),
+        "reporters": by_role[CasePersonRole.REPORTER],
+        "offenders": by_role[CasePersonRole.OFFENDER],
+        "witnesses": by_role[CasePersonRole.WITNESS]
+    }
 
 @api_router.get("/persons/{person_id}/cases")
 async def get_person_cases(
     person_id: str,
+    view: CaseView = CaseView.SUMMARY,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, overrides view"),
+    limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all cases linked to a person"""
-    person = await db.persons.find_one({"id": person_id})
-    if not person:
+    """Get the cases linked to a person, most recently linked first"""
+    if not await db.persons.count_documents({"id": person_id}, limit=1):
         raise HTTPException(status_code=404, detail="Person not found")
     
-    linked_case_ids = person.get("linked_cases", [])
-    if not linked_case_ids:
+    # The newest links for up to `limit` distinct cases, with every role the person has on each
+    roles_by_case = {}
+    async for link in db.case_person_links.find(
+        {"person_id": person_id}, {"_id": 0, "case_id": 1, "role": 1}
+    ).sort("linked_at", DESCENDING):
+        if link["case_id"] not in roles_by_case and len(roles_by_case) >= limit:
+            break
+        roles_by_case.setdefault(link["case_id"], []).append(link["role"])
+    if not roles_by_case:
         return []
     
     cases = await db.cases.find(
-        {"id": {"$in": linked_case_ids}},
-        {"_id": 0, "id": 1, "reference_number": 1, "case_type": 1, "status": 1, 
-         "description": 1, "reporter_id": 1, "offender_id": 1, "created_at": 1}
-    ).to_list(100)
+        {"id": {"$in": list(roles_by_case)}},
+        build_case_projection(view, fields)
+    ).to_list(limit)
+    order = {case_id: position for position, case_id in enumerate(roles_by_case)}
+    cases.sort(key=lambda case: order[case["id"]])
     
-    # Add role info for each case
     for case in cases:
-        case["person_role"] = []
-        if case.get("reporter_id") == person_id:
-            case["person_role"].append("reporter")
-        if case.get("offender_id") == person_id:
-            case["person_role"].append("offender")
+        case["person_role"] = sorted(roles_by_case[case["id"]])
     
     return cases
 
+async def migrate_case_person_links() -> dict:
+    """
+    Migration: move reporter_id / offender_id on cases into case_person_links, replace
+    persons.linked_cases with linked_case_count, then drop the old fields
+    """
+    operations = []
+    links = 0
+    async for case in db.cases.find(
+        {"$or": [{"reporter_id": {"$type": "string"}}, {"offender_id": {"$type": "string"}}]},
+        {"_id": 0, "id": 1, "reporter_id": 1, "offender_id": 1, "updated_at": 1, "created_at": 1}
+    ).batch_size(1000):
+        for role in (CasePersonRole.REPORTER, CasePersonRole.OFFENDER):
+            person_id = case.get(f"{role.value}_id")
+            if not person_id:
+                continue
+            linked_at = case.get("updated_at") or case.get("created_at") or datetime.now(timezone.utc).isoformat()
+            operations.append(UpdateOne(
+                {"case_id": case["id"], "person_id": person_id, "role": role.value},
+                {"$setOnInsert": {"case_id": case["id"], "person_id": person_id, "role": role.value,
+                                  "linked_at": linked_at, "linked_by": None, "linked_by_name": None}},
+                upsert=True
+            ))
+        if len(operations) >= 1000:
+            links += (await db.case_person_links.bulk_write(operations, ordered=False)).upserted_count
+            operations = []
+    if operations:
+        links += (await db.case_person_links.bulk_write(operations, ordered=False)).upserted_count
+    
+    operations = []
+    async for row in db.case_person_links.aggregate([
+        {"$group": {"_id": {"person_id": "$person_id", "case_id": "$case_id"}}},
+        {"$group": {"_id": "$_id.person_id", "cases": {"$sum": 1}}}
+    ]):
+        operations.append(UpdateOne({"id": row["_id"]}, {"$set": {"linked_case_count": row["cases"]}}))
+        if len(operations) >= 1000:
+            await db.persons.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        await db.persons.bulk_write(operations, ordered=False)
+    await db.persons.update_many({"linked_case_count": {"$exists": False}}, {"$set": {"linked_case_count": 0}})
+    await db.persons.update_many({"linked_cases": {"$exists": True}}, {"$unset": {"linked_cases": ""}})
+    await db.cases.update_many(
+        {"$or": [{"reporter_id": {"$exists": True}}, {"offender_id": {"$exists": True}}]},
+        {"$unset": {"reporter_id": "", "offender_id": ""}}
+    )
+    return {"links_created": links}
+
 # ==================== PERSON MERGE ====================
 
+PERSON_MERGE_FIELDS = ["title", "first_name", "last_name", "date_of_birth", "phone", "email",
+                       "id_type", "id_number", "notes", "address"]
+PERSON_MERGE_MAX_SECONDARIES = 50
+
 class PersonMergeRequest(BaseModel):
     primary_person_id: str
     secondary_person_id: str
 
+class PersonBulkMergeRequest(BaseModel):
+    primary_person_id: str
+    secondary_person_ids: List[str]
+    proposal_id: Optional[str] = None  # mark this merge proposal applied in the same transaction
+
+# None until the first merge asks; multi-document transactions need a replica set or mongos
+_transactions_supported: Optional[bool] = None
+
+async def transactions_supported() -> bool:
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await db.command("hello")
+            _transactions_supported = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            logging.warning(f"Could not determine transaction support, merging without transactions: {e}")
+            _transactions_supported = False
+    return _transactions_supported
+
+def merge_person_fields(records: List[dict], primary_id: str) -> dict:
+    """
+    Field values for the merged person: for each field the most recently updated non-empty
+    value wins (ties go to the primary) and person_type becomes "both" if the records disagree
+    """
+    newest_first = sorted(
+        records,
+        key=lambda person: (person.get("updated_at", person.get("created_at", "")), person["id"] == primary_id),
+        reverse=True
+    )
+    merged = {}
+    for field in PERSON_MERGE_FIELDS:
+        for person in newest_first:
+            if person.get(field):
+                merged[field] = person[field]
+                break
+    person_types = {person.get("person_type", PersonType.REPORTER.value) for person in records}
+    merged["person_type"] = person_types.pop() if len(person_types) == 1 else PersonType.BOTH.value
+    return merged
+
+async def merge_person_records(primary_id: str, secondary_ids: List[str], current_user: dict,
+                               proposal_id: Optional[str] = None) -> dict:
+    """
+    Merge secondary persons into the primary. Case links move to the primary in one
+    bulk_write (dropping any the primary already has), the primary is updated and the
+    secondaries deleted in a second, all inside a transaction when the deployment supports
+    one. Without transactions the steps run in an order that leaves a re-runnable state if
+    interrupted: secondaries are deleted last. A proposal being applied is claimed before
+    anything else is written, and the merge must include all of its persons.
+    """
+    started = time.perf_counter()
+    timings = {}
+    ids = [primary_id] + secondary_ids
+    records = await db.persons.find({"id": {"$in": ids}}, PERSON_PROJECTION).to_list(len(ids))
+    if len(records) != len(ids):
+        raise HTTPException(status_code=404, detail="One or more persons not found")
+    if proposal_id:
+        proposal = await db.person_merge_proposals.find_one({"id": proposal_id}, {"_id": 0, "status": 1, "person_ids": 1})
+        if not proposal:
+            raise HTTPException(status_code=404, detail="Proposal not found")
+        if proposal["status"] not in REVIEWABLE_PROPOSAL_STATUSES:
+            raise HTTPException(status_code=400, detail="Proposal has already been reviewed")
+        if not set(proposal.get("person_ids") or []) <= set(ids):
+            raise HTTPException(status_code=400, detail="The merge must include every person in the proposal")
+    by_id = {person["id"]: person for person in records}
+    primary = by_id[primary_id]
+    now = datetime.now(timezone.utc).isoformat()
+    merged_data = merge_person_fields(records, primary_id)
+    merged_data.update(person_index_fields({**primary, **merged_data}))
+    merged_data["updated_at"] = now
+    timings["load"] = time.perf_counter() - started
+
+    async def apply(session=None) -> int:
+        if proposal_id:
+            # Claimed first and only from a reviewable status, so concurrent applies or a
+            # dismiss cannot both succeed; the transaction (if any) is aborted by the raise
+            step = time.perf_counter()
+            claimed = await db.person_merge_proposals.update_one(
+                {"id": proposal_id, "status": {"$in": REVIEWABLE_PROPOSAL_STATUSES}},
+                {"$set": {
+                    "status": MergeProposalStatus.APPLIED.value,
+                    "applied_person_ids": ids,
+                    "reviewed_by": current_user["id"],
+                    "reviewed_by_name": current_user["name"],
+                    "reviewed_at": now
+                }},
+                session=session
+            )
+            if not claimed.matched_count:
+                raise HTTPException(status_code=409, detail="Proposal was reviewed by another request")
+            timings["proposal"] = time.perf_counter() - step
+        step = time.perf_counter()
+        links = await db.case_person_links.find(
+            {"person_id": {"$in": ids}}, {"_id": 1, "case_id": 1, "person_id": 1, "role": 1}, session=session
+        ).to_list(None)
+        primary_links = {(link["case_id"], link["role"]) for link in links if link["person_id"] == primary_id}
+        operations, operation_link_ids = [], []
+        for link in links:
+            if link["person_id"] == primary_id:
+                continue
+            key = (link["case_id"], link["role"])
+            if key in primary_links:
+                operations.append(DeleteOne({"_id": link["_id"]}))
+            else:
+                primary_links.add(key)
+                operations.append(UpdateOne({"_id": link["_id"]}, {"$set": {"person_id": primary_id}}))
+            operation_link_ids.append(link["_id"])
+        if operations:
+            try:
+                await db.case_person_links.bulk_write(operations, ordered=False, session=session)
+            except BulkWriteError as e:
+                # Without a transaction the primary can gain a (case, role) link after we read its
+                # links; moving ours onto it hits the unique index, so the duplicate is dropped instead
+                duplicates = [error for error in e.details.get("writeErrors", []) if error.get("code") == 11000]
+                if session is not None or len(duplicates) != len(e.details.get("writeErrors", [])):
+                    raise
+                await db.case_person_links.delete_many(
+                    {"_id": {"$in": [operation_link_ids[error["index"]] for error in duplicates]}}
+                )
+        timings["links"] = time.perf_counter() - step
+        step = time.perf_counter()
+        await db.persons.bulk_write([
+            UpdateOne({"id": primary_id}, {"$set": {
+                **merged_data, "linked_case_count": len({case_id for case_id, _ in primary_links})
+            }}),
+            DeleteMany({"id": {"$in": secondary_ids}}),
+        ], ordered=True, session=session)
+        timings["persons"] = time.perf_counter() - step
+        return sum(1 for link in links if link["person_id"] != primary_id)
+
+    transactional = await transactions_supported()
+    if transactional:
+        async with await client.start_session() as session:
+            links_moved = await session.with_transaction(apply)
+    else:
+        try:
+            links_moved = await apply()
+        except Exception as e:
+            if proposal_id and not (isinstance(e, HTTPException) and e.status_code == 409):
+                # Hand the claimed proposal back so the merge can be retried
+                await db.person_merge_proposals.update_one(
+                    {"id": proposal_id, "status": MergeProposalStatus.APPLIED.value, "reviewed_at": now},
+                    {"$set": {"status": proposal["status"]},
+                     "$unset": {"applied_person_ids": "", "reviewed_by": "", "reviewed_by_name": "", "reviewed_at": ""}}
+                )
+            raise
+        # Links written concurrently with the merge are not covered by the count set in apply()
+        await sync_person_linked_case_count(primary_id)
+
+    secondary_names = ", ".join(f"{by_id[sid]['first_name']} {by_id[sid]['last_name']}" for sid in secondary_ids)
+    await audit_sink.put("audit_log", {
+        "id": str(uuid.uuid4()),
+        "entity_type": "person",
+        "entity_id": primary_id,
+        "action": "merged",
+        "details": f"Merged {secondary_names} into {primary['first_name']} {primary['last_name']}",
+        "performed_by": current_user["id"],
+        "performed_by_name": current_user["name"],
+        "performed_at": now
+    })
+    timings["total"] = time.perf_counter() - started
+
+    merged_person = await db.persons.find_one({"id": primary_id}, PERSON_PROJECTION)
+    return {
+        "merged_person": merged_person,
+        "merged_count": len(secondary_ids),
+        "links_moved": links_moved,
+        "transactional": transactional,
+        "timings_ms": {name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+    }
+
 @api_router.post("/persons/merge")
 async def merge_persons(
     merge_request: PersonMergeRequest,
@@ -2422,138 +4999,368 @@ async def merge_persons(
     if current_user["role"] != UserRole.MANAGER.value:
         raise HTTPException(status_code=403, detail="Only managers can merge persons")
     
-    primary = await db.persons.find_one({"id": merge_request.primary_person_id})
-    secondary = await db.persons.find_one({"id": merge_request.secondary_person_id})
-    
-    if not primary or not secondary:
-        raise HTTPException(status_code=404, detail="One or both persons not found")
-    
-    if primary["id"] == secondary["id"]:
+    if merge_request.primary_person_id == merge_request.secondary_person_id:
         raise HTTPException(status_code=400, detail="Cannot merge a person with itself")
     
-    # Determine which record is more recent
-    primary_updated = primary.get("updated_at", primary.get("created_at", ""))
-    secondary_updated = secondary.get("updated_at", secondary.get("created_at", ""))
-    
-    # Merge data - most recent non-empty values win
-    merged_data = {}
-    fields_to_merge = ["title", "first_name", "last_name", "date_of_birth", "phone", "email", 
-                       "id_type", "id_number", "notes", "address"]
-    
-    for field in fields_to_merge:
-        primary_val = primary.get(field)
-        secondary_val = secondary.get(field)
-        
-        # If one is empty, use the other
-        if not primary_val and secondary_val:
-            merged_data[field] = secondary_val
-        elif primary_val and not secondary_val:
-            merged_data[field] = primary_val
-        elif primary_val and secondary_val:
-            # Both have values - use most recent
-            if secondary_updated > primary_updated:
-                merged_data[field] = secondary_val
-            else:
-                merged_data[field] = primary_val
-    
-    # Merge person_type - if either is "both" or they differ, set to "both"
-    if primary.get("person_type") != secondary.get("person_type"):
-        merged_data["person_type"] = PersonType.BOTH.value
-    else:
-        merged_data["person_type"] = primary.get("person_type", PersonType.REPORTER.value)
-    
-    # Merge linked_cases
-    primary_cases = set(primary.get("linked_cases", []))
-    secondary_cases = set(secondary.get("linked_cases", []))
-    merged_cases = list(primary_cases | secondary_cases)
-    merged_data["linked_cases"] = merged_cases
-    merged_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    try:
+        result = await merge_person_records(merge_request.primary_person_id, [merge_request.secondary_person_id], current_user)
+    except HTTPException as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail="One or both persons not found")
+        raise
+    return {"message": "Persons merged successfully", "merged_person": result["merged_person"]}
+
+@api_router.post("/persons/bulk-merge")
+async def bulk_merge_persons(
+    merge_request: PersonBulkMergeRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Merge many person records into one in a single transaction, optionally applying a merge proposal (managers only)"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can merge persons")
     
-    # Update primary person with merged data
-    await db.persons.update_one({"id": primary["id"]}, {"$set": merged_data})
+    secondary_ids = merge_request.secondary_person_ids
+    if not secondary_ids:
+        raise HTTPException(status_code=400, detail="At least one secondary person is required")
+    if len(secondary_ids) > PERSON_MERGE_MAX_SECONDARIES:
+        raise HTTPException(status_code=400, detail=f"At most {PERSON_MERGE_MAX_SECONDARIES} persons can be merged at once")
+    if len(set(secondary_ids)) != len(secondary_ids) or merge_request.primary_person_id in secondary_ids:
+        raise HTTPException(status_code=400, detail="Each person can appear only once in a merge")
     
-    # Update all cases that reference secondary person to point to primary
-    await db.cases.update_many(
-        {"reporter_id": secondary["id"]},
-        {"$set": {"reporter_id": primary["id"]}}
-    )
-    await db.cases.update_many(
-        {"offender_id": secondary["id"]},
-        {"$set": {"offender_id": primary["id"]}}
+    result = await merge_person_records(merge_request.primary_person_id, secondary_ids, current_user, merge_request.proposal_id)
+    return {"message": f"Merged {len(secondary_ids)} person(s)", **result}
+
+# ==================== PERSON MERGE PROPOSALS ====================
+
+# Written by the batch deduplication job (dedupe_persons.py) and reviewed here
+class MergeProposalStatus(str, Enum):
+    PENDING = "pending"
+    APPLIED = "applied"
+    DISMISSED = "dismissed"
+    SUPERSEDED = "superseded"  # Pending when a later run replaced it
+
+# Proposals that can still be applied or dismissed
+REVIEWABLE_PROPOSAL_STATUSES = [MergeProposalStatus.PENDING.value, MergeProposalStatus.SUPERSEDED.value]
+
+@api_router.get("/admin/person-merge-proposals")
+async def list_person_merge_proposals(
+    status: MergeProposalStatus = MergeProposalStatus.PENDING,
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """Proposed merge groups from the last deduplication run, strongest first (managers only)"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can review merge proposals")
+    last_run = await db.person_dedupe_runs.find_one({}, {"_id": 0}, sort=[("started_at", DESCENDING)])
+    query = {"status": status.value}
+    if status == MergeProposalStatus.PENDING and last_run:
+        # A run in progress has inserted its proposals but not yet superseded the previous ones
+        query["run_id"] = last_run["id"]
+    total = await db.person_merge_proposals.count_documents(query)
+    proposals = await db.person_merge_proposals.find(query, {"_id": 0}).sort(
+        [("max_score", DESCENDING), ("id", ASCENDING)]
+    ).skip(skip).limit(limit).to_list(limit)
+    return {"proposals": proposals, "total": total, "skip": skip, "limit": limit, "last_run": last_run}
+
+@api_router.post("/admin/person-merge-proposals/{proposal_id}/dismiss")
+async def dismiss_person_merge_proposal(
+    proposal_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Mark a proposal as not duplicates; later runs will not propose the same group again"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can review merge proposals")
+    proposal = await db.person_merge_proposals.find_one_and_update(
+        {"id": proposal_id, "status": {"$in": REVIEWABLE_PROPOSAL_STATUSES}},
+        {"$set": {
+            "status": MergeProposalStatus.DISMISSED.value,
+            "reviewed_by": current_user["id"],
+            "reviewed_by_name": current_user["name"],
+            "reviewed_at": datetime.now(timezone.utc).isoformat()
+        }},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
-    
-    # Delete secondary person
-    await db.persons.delete_one({"id": secondary["id"]})
-    
-    # Create audit log
-    await db.audit_log.insert_one({
-        "id": str(uuid.uuid4()),
-        "entity_type": "person",
-        "entity_id": primary["id"],
-        "action": "merged",
-        "details": f"Merged {secondary['first_name']} {secondary['last_name']} into {primary['first_name']} {primary['last_name']}",
-        "performed_by": current_user["id"],
-        "performed_by_name": current_user["name"],
-        "performed_at": datetime.now(timezone.utc).isoformat()
-    })
-    
-    # Return updated primary person
-    updated = await db.persons.find_one({"id": primary["id"]}, {"_id": 0})
-    return {"message": "Persons merged successfully", "merged_person": updated}
+    if not proposal:
+        if await db.person_merge_proposals.count_documents({"id": proposal_id}, limit=1):
+            raise HTTPException(status_code=400, detail="Proposal has already been reviewed")
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    return proposal
 
 # ==================== DUPLICATE VRM DETECTION ====================
 
+# Every place a vehicle registration can be recorded on a case, relative to type_specific_fields
+VRM_SOURCE_PATHS = [
+    ("abandoned_vehicle", "registration_number"),
+    ("nuisance_vehicle", "vehicle_registration"),
+    ("nuisance_vehicle", "registration_number"),  # Legacy field name
+    ("waste_carrier", "vehicle_registration"),
+    ("fly_tipping", "vehicle_details", "registration_number"),
+    ("registration_number",),  # Legacy top-level field
+]
+
+def normalize_vrm(vrm: str) -> str:
+    """Uppercase with all whitespace removed"""
+    return re.sub(r"\s+", "", vrm or "").upper()
+
+def extract_case_vrms(type_specific_fields: Optional[dict]) -> List[str]:
+    """Distinct normalized VRMs recorded anywhere in a case's type-specific fields"""
+    vrms = []
+    for path in VRM_SOURCE_PATHS:
+        value = _lookup(type_specific_fields or {}, path)
+        if isinstance(value, str):
+            normalized = normalize_vrm(value)
+            if normalized and normalized not in vrms:
+                vrms.append(normalized)
+    return vrms
+
+# Process-local VRM index settings. Writes in this worker update it directly; changes made by
+# other workers are picked up by a periodic incremental sync on updated_at.
+VRM_INDEX_SYNC_SECONDS = int(os.environ.get('VRM_INDEX_SYNC_SECONDS', '30'))
+# Each sync re-reads this much before the high-water mark, for writes that committed late
+VRM_INDEX_SYNC_OVERLAP_SECONDS = 5
+VRM_INDEX_SUMMARY_FIELDS = ["id", "reference_number", "case_type", "status", "created_at", "location", "description"]
+
+class VrmIndex:
+    """Normalized VRM -> case summaries, plus the VRM watchlist, held in memory for O(1) lookups"""
+    def __init__(self, sync_seconds: float):
+        self.sync_seconds = sync_seconds
+        self._cases_by_vrm: Dict[str, Dict[str, dict]] = defaultdict(dict)
+        self._vrms_by_case: Dict[str, List[str]] = {}
+        self._watchlist: Dict[str, dict] = {}
+        self._synced_at = 0.0
+        self._high_water: Optional[str] = None  # Latest updated_at read back from the database
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.lookups = 0
+        self.syncs = 0
+    
+    def _index_case(self, case: dict, from_database: bool = False):
+        case_id = case["id"]
+        for vrm in self._vrms_by_case.pop(case_id, []):
+            self._cases_by_vrm[vrm].pop(case_id, None)
+            if not self._cases_by_vrm[vrm]:
+                del self._cases_by_vrm[vrm]
+        vrms = case.get("vrm_normalized") or []
+        if vrms:
+            summary = {field: case.get(field) for field in VRM_INDEX_SUMMARY_FIELDS}
+            for vrm in vrms:
+                self._cases_by_vrm[vrm][case_id] = summary
+            self._vrms_by_case[case_id] = list(vrms)
+        # Only rows read by warm()/sync() move the mark: a local write is newer than changes other
+        # workers made since the last sync, and moving past it would make sync() skip them
+        updated_at = case.get("updated_at")
+        if from_database and isinstance(updated_at, str) and (self._high_water is None or updated_at > self._high_water):
+            self._high_water = updated_at
+    
+    async def warm(self):
+        """Full load of indexed cases and the watchlist"""
+        async with self._lock:
+            self._cases_by_vrm = defaultdict(dict)
+            self._vrms_by_case = {}
+            self._high_water = None
+            projection = {"_id": 0, "vrm_normalized": 1, "updated_at": 1, **{f: 1 for f in VRM_INDEX_SUMMARY_FIELDS}}
+            async for case in db.cases.find({"vrm_normalized.0": {"$exists": True}}, projection).batch_size(1000):
+                self._index_case(case, from_database=True)
+            latest = await db.cases.find({}, {"_id": 0, "updated_at": 1}).sort("updated_at", DESCENDING).limit(1).to_list(1)
+            if latest and isinstance(latest[0].get("updated_at"), str):
+                self._high_water = max(self._high_water or "", latest[0]["updated_at"])
+            self._watchlist = {e["vrm"]: e async for e in db.vrm_watchlist.find({}, {"_id": 0})}
+            self._synced_at = time.time()
+            self.loaded = True
+    
+    def _sync_from(self) -> Optional[str]:
+        """
+        Lower bound for the next sync. Another worker's write can commit after we have read past
+        its updated_at, so the window before the mark is read again; re-indexing is idempotent.
+        """
+        if not self._high_water:
+            return None
+        try:
+            mark = datetime.fromisoformat(self._high_water)
+        except ValueError:
+            return self._high_water
+        return (mark - timedelta(seconds=VRM_INDEX_SYNC_OVERLAP_SECONDS)).isoformat()
+    
+    async def sync(self, max_age: Optional[float] = None):
+        """
+        Pick up case and watchlist changes made by other workers since the last sync.
+        With max_age, skip it if a sync finished within that many seconds (checked under the lock,
+        so callers queued behind a sync do not each run another).
+        """
+        if not self.loaded:
+            await self.warm()
+            return
+        async with self._lock:
+            if max_age is not None and time.time() - self._synced_at <= max_age:
+                return
+            sync_from = self._sync_from()
+            query = {"updated_at": {"$gte": sync_from}} if sync_from else {}
+            projection = {"_id": 0, "vrm_normalized": 1, "updated_at": 1, **{f: 1 for f in VRM_INDEX_SUMMARY_FIELDS}}
+            async for case in db.cases.find(query, projection).sort("updated_at", ASCENDING):
+                self._index_case(case, from_database=True)
+            self._watchlist = {e["vrm"]: e async for e in db.vrm_watchlist.find({}, {"_id": 0})}
+            self._synced_at = time.time()
+            self.syncs += 1
+    
+    async def ensure_fresh(self):
+        if time.time() - self._synced_at > self.sync_seconds:
+            await self.sync(max_age=self.sync_seconds)
+    
+    def update_case(self, case: dict):
+        """Apply a case write made by this worker (needs id, vrm_normalized and the summary fields)"""
+        if self.loaded:
+            self._index_case(case)
+    
+    def patch_case(self, case_id: str, fields: dict):
+        """Update summary fields of an indexed case in place"""
+        for vrm in self._vrms_by_case.get(case_id, []):
+            self._cases_by_vrm[vrm][case_id].update(fields)  # Summaries are shared across a case's VRMs
+            break
+    
+    def case_vrms(self, case_id: str) -> Optional[List[str]]:
+        return self._vrms_by_case.get(case_id)
+    
+    def case_type(self, case_id: str) -> Optional[str]:
+        vrms = self._vrms_by_case.get(case_id)
+        return self._cases_by_vrm[vrms[0]][case_id].get("case_type") if vrms else None
+    
+    async def find(self, vrms: List[str], case_type: Optional[str] = None, exclude_case_id: Optional[str] = None,
+                   limit: int = 10) -> List[dict]:
+        """Cases carrying any of the VRMs, newest first"""
+        await self.ensure_fresh()
+        self.lookups += 1
+        matches = {}
+        for vrm in vrms:
+            for case_id, summary in self._cases_by_vrm.get(vrm, {}).items():
+                if case_id != exclude_case_id and (case_type is None or summary.get("case_type") == case_type):
+                    matches[case_id] = summary
+        ordered = sorted(matches.values(), key=lambda c: str(c.get("created_at") or ""), reverse=True)
+        return [{k: v for k, v in c.items() if k != "case_type"} for c in ordered[:limit]]
+    
+    async def watchlist_hits(self, vrms: List[str]) -> List[dict]:
+        await self.ensure_fresh()
+        return [self._watchlist[vrm] for vrm in vrms if vrm in self._watchlist]
+    
+    def set_watchlist_entry(self, entry: dict):
+        self._watchlist[entry["vrm"]] = entry
+    
+    def remove_watchlist_entry(self, vrm: str):
+        self._watchlist.pop(vrm, None)
+    
+    def stats(self) -> dict:
+        return {
+            "vrms": len(self._cases_by_vrm),
+            "cases": len(self._vrms_by_case),
+            "watchlist": len(self._watchlist),
+            "lookups": self.lookups,
+            "syncs": self.syncs,
+            "synced_at": datetime.fromtimestamp(self._synced_at, timezone.utc).isoformat() if self._synced_at else None
+        }
+
+vrm_index = VrmIndex(VRM_INDEX_SYNC_SECONDS)
+
+async def alert_vrm_watchlist(case: dict, vrms: List[str], user: Optional[dict] = None):
+    """Notify managers and supervisors when a case records a watchlisted VRM"""
+    hits = await vrm_index.watchlist_hits(vrms)
+    for entry in hits:
+        reason = f" ({entry['reason']})" if entry.get("reason") else ""
+        await notify_roles(
+            [UserRole.MANAGER, UserRole.SUPERVISOR],
+            "Watchlisted Vehicle",
+            f"Watchlisted VRM {entry['vrm_display']}{reason} recorded on case {case['reference_number']}",
+            case["id"]
+        )
+        if user:
+            await create_audit_log(case["id"], "VRM_WATCHLIST_HIT", f"Watchlisted VRM {entry['vrm']} recorded", user)
+    return hits
+
+@api_router.get("/vrm-watchlist")
+async def list_vrm_watchlist(current_user: dict = Depends(get_current_user)):
+    """VRM watchlist - managers and supervisors"""
+    if current_user["role"] not in [UserRole.MANAGER.value, UserRole.SUPERVISOR.value]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    return await db.vrm_watchlist.find({}, {"_id": 0}).sort("created_at", -1).to_list(10000)
+
+@api_router.post("/vrm-watchlist")
+async def add_vrm_watchlist_entry(entry_data: VrmWatchlistEntryCreate, current_user: dict = Depends(get_current_user)):
+    """Add a VRM to the watchlist - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can edit the VRM watchlist")
+    vrm = normalize_vrm(entry_data.vrm)
+    if not vrm:
+        raise HTTPException(status_code=400, detail="VRM is required")
+    if await db.vrm_watchlist.find_one({"vrm": vrm}, {"_id": 1}):
+        raise HTTPException(status_code=400, detail="VRM is already on the watchlist")
+    
+    entry = VrmWatchlistEntry(
+        vrm=vrm,
+        vrm_display=entry_data.vrm.strip().upper(),
+        reason=entry_data.reason,
+        added_by=current_user["id"],
+        added_by_name=current_user["name"]
+    )
+    doc = entry.model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    await db.vrm_watchlist.insert_one(doc)
+    doc.pop("_id", None)
+    vrm_index.set_watchlist_entry(doc)
+    await log_access_decision(current_user, f"vrm_watchlist:{vrm}", "create", True, "Added VRM to watchlist")
+    return doc
+
+@api_router.delete("/vrm-watchlist/{vrm}")
+async def delete_vrm_watchlist_entry(vrm: str, current_user: dict = Depends(get_current_user)):
+    """Remove a VRM from the watchlist - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can edit the VRM watchlist")
+    vrm = normalize_vrm(vrm)
+    result = await db.vrm_watchlist.delete_one({"vrm": vrm})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="VRM not on the watchlist")
+    vrm_index.remove_watchlist_entry(vrm)
+    await log_access_decision(current_user, f"vrm_watchlist:{vrm}", "delete", True, "Removed VRM from watchlist")
+    return {"message": "VRM removed from watchlist"}
+
+async def backfill_vrm_normalized() -> int:
+    """Migration: derive vrm_normalized for cases written before it was maintained"""
+    source_filter = {"$or": [{"type_specific_fields." + ".".join(path): {"$type": "string"}} for path in VRM_SOURCE_PATHS]}
+    cursor = db.cases.find(
+        {"vrm_normalized": {"$exists": False}, **source_filter},
+        {"_id": 0, "id": 1, "type_specific_fields": 1}
+    ).batch_size(1000)
+    operations = []
+    updated = 0
+    async for case in cursor:
+        operations.append(UpdateOne({"id": case["id"]}, {"$set": {"vrm_normalized": extract_case_vrms(case.get("type_specific_fields"))}}))
+        if len(operations) >= 1000:
+            updated += (await db.cases.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await db.cases.bulk_write(operations, ordered=False)).modified_count
+    return updated
+
 @api_router.get("/cases/{case_id}/duplicate-vrm-check")
 async def get_case_vrm_duplicates(
     case_id: str,
     current_user: dict = Depends(get_current_user)
 ):
     """Get duplicate VRM cases for a specific case"""
-    case = await db.cases.find_one({"id": case_id}, {"_id": 0})
-    if not case:
-        raise HTTPException(status_code=404, detail="Case not found")
-    
-    case_type = case.get("case_type")
-    type_fields = case.get("type_specific_fields", {})
-    
-    # Get VRM from the appropriate nested field based on case type
-    vrm = None
-    if case_type == "abandoned_vehicle" and type_fields.get("abandoned_vehicle"):
-        vrm = type_fields["abandoned_vehicle"].get("registration_number")
-    elif case_type in ["nuisance_vehicle", "nuisance_vehicle_sale", "nuisance_vehicle_repair", "nuisance_vehicle_abandoned"]:
-        if type_fields.get("nuisance_vehicle"):
-            vrm = type_fields["nuisance_vehicle"].get("registration_number")
-    
-    # Also check top-level registration_number for backwards compatibility
-    if not vrm:
-        vrm = type_fields.get("registration_number")
-    
-    if not vrm:
+    await vrm_index.ensure_fresh()
+    vrms = vrm_index.case_vrms(case_id)
+    case_type = vrm_index.case_type(case_id) if vrms else None
+    if not vrms:
+        # Not in the index: either no VRM or an unknown case
+        case = await db.cases.find_one({"id": case_id}, {"_id": 0, "case_type": 1, "type_specific_fields": 1})
+        if not case:
+            raise HTTPException(status_code=404, detail="Case not found")
+        vrms = extract_case_vrms(case.get("type_specific_fields"))
+        case_type = case.get("case_type")
+    if not vrms:
         return {"duplicates": [], "count": 0, "has_vrm": False}
+    normalized_vrm = vrms[0]
     
-    # Normalize VRM and check for duplicates
-    normalized_vrm = vrm.replace(" ", "").upper()
-    regex_pattern = "".join([c + r"\s*" for c in normalized_vrm]).rstrip(r"\s*")
-    
-    # Determine the nested field path based on case type
-    if case_type == "abandoned_vehicle":
-        vrm_field = "type_specific_fields.abandoned_vehicle.registration_number"
-    elif case_type in ["nuisance_vehicle", "nuisance_vehicle_sale", "nuisance_vehicle_repair", "nuisance_vehicle_abandoned"]:
-        vrm_field = "type_specific_fields.nuisance_vehicle.registration_number"
-    else:
-        vrm_field = "type_specific_fields.registration_number"
-    
-    query = {
-        "case_type": case_type,
-        vrm_field: {"$regex": f"^{regex_pattern}$", "$options": "i"},
-        "id": {"$ne": case_id}  # Exclude current case
-    }
-    
-    duplicates = await db.cases.find(
-        query,
-        {"_id": 0, "id": 1, "reference_number": 1, "status": 1, "created_at": 1, 
-         "location": 1, "description": 1}
-    ).sort("created_at", -1).limit(10).to_list(10)
+    duplicates = await vrm_index.find(vrms, case_type, exclude_case_id=case_id)
     
     return {
         "duplicates": duplicates,
@@ -2564,9 +5371,15 @@ async def get_case_vrm_duplicates(
 
 # ==================== CLOSED CASES MAP ====================
 
+# Fields the closed-cases map formatter always needs
+CLOSED_MAP_REQUIRED_FIELDS = ("reference_number", "case_type", "description", "location",
+                              "closure_reason", "updated_at", "created_at")
+
 @api_router.get("/reports/closed-cases-map")
 async def get_closed_cases_for_map(
     days: int = Query(30, description="Number of days to look back"),
+    view: CaseView = CaseView.MAP,
+    fields: Optional[str] = Query(None, description="Extra case fields to include on each map item"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get closed cases with location for map display"""
@@ -2584,11 +5397,11 @@ async def get_closed_cases_for_map(
         "location.longitude": {"$ne": None}
     }
     
-    cases = await db.cases.find(
-        query,
-        {"_id": 0, "id": 1, "reference_number": 1, "case_type": 1, "description": 1,
-         "location": 1, "closure_reason": 1, "updated_at": 1, "created_at": 1}
-    ).to_list(1000)
+    projection = build_case_projection(view, fields, required=CLOSED_MAP_REQUIRED_FIELDS)
+    cases = await db.cases.find(query, projection).to_list(1000)
+    
+    # Fields beyond the fixed map item shape are passed through as-is
+    extra_fields = {p.split(".", 1)[0] for p in projection if p != "_id"} - {"id", *CLOSED_MAP_REQUIRED_FIELDS}
     
     # Format for map display
     map_data = []
@@ -2596,6 +5409,7 @@ async def get_closed_cases_for_map(
         loc = case.get("location", {})
         if loc.get("latitude") and loc.get("longitude"):
             map_data.append({
+                **{field: case.get(field) for field in extra_fields if field in case},
                 "id": case["id"],
                 "reference_number": case["reference_number"],
                 "case_type": case["case_type"],
@@ -2624,9 +5438,259 @@ async def get_closed_cases_for_map(
         "stats": stats
     }
 
+# ==================== DATABASE INDEXES ====================
+
+# Declarative index registry - every index the application relies on, per collection.
+# Reconciled at startup: missing indexes are created, anything else on the collection
+# that does not match the declared set is reported as drift (never dropped automatically).
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "cases": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("reference_number", ASCENDING)], name="reference_number_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+        IndexModel([("owning_team", ASCENDING), ("assigned_to", ASCENDING)], name="owning_team_assigned_to"),
+        # Keyset pagination - one index per supported sort key, id as tie-breaker
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("updated_at", DESCENDING), ("id", DESCENDING)], name="updated_at_id"),
+        IndexModel([("reference_number", DESCENDING), ("id", DESCENDING)], name="reference_number_id"),
+        # VRM search and duplicate detection (multikey)
+        IndexModel([("vrm_normalized", ASCENDING), ("case_type", ASCENDING)], name="vrm_normalized_case_type"),
+        # FPN statistics - equality on fpn_issued, range on date_issued
+        IndexModel([("fpn_issued", ASCENDING), ("fpn_details.date_issued", ASCENDING)], name="fpn_issued_date_issued"),
+    ],
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "teams": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "persons": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("last_name", ASCENDING)], name="last_name"),
+        # Person search - multikey index over trigram/prefix tokens
+        IndexModel([("search_tokens", ASCENDING)], name="search_tokens"),
+        # Duplicate detection - multikey index over phonetic/phone/email/dob blocking keys
+        IndexModel([("match_keys", ASCENDING)], name="match_keys"),
+    ],
+    "notifications": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("is_read", ASCENDING), ("created_at", DESCENDING)],
+                   name="user_id_is_read_created_at"),
+    ],
+    "case_notes": [
+        IndexModel([("case_id", ASCENDING), ("created_at", DESCENDING)], name="case_id_created_at"),
+    ],
+    "case_evidence": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("case_id", ASCENDING), ("uploaded_at", DESCENDING)], name="case_id_uploaded_at"),
+    ],
+    "audit_logs": [
+        IndexModel([("case_id", ASCENDING), ("performed_at", DESCENDING)], name="case_id_performed_at"),
+    ],
+    "audit_log": [
+        IndexModel([("case_id", ASCENDING), ("performed_at", DESCENDING)], name="case_id_performed_at"),
+        IndexModel([("entity_id", ASCENDING), ("performed_at", DESCENDING)], name="entity_id_performed_at"),
+    ],
+    "access_logs": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_id_timestamp"),
+        IndexModel([("logged_at", ASCENDING)], name="logged_at_ttl",
+                   expireAfterSeconds=ACCESS_LOG_RETENTION_DAYS * 86400),
+    ],
+    "case_stats": [
+        IndexModel([("case_type", ASCENDING), ("status", ASCENDING), ("owning_team", ASCENDING),
+                    ("assigned_to", ASCENDING), ("day", ASCENDING)], name="rollup_key_unique", unique=True),
+    ],
+    "vrm_watchlist": [
+        IndexModel([("vrm", ASCENDING)], name="vrm_unique", unique=True),
+    ],
+    "case_person_links": [
+        IndexModel([("case_id", ASCENDING), ("role", ASCENDING), ("person_id", ASCENDING)],
+                   name="case_id_role_person_id_unique", unique=True),
+        IndexModel([("person_id", ASCENDING), ("linked_at", DESCENDING)], name="person_id_linked_at"),
+    ],
+    "person_merge_proposals": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("max_score", DESCENDING)], name="status_max_score"),
+        IndexModel([("status", ASCENDING), ("run_id", ASCENDING), ("max_score", DESCENDING)], name="status_run_id_max_score"),
+    ],
+    "person_dedupe_runs": [
+        IndexModel([("started_at", DESCENDING)], name="started_at"),
+    ],
+    "access_log_counters": [
+        IndexModel([("user_id", ASCENDING), ("resource", ASCENDING), ("action", ASCENDING), ("bucket_start", ASCENDING)],
+                   name="user_resource_action_bucket_unique", unique=True),
+        IndexModel([("resource", ASCENDING), ("bucket_start", DESCENDING)], name="resource_bucket_start"),
+        IndexModel([("bucket_start", ASCENDING)], name="bucket_start_ttl",
+                   expireAfterSeconds=ACCESS_LOG_RETENTION_DAYS * 86400),
+    ],
+}
+
+# TTL indexes whose expiry follows ACCESS_LOG_RETENTION_DAYS
+ACCESS_LOG_TTL_INDEXES = [("access_logs", "logged_at_ttl"), ("access_log_counters", "bucket_start_ttl")]
+
+# Index options that must match between the declared and the existing index
+INDEX_COMPARED_OPTIONS = ["unique", "sparse", "expireAfterSeconds", "partialFilterExpression"]
+
+# Result of the last reconcile/verify run, served by the readiness endpoint
+index_status: Dict[str, Any] = {"ready": False, "checked_at": None, "collections": {}}
+
+def _normalize_index_key(key) -> List[tuple]:
+    """Normalize an index key spec to a list of (field, direction) pairs"""
+    items = key.items() if hasattr(key, "items") else key
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in items]
+
+def _index_differences(declared: dict, existing: dict) -> List[str]:
+    """List the ways an existing index differs from its declaration"""
+    differences = []
+    if _normalize_index_key(declared["key"]) != _normalize_index_key(existing["key"]):
+        differences.append("key")
+    for option in INDEX_COMPARED_OPTIONS:
+        if declared.get(option) != existing.get(option):
+            differences.append(option)
+    return differences
+
+async def apply_access_log_retention():
+    """Bring built access log TTL indexes in line with ACCESS_LOG_RETENTION_DAYS via collMod"""
+    seconds = ACCESS_LOG_RETENTION_DAYS * 86400
+    for collection_name, index_name in ACCESS_LOG_TTL_INDEXES:
+        existing = await db[collection_name].index_information()
+        if index_name in existing and existing[index_name].get("expireAfterSeconds") != seconds:
+            try:
+                await db.command("collMod", collection_name, index={"name": index_name, "expireAfterSeconds": seconds})
+            except OperationFailure as e:
+                logging.error(f"Could not update TTL on {collection_name}.{index_name}: {e}")
+
+async def reconcile_indexes(create_missing: bool = True) -> Dict[str, Any]:
+    """
+    Compare every collection in INDEX_REGISTRY against the database.
+    Missing indexes are created when create_missing is set; undeclared or mismatched
+    indexes are reported as drift. Updates and returns the module-level index_status.
+    """
+    collections = {}
+    ready = True
+    for collection_name, models in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        report = {"verified": [], "created": [], "missing": [], "mismatched": {}, "undeclared": [], "failed": {}}
+        declared_names = set()
+
+        for model in models:
+            declared = model.document
+            name = declared["name"]
+            declared_names.add(name)
+            if name in existing:
+                differences = _index_differences(declared, existing[name])
+                if differences:
+                    report["mismatched"][name] = differences
+                else:
+                    report["verified"].append(name)
+                continue
+            if not create_missing:
+                report["missing"].append(name)
+                continue
+            try:
+                await collection.create_indexes([model])
+                report["created"].append(name)
+            except OperationFailure as e:
+                # e.g. duplicate values already present for a unique index
+                report["failed"][name] = str(e)
+                logging.error(f"Index {collection_name}.{name} could not be created: {e}")
+
+        report["undeclared"] = [name for name in existing if name != "_id_" and name not in declared_names]
+        if report["missing"] or report["mismatched"] or report["failed"]:
+            ready = False
+        if report["mismatched"] or report["undeclared"]:
+            logging.warning(f"Index drift on {collection_name}: mismatched={report['mismatched']} undeclared={report['undeclared']}")
+        collections[collection_name] = report
+
+    index_status.update({
+        "ready": ready,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "collections": collections
+    })
+    return index_status
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe - database reachable and declared indexes in place (no auth required)"""
+    try:
+        await db.command("ping")
+        database_ok = True
+    except Exception as e:
+        logging.error(f"Readiness check database ping failed: {e}")
+        database_ok = False
+    
+    ready = database_ok and index_status["ready"]
+    body = {
+        "ready": ready,
+        "database": database_ok,
+        "indexes": {
+            "ready": index_status["ready"],
+            "checked_at": index_status["checked_at"],
+            "drift": {
+                name: {k: report[k] for k in ("missing", "mismatched", "undeclared", "failed") if report[k]}
+                for name, report in index_status["collections"].items()
+                if any(report[k] for k in ("missing", "mismatched", "undeclared", "failed"))
+            }
+        },
+        "audit_sink": audit_sink.stats(),
+        # Audit entries that are being retried, were dead-lettered or were lost need attention
+        "audit_degraded": audit_sink.retrying or audit_sink.dead_lettered > 0 or audit_sink.failed > 0,
+        "access_log": access_counters.stats()
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@api_router.get("/admin/indexes")
+async def get_index_report(
+    reconcile: bool = Query(False, description="Create missing indexes instead of only verifying"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Verify declared indexes against the database and report drift - managers only"""
+    if current_user["role"] != UserRole.MANAGER.value:
+        raise HTTPException(status_code=403, detail="Only managers can inspect indexes")
+    return await reconcile_indexes(create_missing=reconcile)
+
+# ==================== DATA MIGRATIONS ====================
+
+# One-off data migrations, applied in order at startup. Each one records a marker in
+# db.migrations when it completes and must be safe to re-run if interrupted.
+MIGRATIONS = [
+    ("2026_10_vrm_normalized", backfill_vrm_normalized),
+    ("2026_10_person_search_tokens", backfill_person_search_tokens),
+    ("2026_10_person_match_keys", backfill_person_match_keys),
+    ("2026_10_case_person_links", migrate_case_person_links),
+    ("2026_10_access_log_logged_at", backfill_access_log_logged_at),
+    ("2026_10_blob_refs", backfill_blob_refs),
+]
+
+async def run_migrations() -> List[str]:
+    """Apply migrations that have no completion marker yet"""
+    applied = []
+    done = {m["_id"] async for m in db.migrations.find({}, {"_id": 1})}
+    for name, migration in MIGRATIONS:
+        if name in done:
+            continue
+        started = time.perf_counter()
+        result = await migration()
+        await db.migrations.update_one(
+            {"_id": name},
+            {"$set": {"applied_at": datetime.now(timezone.utc).isoformat(), "result": result,
+                      "duration_ms": round((time.perf_counter() - started) * 1000, 1)}},
+            upsert=True
+        )
+        logging.info(f"Applied migration {name}: {result}")
+        applied.append(name)
+    return applied
+
 # Initialize default admin user on startup
 @app.on_event("startup")
 async def startup_event():
+    audit_sink.start()
+    access_counters.start()
+    
     # Create default teams if none exist
     team_count = await db.teams.count_documents({})
     if team_count == 0:
@@ -2647,6 +5711,7 @@ async def startup_event():
         # Get existing team IDs
         teams = await db.teams.find({}, {"_id": 0}).to_list(100)
         team_ids = {t["team_type"]: t["id"] for t in teams}
+    await team_registry.refresh()
     
     # Create default admin if no users exist
     user_count = await db.users.count_documents({})
@@ -2678,6 +5743,20 @@ async def startup_event():
             await db.users.insert_one(doc)
         
         logging.info("Default users created with team assignments")
+    
+    # Build/verify declared indexes, after moving existing TTLs to the configured retention
+    await apply_access_log_retention()
+    await reconcile_indexes()
+    logging.info(f"Index reconciliation complete (ready={index_status['ready']})")
+    
+    await run_migrations()
+    await vrm_index.warm()
+    logging.info(f"VRM index warmed ({vrm_index.stats()['vrms']} VRMs)")
+    
+    # Build the statistics rollup on first start with existing cases
+    if await db.case_stats.estimated_document_count() == 0 and await db.cases.estimated_document_count() > 0:
+        rows = await rebuild_case_stats()
+        logging.info(f"Built case_stats rollup ({rows} rows)")
 
 # Include the router
 app.include_router(api_router)
@@ -2688,6 +5767,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Disposition"],
 )
 
 # Configure logging
@@ -2699,4 +5779,8 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await access_counters.stop()
+    await audit_sink.stop()
+    if _preview_executor is not None:
+        _preview_executor.shutdown(wait=False, cancel_futures=True)
     client.close()
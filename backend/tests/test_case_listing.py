@@ -0,0 +1,175 @@
+"""
+Test suite for case list endpoints
+Tests: keyset (cursor) pagination on GET /api/cases, sort keys, total-count hints,
+       summary/map views and sparse fieldsets, streamed CSV and columnar exports
+"""
+import pytest
+import requests
+import os
+import io
+import json
+import base64
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+MANAGER_CREDENTIALS = {"email": "admin@council.gov.uk", "password": "admin123"}
+
+
+@pytest.fixture(scope="module")
+def manager_headers():
+    """Manager auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json=MANAGER_CREDENTIALS)
+    assert response.status_code == 200, f"Manager login failed: {response.text}"
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def seeded_cases(manager_headers):
+    """Create a handful of cases so there is more than one page"""
+    case_ids = []
+    for i in range(5):
+        response = requests.post(f"{BASE_URL}/api/cases", json={
+            "case_type": "littering",
+            "description": f"TEST_Pagination case {i}",
+            "location": {"address": "1 Test Street", "postcode": "TE1 1ST"}
+        }, headers=manager_headers)
+        assert response.status_code == 200, f"Case creation failed: {response.text}"
+        case_ids.append(response.json()["id"])
+    return case_ids
+
+
+class TestCasePagination:
+    """Test cursor pagination on GET /api/cases"""
+
+    def test_legacy_list_response(self, manager_headers):
+        """Without paging parameters the response is still a plain list"""
+        response = requests.get(f"{BASE_URL}/api/cases", headers=manager_headers)
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+    def test_walk_all_pages(self, manager_headers, seeded_cases):
+        """Following next_cursor visits every case exactly once"""
+        seen = []
+        params = {"page_size": 2}
+        while True:
+            response = requests.get(f"{BASE_URL}/api/cases", params=params, headers=manager_headers)
+            assert response.status_code == 200, response.text
+            data = response.json()
+            assert len(data["cases"]) <= 2
+            seen.extend(c["id"] for c in data["cases"])
+            if not data["next_cursor"]:
+                break
+            params = {"page_size": 2, "cursor": data["next_cursor"]}
+        assert len(seen) == len(set(seen)), "Pages must not overlap"
+        assert set(seeded_cases) <= set(seen)
+
+    def test_sort_by_reference_number(self, manager_headers, seeded_cases):
+        """Supported sort keys order the page"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={
+            "page_size": 10, "sort_by": "reference_number", "sort_order": "asc"
+        }, headers=manager_headers)
+        assert response.status_code == 200
+        refs = [c["reference_number"] for c in response.json()["cases"]]
+        assert refs == sorted(refs)
+
+    def test_total_hint(self, manager_headers, seeded_cases):
+        """include_total adds an estimated total"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={
+            "page_size": 1, "include_total": True
+        }, headers=manager_headers)
+        data = response.json()
+        assert data["estimated_total"] >= len(seeded_cases)
+
+    def test_invalid_cursor_rejected(self, manager_headers):
+        """Garbage cursors are a 400, not a 500"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"cursor": "not-a-cursor"}, headers=manager_headers)
+        assert response.status_code == 400
+
+    def test_operator_cursor_rejected(self, manager_headers):
+        """Cursor values that are not scalars cannot smuggle query operators"""
+        payload = {"s": "created_at", "o": "desc", "v": {"$ne": None}, "id": {"$regex": ""}}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = requests.get(f"{BASE_URL}/api/cases", params={"cursor": cursor}, headers=manager_headers)
+        assert response.status_code == 400
+
+
+class TestCaseProjections:
+    """Test view= and fields= on case list endpoints"""
+
+    def test_summary_view_drops_heavy_fields(self, manager_headers, seeded_cases):
+        """Summary view omits type-specific fields and location history"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"view": "summary"}, headers=manager_headers)
+        assert response.status_code == 200
+        for case in response.json():
+            assert "type_specific_fields" not in case
+            assert "location_history" not in case
+            assert "reference_number" in case
+
+    def test_explicit_fields(self, manager_headers, seeded_cases):
+        """fields= returns only the requested fields plus id"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"fields": "status,location.address"}, headers=manager_headers)
+        assert response.status_code == 200
+        for case in response.json():
+            assert set(case) <= {"id", "status", "location", "created_at"}
+
+    def test_unknown_field_rejected(self, manager_headers):
+        """Unknown fields are a 400"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"fields": "password"}, headers=manager_headers)
+        assert response.status_code == 400
+
+    def test_closed_cases_map_view(self, manager_headers):
+        """Closed cases map keeps its response shape"""
+        response = requests.get(f"{BASE_URL}/api/reports/closed-cases-map", headers=manager_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert "cases" in data and "stats" in data
+
+
+class TestCsvExport:
+    """Test streamed CSV exports"""
+
+    def test_case_export_streams_csv(self, manager_headers, seeded_cases):
+        """Case export is a CSV attachment rather than a JSON string field"""
+        response = requests.get(f"{BASE_URL}/api/stats/export-csv", headers=manager_headers, stream=True)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/csv")
+        assert response.headers["Content-Disposition"].startswith("attachment; filename=\"cases_export_")
+        lines = response.text.splitlines()
+        assert lines[0].startswith("reference_number,case_type,status")
+        assert len(lines) - 1 >= len(seeded_cases)
+
+    def test_fpn_export_header(self, manager_headers):
+        """FPN export always starts with its header row"""
+        response = requests.get(f"{BASE_URL}/api/stats/fpn/export-csv", headers=manager_headers)
+        assert response.status_code == 200
+        assert response.text.splitlines()[0].startswith("reference_number,case_type,status,fpn_ref")
+
+
+class TestColumnarExport:
+    """Test GET /api/stats/export-columnar"""
+
+    def test_parquet_export_is_typed(self, manager_headers, seeded_cases):
+        """Parquet export keeps timestamps and numbers typed and flattens nested models"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        response = requests.get(f"{BASE_URL}/api/stats/export-columnar", params={"case_type": "littering"}, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["Content-Disposition"].endswith('.parquet"')
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.num_rows >= len(seeded_cases)
+        assert pa.types.is_timestamp(table.schema.field("created_at").type)
+        assert pa.types.is_floating(table.schema.field("fpn_details_fpn_amount").type)
+        assert "location_postcode" in table.column_names
+        assert set(table.column("case_type").to_pylist()) == {"littering"}
+
+    def test_arrow_export(self, manager_headers, seeded_cases):
+        """Arrow IPC file export reads back with the same columns"""
+        pa = pytest.importorskip("pyarrow")
+        response = requests.get(f"{BASE_URL}/api/stats/export-columnar", params={"format": "arrow"}, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        table = pa.ipc.open_file(io.BytesIO(response.content)).read_all()
+        assert "fly_tipping_vehicle_details_make" in table.column_names
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,196 @@
+"""
+Test suite for case evidence storage
+Tests: blob-backed upload, metadata-only listing, content streaming with ETag and Range support
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+MANAGER_CREDENTIALS = {"email": "admin@council.gov.uk", "password": "admin123"}
+
+# 10 KB of non-repeating-ish bytes so ranges are easy to check
+TEST_CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture(scope="module")
+def manager_headers():
+    """Manager auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json=MANAGER_CREDENTIALS)
+    assert response.status_code == 200, f"Manager login failed: {response.text}"
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def evidence_case(manager_headers):
+    """Case with one uploaded evidence file"""
+    response = requests.post(f"{BASE_URL}/api/cases", json={
+        "case_type": "fly_tipping",
+        "description": "TEST_Evidence storage case",
+        "location": {"address": "1 Test Street", "postcode": "TE1 1ST"}
+    }, headers=manager_headers)
+    assert response.status_code == 200, f"Case creation failed: {response.text}"
+    case_id = response.json()["id"]
+
+    upload = requests.post(
+        f"{BASE_URL}/api/cases/{case_id}/evidence",
+        files={"file": ("TEST_evidence.bin", TEST_CONTENT, "application/octet-stream")},
+        headers=manager_headers
+    )
+    assert upload.status_code == 200, f"Upload failed: {upload.text}"
+    return {"case_id": case_id, "evidence": upload.json()}
+
+
+class TestEvidenceUpload:
+    """Test POST /api/cases/{case_id}/evidence"""
+
+    def test_upload_returns_size_and_digest(self, evidence_case):
+        """Upload response carries size and SHA-256 instead of content"""
+        evidence = evidence_case["evidence"]
+        assert evidence["file_size"] == len(TEST_CONTENT)
+        assert len(evidence["sha256"]) == 64
+
+
+class TestEvidenceListing:
+    """Test GET /api/cases/{case_id}/evidence"""
+
+    def test_listing_is_metadata_only(self, manager_headers, evidence_case):
+        """Listing never includes file_data and links to the content endpoint"""
+        response = requests.get(f"{BASE_URL}/api/cases/{evidence_case['case_id']}/evidence", headers=manager_headers)
+        assert response.status_code == 200
+        items = response.json()
+        assert len(items) == 1
+        item = items[0]
+        assert "file_data" not in item
+        assert item["file_size"] == len(TEST_CONTENT)
+        assert item["content_url"].startswith(f"/api/evidence/{item['id']}/content")
+
+
+class TestEvidenceContent:
+    """Test GET /api/evidence/{evidence_id}/content"""
+
+    @pytest.fixture(scope="class")
+    def content_url(self, manager_headers, evidence_case):
+        response = requests.get(f"{BASE_URL}/api/cases/{evidence_case['case_id']}/evidence", headers=manager_headers)
+        return f"{BASE_URL}{response.json()[0]['content_url']}"
+
+    def test_full_download(self, content_url):
+        """Signed URL returns the full content with ETag and Content-Length"""
+        response = requests.get(content_url)
+        assert response.status_code == 200
+        assert response.content == TEST_CONTENT
+        assert response.headers["Content-Length"] == str(len(TEST_CONTENT))
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert response.headers["ETag"]
+
+    def test_range_request(self, content_url):
+        """Range requests return 206 with the requested slice"""
+        response = requests.get(content_url, headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == TEST_CONTENT[100:200]
+        assert response.headers["Content-Range"] == f"bytes 100-199/{len(TEST_CONTENT)}"
+
+    def test_suffix_range(self, content_url):
+        """bytes=-N returns the last N bytes"""
+        response = requests.get(content_url, headers={"Range": "bytes=-16"})
+        assert response.status_code == 206
+        assert response.content == TEST_CONTENT[-16:]
+
+    def test_unsatisfiable_range(self, content_url):
+        """Ranges past the end are a 416"""
+        response = requests.get(content_url, headers={"Range": f"bytes={len(TEST_CONTENT) + 10}-"})
+        assert response.status_code == 416
+
+    def test_conditional_request(self, content_url):
+        """Matching If-None-Match is a 304"""
+        etag = requests.get(content_url).headers["ETag"]
+        response = requests.get(content_url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_unsigned_request_requires_auth(self, evidence_case):
+        """Without a signature or bearer token the content is refused"""
+        evidence_id = evidence_case["evidence"]["id"]
+        response = requests.get(f"{BASE_URL}/api/evidence/{evidence_id}/content")
+        assert response.status_code == 401
+
+    def test_bearer_auth_accepted(self, manager_headers, evidence_case):
+        """A bearer token works in place of a signature"""
+        evidence_id = evidence_case["evidence"]["id"]
+        response = requests.get(f"{BASE_URL}/api/evidence/{evidence_id}/content", headers=manager_headers)
+        assert response.status_code == 200
+
+
+class TestMultipartPublicReport:
+    """Test POST /api/public/report/multipart"""
+
+    REPORT = '{"case_type": "littering", "description": "TEST_Multipart public report", "location": {"address": "1 Test Street"}}'
+
+    def test_multipart_report_with_files(self):
+        """File parts are stored as evidence without base64"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", data={"report": self.REPORT}, files=[
+            ("evidence", ("TEST_photo.jpg", TEST_CONTENT, "image/jpeg")),
+            ("evidence", ("TEST_notes.txt", b"notes", "text/plain")),
+        ])
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["reference_number"].startswith("LT-")
+        assert data["evidence_count"] == 2
+
+    def test_declared_type_ignored(self, manager_headers):
+        """Evidence type comes from the content, and unrecognised content downloads as an attachment"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", data={"report": self.REPORT}, files=[
+            ("evidence", ("TEST_page.html", b"<html><script>alert(1)</script></html>", "image/jpeg")),
+        ])
+        assert response.status_code == 200, response.text
+        reference = response.json()["reference_number"]
+        cases = requests.get(f"{BASE_URL}/api/cases", params={
+            "page_size": 50, "case_type": "littering", "fields": "reference_number"
+        }, headers=manager_headers).json()["cases"]
+        case_id = next(c["id"] for c in cases if c["reference_number"] == reference)
+        evidence = requests.get(f"{BASE_URL}/api/cases/{case_id}/evidence", headers=manager_headers).json()[0]
+        assert evidence["file_type"] == "application/octet-stream"
+        content = requests.get(f"{BASE_URL}{evidence['content_url']}")
+        assert content.headers["Content-Disposition"].startswith("attachment")
+        assert content.headers["X-Content-Type-Options"] == "nosniff"
+
+    def test_invalid_report_field(self):
+        """Report JSON is validated like the JSON endpoint"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", files={"report": (None, "{}")})
+        assert response.status_code == 422
+
+    def test_report_must_precede_files(self):
+        """Files sent before the report field are refused before anything is stored"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", files=[
+            ("evidence", ("TEST_photo.jpg", TEST_CONTENT, "image/jpeg")),
+            ("report", (None, self.REPORT)),
+        ])
+        assert response.status_code == 400
+
+    def test_truncated_body(self):
+        """A body without its closing boundary is a 400"""
+        boundary = "TESTboundary"
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"report\"\r\n\r\n{self.REPORT}\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"evidence\"; filename=\"TEST_cut.jpg\"\r\n\r\n"
+        ).encode() + TEST_CONTENT
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", data=body, headers={
+            "Content-Type": f"multipart/form-data; boundary={boundary}"
+        })
+        assert response.status_code == 400
+
+    def test_malformed_body(self):
+        """A body that does not start with the boundary is a 400, not a server error"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", data=b"not multipart\r\n\r\n", headers={
+            "Content-Type": "multipart/form-data; boundary=TESTboundary"
+        })
+        assert response.status_code == 400
+
+    def test_requires_multipart(self):
+        """Non-multipart bodies are rejected"""
+        response = requests.post(f"{BASE_URL}/api/public/report/multipart", json={"case_type": "littering"})
+        assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
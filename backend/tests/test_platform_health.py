@@ -0,0 +1,157 @@
+"""
+Test suite for platform health and operational endpoints
+Tests: readiness probe, declared index reconciliation/drift report, cache statistics,
+       buffered audit writes, access log retention, statistics rollup
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+MANAGER_CREDENTIALS = {"email": "admin@council.gov.uk", "password": "admin123"}
+OFFICER_CREDENTIALS = {"email": "officer@council.gov.uk", "password": "officer123"}
+
+
+@pytest.fixture(scope="module")
+def manager_headers():
+    """Manager auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json=MANAGER_CREDENTIALS)
+    assert response.status_code == 200, f"Manager login failed: {response.text}"
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def officer_headers():
+    """Officer auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json=OFFICER_CREDENTIALS)
+    assert response.status_code == 200, f"Officer login failed: {response.text}"
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestReadiness:
+    """Test /api/health/ready"""
+
+    def test_readiness_no_auth_required(self):
+        """Readiness probe is public and reports database and index state"""
+        response = requests.get(f"{BASE_URL}/api/health/ready")
+        assert response.status_code in [200, 503], f"Unexpected status {response.status_code}"
+        data = response.json()
+        assert "ready" in data
+        assert "database" in data
+        assert "indexes" in data
+        assert "drift" in data["indexes"]
+        print(f"Readiness: ready={data['ready']} drift={data['indexes']['drift']}")
+
+
+class TestIndexReport:
+    """Test /api/admin/indexes"""
+
+    def test_manager_can_verify_indexes(self, manager_headers):
+        """Manager gets a per-collection index report"""
+        response = requests.get(f"{BASE_URL}/api/admin/indexes", headers=manager_headers)
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert "cases" in data["collections"]
+        cases_report = data["collections"]["cases"]
+        declared = set(cases_report["verified"]) | set(cases_report["missing"]) | set(cases_report["mismatched"])
+        assert "id_unique" in declared
+        assert "reference_number_unique" in declared
+
+    def test_officer_cannot_inspect_indexes(self, officer_headers):
+        """Officers are refused"""
+        response = requests.get(f"{BASE_URL}/api/admin/indexes", headers=officer_headers)
+        assert response.status_code == 403
+
+
+class TestCacheStats:
+    """Test /api/admin/cache-stats and user cache invalidation"""
+
+    def test_cache_stats_counters(self, manager_headers):
+        """Repeated authenticated calls are served from the user cache"""
+        for _ in range(3):
+            requests.get(f"{BASE_URL}/api/auth/me", headers=manager_headers)
+        response = requests.get(f"{BASE_URL}/api/admin/cache-stats", headers=manager_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["users"]["hits"] >= 1
+        assert "misses" in data["tokens"]
+
+    def test_user_update_visible_immediately(self, manager_headers, officer_headers):
+        """Updating a user invalidates their cached document"""
+        me = requests.get(f"{BASE_URL}/api/auth/me", headers=officer_headers).json()
+        original_name = me["name"]
+        requests.put(f"{BASE_URL}/api/users/{me['id']}", json={"name": "TEST_Renamed Officer"}, headers=manager_headers)
+        try:
+            refreshed = requests.get(f"{BASE_URL}/api/auth/me", headers=officer_headers).json()
+            assert refreshed["name"] == "TEST_Renamed Officer"
+        finally:
+            requests.put(f"{BASE_URL}/api/users/{me['id']}", json={"name": original_name}, headers=manager_headers)
+
+
+class TestAuditSink:
+    """Test the buffered audit writer"""
+
+    def test_audit_entry_visible_after_write(self, manager_headers):
+        """Audit entries still in the buffer are flushed before the audit log is read"""
+        response = requests.post(f"{BASE_URL}/api/cases", json={
+            "case_type": "littering",
+            "description": "TEST_Audit sink case",
+            "location": {"address": "1 Test Street", "postcode": "TE1 1ST"}
+        }, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        case_id = response.json()["id"]
+        logs = requests.get(f"{BASE_URL}/api/cases/{case_id}/audit-log", headers=manager_headers).json()
+        assert [log["action"] for log in logs] == ["CREATED"]
+
+    def test_sink_reported_in_readiness(self):
+        """Readiness exposes audit sink counters"""
+        data = requests.get(f"{BASE_URL}/api/health/ready").json()
+        assert data["audit_sink"]["running"] is True
+        assert data["audit_sink"]["failed"] == 0
+        assert data["audit_sink"]["dead_lettered"] == 0
+        assert data["audit_degraded"] is False
+
+
+class TestAccessLogRetention:
+    """Test the access log TTL indexes configured by ACCESS_LOG_RETENTION_DAYS"""
+
+    def test_ttl_indexes_match_declaration(self, manager_headers):
+        """The live TTL indexes carry the declared expiry, so readiness sees no drift"""
+        report = requests.get(f"{BASE_URL}/api/admin/indexes", headers=manager_headers).json()
+        assert "logged_at_ttl" not in report["collections"]["access_logs"]["mismatched"]
+        assert "bucket_start_ttl" not in report["collections"]["access_log_counters"]["mismatched"]
+
+
+class TestStatsRollup:
+    """Test the case_stats rollup behind /api/stats endpoints"""
+
+    def test_new_case_counted_immediately(self, manager_headers):
+        """Creating a case moves the overview totals without a rebuild"""
+        before = requests.get(f"{BASE_URL}/api/stats/overview", headers=manager_headers).json()
+        requests.post(f"{BASE_URL}/api/cases", json={
+            "case_type": "dog_fouling",
+            "description": "TEST_Rollup case",
+            "location": {"address": "1 Test Street", "postcode": "TE1 1ST"}
+        }, headers=manager_headers)
+        after = requests.get(f"{BASE_URL}/api/stats/overview", headers=manager_headers).json()
+        assert after["total_cases"] == before["total_cases"] + 1
+        assert after["cases_by_type"].get("dog_fouling", 0) == before["cases_by_type"].get("dog_fouling", 0) + 1
+
+    def test_rebuild_matches_incremental(self, manager_headers):
+        """A full rebuild produces the same numbers as the incrementally maintained rollup"""
+        before = requests.get(f"{BASE_URL}/api/stats/overview", headers=manager_headers).json()
+        response = requests.post(f"{BASE_URL}/api/admin/stats/rebuild", headers=manager_headers)
+        assert response.status_code == 200
+        assert response.json()["rows"] >= 1
+        after = requests.get(f"{BASE_URL}/api/stats/overview", headers=manager_headers).json()
+        assert after == before
+
+    def test_officer_cannot_rebuild(self, officer_headers):
+        """Rebuild is manager-only"""
+        response = requests.post(f"{BASE_URL}/api/admin/stats/rebuild", headers=officer_headers)
+        assert response.status_code == 403
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
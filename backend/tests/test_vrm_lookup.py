@@ -0,0 +1,194 @@
+"""
+Test suite for vehicle registration (VRM) lookups
+Tests: normalized VRM search on GET /api/cases, duplicate VRM checks, VRM watchlist alerts
+"""
+import pytest
+import requests
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+MANAGER_CREDENTIALS = {"email": "admin@council.gov.uk", "password": "admin123"}
+SUPERVISOR_CREDENTIALS = {"email": "supervisor@council.gov.uk", "password": "super123"}
+
+MONGO_URL = os.environ.get('MONGO_URL')
+DB_NAME = os.environ.get('DB_NAME')
+VRM_INDEX_SYNC_SECONDS = int(os.environ.get('VRM_INDEX_SYNC_SECONDS', '30'))
+
+
+@pytest.fixture(scope="module")
+def manager_headers():
+    """Manager auth headers"""
+    response = requests.post(f"{BASE_URL}/api/auth/login", json=MANAGER_CREDENTIALS)
+    assert response.status_code == 200, f"Manager login failed: {response.text}"
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def test_vrm():
+    """A VRM unlikely to exist already, spaced and lower-cased the way officers type it"""
+    suffix = uuid.uuid4().hex[:3].upper()
+    return f"tz{suffix[:2].lower()} {suffix[2]}qx"
+
+
+@pytest.fixture(scope="module")
+def vehicle_cases(manager_headers, test_vrm):
+    """Two abandoned vehicle cases with the same VRM written differently, plus a nuisance vehicle"""
+    case_ids = []
+    for vrm in [test_vrm, test_vrm.replace(" ", "").upper()]:
+        response = requests.post(f"{BASE_URL}/api/cases", json={
+            "case_type": "abandoned_vehicle",
+            "description": "TEST_VRM case",
+            "location": {"address": "1 Test Street", "postcode": "TE1 1ST"},
+            "type_specific_fields": {"abandoned_vehicle": {"registration_number": vrm}}
+        }, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        case_ids.append(response.json()["id"])
+    response = requests.post(f"{BASE_URL}/api/cases", json={
+        "case_type": "nuisance_vehicle",
+        "description": "TEST_VRM nuisance case",
+        "location": {"address": "1 Test Street", "postcode": "TE1 1ST"},
+        "type_specific_fields": {"nuisance_vehicle": {"vehicle_registration": test_vrm}}
+    }, headers=manager_headers)
+    assert response.status_code == 200, response.text
+    case_ids.append(response.json()["id"])
+    return case_ids
+
+
+class TestVrmLookup:
+    """Test VRM search and duplicate detection"""
+
+    def test_search_ignores_spacing_and_case(self, manager_headers, test_vrm, vehicle_cases):
+        """vrm_search matches every case with the VRM, across vehicle case types"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"vrm_search": test_vrm.upper()}, headers=manager_headers)
+        assert response.status_code == 200
+        assert set(vehicle_cases) <= {c["id"] for c in response.json()}
+
+    def test_search_by_prefix(self, manager_headers, test_vrm, vehicle_cases):
+        """A partial VRM from the start matches"""
+        response = requests.get(f"{BASE_URL}/api/cases", params={"vrm_search": test_vrm[:4]}, headers=manager_headers)
+        assert set(vehicle_cases) <= {c["id"] for c in response.json()}
+
+    def test_check_duplicate_same_type(self, manager_headers, test_vrm, vehicle_cases):
+        """Duplicate check is per case type"""
+        response = requests.get(f"{BASE_URL}/api/cases/check-duplicate-vrm", params={
+            "vrm": test_vrm, "case_type": "abandoned_vehicle", "exclude_case_id": vehicle_cases[0]
+        }, headers=manager_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["vrm"] == test_vrm.replace(" ", "").upper()
+        assert [d["id"] for d in data["duplicates"]] == [vehicle_cases[1]]
+
+    def test_case_duplicates(self, manager_headers, vehicle_cases):
+        """Per-case duplicate check finds the other case of the same type"""
+        response = requests.get(f"{BASE_URL}/api/cases/{vehicle_cases[1]}/duplicate-vrm-check", headers=manager_headers)
+        data = response.json()
+        assert data["has_vrm"] is True
+        assert [d["id"] for d in data["duplicates"]] == [vehicle_cases[0]]
+
+    def test_nuisance_vehicle_registration_field(self, manager_headers, vehicle_cases):
+        """Nuisance vehicles record their VRM as vehicle_registration"""
+        response = requests.get(f"{BASE_URL}/api/cases/{vehicle_cases[2]}/duplicate-vrm-check", headers=manager_headers)
+        data = response.json()
+        assert data["has_vrm"] is True
+        assert data["count"] == 0
+
+
+class TestVrmIndexSync:
+    """Test the in-memory VRM index picks up cases written by other workers"""
+
+    @pytest.fixture
+    def cases_collection(self):
+        if not (MONGO_URL and DB_NAME):
+            pytest.skip("MONGO_URL and DB_NAME are needed to write a case as another worker")
+        pymongo = pytest.importorskip("pymongo")
+        mongo = pymongo.MongoClient(MONGO_URL)
+        yield mongo[DB_NAME].cases
+        mongo.close()
+
+    def test_other_writer_seen_after_local_write(self, manager_headers, cases_collection):
+        """A case another worker wrote just before this worker's own write is not skipped by the next sync"""
+        vrm = f"SY{uuid.uuid4().hex[:5].upper()}"
+        other_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        cases_collection.insert_one({
+            "id": other_id,
+            "reference_number": f"TEST-SYNC-{vrm}",
+            "case_type": "abandoned_vehicle",
+            "status": "new",
+            "description": "TEST_Other worker case",
+            "location": {"address": "1 Test Street"},
+            "vrm_normalized": [vrm],
+            "created_at": now,
+            "updated_at": now
+        })
+        try:
+            response = requests.post(f"{BASE_URL}/api/cases", json={
+                "case_type": "abandoned_vehicle",
+                "description": "TEST_Local write case",
+                "location": {"address": "1 Test Street", "postcode": "TE1 1ST"},
+                "type_specific_fields": {"abandoned_vehicle": {"registration_number": vrm}}
+            }, headers=manager_headers)
+            assert response.status_code == 200, response.text
+            local_id = response.json()["id"]
+
+            deadline = time.time() + VRM_INDEX_SYNC_SECONDS + 10
+            found = []
+            while time.time() < deadline:
+                found = [d["id"] for d in requests.get(f"{BASE_URL}/api/cases/check-duplicate-vrm", params={
+                    "vrm": vrm, "case_type": "abandoned_vehicle", "exclude_case_id": local_id
+                }, headers=manager_headers).json()["duplicates"]]
+                if other_id in found:
+                    break
+                time.sleep(2)
+            assert other_id in found
+        finally:
+            cases_collection.delete_one({"id": other_id})
+
+
+class TestVrmWatchlist:
+    """Test /api/vrm-watchlist and alerts on case creation"""
+
+    @pytest.fixture(scope="class")
+    def supervisor_headers(self):
+        response = requests.post(f"{BASE_URL}/api/auth/login", json=SUPERVISOR_CREDENTIALS)
+        assert response.status_code == 200, f"Supervisor login failed: {response.text}"
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    @pytest.fixture(scope="class")
+    def watched_vrm(self, manager_headers):
+        vrm = f"WL{uuid.uuid4().hex[:2].upper()} {uuid.uuid4().hex[:3].upper()}"
+        response = requests.post(f"{BASE_URL}/api/vrm-watchlist", json={"vrm": vrm, "reason": "TEST_watch"}, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        yield vrm
+        requests.delete(f"{BASE_URL}/api/vrm-watchlist/{vrm.replace(' ', '')}", headers=manager_headers)
+
+    def test_duplicate_entry_rejected(self, manager_headers, watched_vrm):
+        """The same VRM written differently is still a duplicate"""
+        response = requests.post(f"{BASE_URL}/api/vrm-watchlist", json={"vrm": watched_vrm.lower()}, headers=manager_headers)
+        assert response.status_code == 400
+
+    def test_supervisor_cannot_edit(self, supervisor_headers):
+        """Only managers edit the watchlist"""
+        response = requests.post(f"{BASE_URL}/api/vrm-watchlist", json={"vrm": "TEST1"}, headers=supervisor_headers)
+        assert response.status_code == 403
+
+    def test_new_case_with_watched_vrm_notifies(self, manager_headers, supervisor_headers, watched_vrm):
+        """Creating a case with a watchlisted VRM notifies supervisors"""
+        response = requests.post(f"{BASE_URL}/api/cases", json={
+            "case_type": "abandoned_vehicle",
+            "description": "TEST_Watchlist case",
+            "location": {"address": "1 Test Street", "postcode": "TE1 1ST"},
+            "type_specific_fields": {"abandoned_vehicle": {"registration_number": watched_vrm}}
+        }, headers=manager_headers)
+        assert response.status_code == 200, response.text
+        reference = response.json()["reference_number"]
+        notifications = requests.get(f"{BASE_URL}/api/notifications", headers=supervisor_headers).json()
+        assert any(n["title"] == "Watchlisted Vehicle" and reference in n["message"] for n in notifications)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -49,10 +49,16 @@ import {
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
+const ROLE_SECTIONS = [
+  { role: 'reporter', key: 'reporters', label: 'Reporters', color: 'text-blue-800' },
+  { role: 'offender', key: 'offenders', label: 'Offenders', color: 'text-red-800' },
+  { role: 'witness', key: 'witnesses', label: 'Witnesses', color: 'text-amber-800' },
+];
+
 const PersonsTab = ({ caseData, canEdit, onUpdate }) => {
   const { user } = useAuth();
   const navigate = useNavigate();
-  const [casePersons, setCasePersons] = useState({ reporter: null, offender: null });
+  const [casePersons, setCasePersons] = useState({ reporters: [], offenders: [], witnesses: [] });
   const [loading, setLoading] = useState(true);
   const [linkDialogOpen, setLinkDialogOpen] = useState(false);
   const [linkRole, setLinkRole] = useState('reporter');
@@ -131,6 +137,7 @@ const PersonsTab = ({ caseData, canEdit, onUpdate }) => {
     switch (type) {
       case 'reporter': return 'bg-blue-100 text-blue-800';
       case 'offender': return 'bg-red-100 text-red-800';
+      case 'witness': return 'bg-amber-100 text-amber-800';
       case 'both': return 'bg-purple-100 text-purple-800';
       default: return 'bg-gray-100 text-gray-800';
     }
@@ -256,19 +263,41 @@ const PersonsTab = ({ caseData, canEdit, onUpdate }) => {
             Linked Persons
           </CardTitle>
           <CardDescription>
-            Reporter and offender information for this case
+            Reporters, offenders and witnesses for this case
           </CardDescription>
         </CardHeader>
         <CardContent>
-          <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-            <div>
-              <h3 className="font-medium mb-3 text-blue-800">Reporter</h3>
-              <PersonCard person={casePersons.reporter} role="reporter" canUnlink={true} />
-            </div>
-            <div>
-              <h3 className="font-medium mb-3 text-red-800">Offender</h3>
-              <PersonCard person={casePersons.offender} role="offender" canUnlink={true} />
-            </div>
+          <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
+            {ROLE_SECTIONS.map(({ role, key, label, color }) => {
+              const persons = casePersons[key] || [];
+              return (
+                <div key={role} className="space-y-3" data-testid={`${role}-section`}>
+                  <h3 className={`font-medium ${color}`}>{label}</h3>
+                  {persons.length === 0 ? (
+                    <PersonCard person={null} role={role} canUnlink={false} />
+                  ) : (
+                    persons.map((person) => (
+                      <PersonCard key={person.id} person={person} role={role} canUnlink={true} />
+                    ))
+                  )}
+                  {persons.length > 0 && canEdit && (
+                    <Button
+                      variant="outline"
+                      size="sm"
+                      className="w-full"
+                      onClick={() => {
+                        setLinkRole(role);
+                        setLinkDialogOpen(true);
+                      }}
+                      data-testid={`link-another-${role}-btn`}
+                    >
+                      <Plus className="w-4 h-4 mr-2" />
+                      Link another {role}
+                    </Button>
+                  )}
+                </div>
+              );
+            })}
           </div>
         </CardContent>
       </Card>
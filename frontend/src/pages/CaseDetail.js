@@ -759,7 +759,7 @@ const CaseDetail = () => {
                     >
                       {item.file_type?.startsWith('image/') ? (
                         <img
-                          src={`data:${item.file_type};base64,${item.file_data}`}
+                          src={`${process.env.REACT_APP_BACKEND_URL}${item.thumbnail_url || item.content_url}`}
                           alt={item.filename}
                           className="w-full h-full object-cover"
                         />
@@ -868,7 +868,7 @@ const CaseDetail = () => {
           </DialogHeader>
           {selectedImage && (
             <img
-              src={`data:${selectedImage.file_type};base64,${selectedImage.file_data}`}
+              src={`${process.env.REACT_APP_BACKEND_URL}${selectedImage.preview_url || selectedImage.content_url}`}
               alt={selectedImage.filename}
               className="w-full rounded-sm"
             />
@@ -70,7 +70,7 @@ const Cases = () => {
 
   const fetchCases = useCallback(async () => {
     try {
-      const params = new URLSearchParams();
+      const params = new URLSearchParams({ view: 'summary' });
       if (filters.status && filters.status !== 'all') params.append('status', filters.status);
       if (filters.case_type && filters.case_type !== 'all') params.append('case_type', filters.case_type);
       if (filters.vrm_search) params.append('vrm_search', filters.vrm_search);
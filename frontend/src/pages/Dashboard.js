@@ -39,7 +39,7 @@ const Dashboard = () => {
     try {
       const [statsRes, casesRes] = await Promise.all([
         axios.get(`${API}/stats/overview`),
-        axios.get(`${API}/cases`)
+        axios.get(`${API}/cases`, { params: { view: 'summary' } })
       ]);
       setStats(statsRes.data);
       
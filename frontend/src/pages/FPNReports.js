@@ -72,12 +72,12 @@ const FPNReports = () => {
 
   const handleExportCSV = async () => {
     try {
-      const response = await axios.get(`${API}/stats/fpn/export-csv`);
-      const blob = new Blob([response.data.csv_data], { type: 'text/csv' });
-      const url = window.URL.createObjectURL(blob);
+      const response = await axios.get(`${API}/stats/fpn/export-csv`, { responseType: 'blob' });
+      const filename = response.headers['content-disposition']?.match(/filename="([^"]+)"/)?.[1] || 'fpn_export.csv';
+      const url = window.URL.createObjectURL(response.data);
       const a = document.createElement('a');
       a.href = url;
-      a.download = response.data.filename;
+      a.download = filename;
       document.body.appendChild(a);
       a.click();
       window.URL.revokeObjectURL(url);
@@ -89,7 +89,7 @@ const MapView = () => {
 
   const fetchCases = useCallback(async () => {
     try {
-      const params = new URLSearchParams();
+      const params = new URLSearchParams({ view: 'map' });
       // Default to showing only open cases (exclude closed)
       if (filters.status && filters.status !== 'all') {
         params.append('status', filters.status);
@@ -116,6 +116,7 @@ const Persons = () => {
   const [editingPerson, setEditingPerson] = useState(null);
   const [formData, setFormData] = useState(emptyFormData);
   const [saving, setSaving] = useState(false);
+  const [duplicateCandidates, setDuplicateCandidates] = useState(null);
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false);
   const [personToDelete, setPersonToDelete] = useState(null);
   const [selectedPerson, setSelectedPerson] = useState(null);
@@ -175,6 +176,7 @@ const Persons = () => {
     setDialogOpen(false);
     setEditingPerson(null);
     setFormData(emptyFormData);
+    setDuplicateCandidates(null);
   };
 
   const handleSubmit = async (e) => {
@@ -190,6 +192,14 @@ const Persons = () => {
         await axios.put(`${API}/persons/${editingPerson.id}`, formData);
         toast.success('Person updated successfully');
       } else {
+        // Warn once about likely existing records before creating a new one
+        if (duplicateCandidates === null) {
+          const response = await axios.post(`${API}/persons/find-duplicates`, formData);
+          if (response.data.candidates.length > 0) {
+            setDuplicateCandidates(response.data.candidates);
+            return;
+          }
+        }
         await axios.post(`${API}/persons`, formData);
         toast.success('Person created successfully');
       }
@@ -273,6 +283,7 @@ const Persons = () => {
 
   const updateFormField = (field, value) => {
     setFormData(prev => ({ ...prev, [field]: value }));
+    setDuplicateCandidates(null);
   };
 
   const updateAddressField = (field, value) => {
@@ -405,7 +416,7 @@ const Persons = () => {
                     </TableCell>
                     <TableCell>
                       <Badge variant="outline">
-                        {person.linked_cases?.length || 0} case(s)
+                        {person.linked_case_count || 0} case(s)
                       </Badge>
                     </TableCell>
                     <TableCell className="text-right">
@@ -641,6 +652,29 @@ const Persons = () => {
               />
             </div>
 
+            {duplicateCandidates?.length > 0 && (
+              <div className="p-3 bg-amber-50 border border-amber-200 rounded-md" data-testid="duplicate-candidates">
+                <p className="text-sm text-amber-800 mb-2">
+                  <AlertTriangle className="w-4 h-4 inline mr-1" />
+                  This person may already exist. Check these records before adding a new one:
+                </p>
+                <ul className="space-y-1">
+                  {duplicateCandidates.map(({ person, score, matched_on }) => (
+                    <li key={person.id} className="flex items-center justify-between text-sm">
+                      <span>
+                        <strong>{person.first_name} {person.last_name}</strong>
+                        {person.phone && <span className="text-slate-500 ml-2">{person.phone}</span>}
+                        {person.email && <span className="text-slate-500 ml-2">{person.email}</span>}
+                      </span>
+                      <Badge variant="outline" title={`Matched on: ${matched_on.join(', ')}`}>
+                        {Math.round(score * 100)}% match
+                      </Badge>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            )}
+
             <div className="flex justify-end gap-3 pt-4 border-t">
               <Button type="button" variant="outline" onClick={handleCloseDialog}>
                 Cancel
@@ -657,7 +691,7 @@ const Persons = () => {
                     Saving...
                   </>
                 ) : (
-                  editingPerson ? 'Update Person' : 'Add Person'
+                  editingPerson ? 'Update Person' : (duplicateCandidates?.length > 0 ? 'Add Anyway' : 'Add Person')
                 )}
               </Button>
             </div>
@@ -820,9 +854,9 @@ const Persons = () => {
             <AlertDialogDescription>
               Are you sure you want to delete {personToDelete?.first_name} {personToDelete?.last_name}?
               This action cannot be undone.
-              {personToDelete?.linked_cases?.length > 0 && (
+              {personToDelete?.linked_case_count > 0 && (
                 <span className="block mt-2 text-red-600">
-                  This person is linked to {personToDelete.linked_cases.length} case(s) and cannot be deleted.
+                  This person is linked to {personToDelete.linked_case_count} case(s) and cannot be deleted.
                 </span>
               )}
             </AlertDialogDescription>
@@ -832,7 +866,7 @@ const Persons = () => {
             <AlertDialogAction
               onClick={handleDelete}
               className="bg-red-600 hover:bg-red-700"
-              disabled={personToDelete?.linked_cases?.length > 0}
+              disabled={personToDelete?.linked_case_count > 0}
             >
               Delete
             </AlertDialogAction>
@@ -884,7 +918,7 @@ const Persons = () => {
                       {mergePrimary.person_type}
                     </Badge>
                     <p className="text-xs text-green-600 mt-1">
-                      {mergePrimary.linked_cases?.length || 0} linked case(s)
+                      {mergePrimary.linked_case_count || 0} linked case(s)
                     </p>
                   </CardContent>
                 </Card>
@@ -921,7 +955,7 @@ const Persons = () => {
                       {mergeSecondary.person_type}
                     </Badge>
                     <p className="text-xs text-red-600 mt-1">
-                      {mergeSecondary.linked_cases?.length || 0} linked case(s) will be transferred
+                      {mergeSecondary.linked_case_count || 0} linked case(s) will be transferred
                     </p>
                   </CardContent>
                 </Card>
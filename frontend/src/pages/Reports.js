@@ -64,14 +64,14 @@ const Reports = () => {
       if (startDate) params.append('start_date', startDate.toISOString());
       if (endDate) params.append('end_date', endDate.toISOString());
 
-      const response = await axios.get(`${API}/stats/export-csv?${params.toString()}`);
+      const response = await axios.get(`${API}/stats/export-csv?${params.toString()}`, { responseType: 'blob' });
       
-      // Create blob and download
-      const blob = new Blob([response.data.csv_data], { type: 'text/csv' });
-      const url = window.URL.createObjectURL(blob);
+      // Download the streamed CSV, named by the server's Content-Disposition
+      const filename = response.headers['content-disposition']?.match(/filename="([^"]+)"/)?.[1] || 'cases_export.csv';
+      const url = window.URL.createObjectURL(response.data);
       const a = document.createElement('a');
       a.href = url;
-      a.download = response.data.filename;
+      a.download = filename;
       document.body.appendChild(a);
       a.click();
       document.body.removeChild(a);